@@ -23,6 +23,9 @@ export const partialUpdateArticle = (id, data) => apiClient.patch(`/articles/${i
 
 export const deleteArticle = (id) => apiClient.delete(`/articles/${id}/`);
 
+// { create: [...], update: [{ id, ... }], delete: [ids] } in one request (admin only)
+export const bulkArticles = (data) => apiClient.post('/articles/bulk/', data);
+
 // Comments endpoints
 export const getArticleComments = (articleId, params) => 
   apiClient.get(`/articles/${articleId}/comments/`, { params });
@@ -30,6 +33,10 @@ export const getArticleComments = (articleId, params) =>
 export const createComment = (articleId, data) => 
   apiClient.post(`/articles/${articleId}/comments/`, data);
 
+// Server-sent events for an article's comments (served by the ASGI app), for EventSource
+export const commentEventsUrl = (articleId) =>
+  `${apiClient.defaults.baseURL}/articles/${articleId}/comments/events/`;
+
 export const getComment = (id) => apiClient.get(`/comments/${id}/`);
 
 export const updateComment = (id, data) => apiClient.patch(`/comments/${id}/`, data);
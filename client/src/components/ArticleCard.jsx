@@ -2,7 +2,7 @@ import { Link } from 'react-router-dom';
 import { formatDateShort } from '../utils/date';
 
 const ArticleCard = ({ article }) => {
-  const excerpt = article.content?.substring(0, 150) + (article.content?.length > 150 ? '...' : '');
+  const excerpt = article.excerpt ?? (article.content?.substring(0, 150) + (article.content?.length > 150 ? '...' : ''));
   const tags = typeof article.tags === 'string' ? article.tags.split(',').map(t => t.trim()) : (article.tags || []);
 
   return (
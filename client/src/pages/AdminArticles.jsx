@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getArticles, createArticle, updateArticle, deleteArticle } from '../api/endpoints';
+import { getArticles, getArticle, createArticle, updateArticle, deleteArticle } from '../api/endpoints';
 import ArticleCard from '../components/ArticleCard';
 import Pagination from '../components/Pagination';
 import Button from '../components/Button';
@@ -93,16 +93,23 @@ const AdminArticles = () => {
     setShowForm(true);
   };
 
-  const handleEdit = (article) => {
-    setEditingArticle(article);
-    setFormData({
-      title: article.title,
-      content: article.content,
-      tags: article.tags || '',
-    });
-    setFormErrors({});
-    setShowForm(true);
-    window.scrollTo(0, 0);
+  const handleEdit = async (article) => {
+    // List responses only carry an excerpt, load the full content to edit it
+    try {
+      const response = await getArticle(article.id);
+      setEditingArticle(response.data);
+      setFormData({
+        title: response.data.title,
+        content: response.data.content,
+        tags: response.data.tags || '',
+      });
+      setFormErrors({});
+      setShowForm(true);
+      window.scrollTo(0, 0);
+    } catch (err) {
+      setError('Failed to load article');
+      console.error(err);
+    }
   };
 
   const handleFormChange = (e) => {
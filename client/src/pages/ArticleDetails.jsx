@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
-import { getArticle, getArticleComments, createComment, updateComment, deleteComment } from '../api/endpoints';
+import { getArticle, getArticleComments, createComment, updateComment, deleteComment, commentEventsUrl } from '../api/endpoints';
 import { useAuth } from '../context/AuthContext';
 import { formatDate } from '../utils/date';
 import CommentItem from '../components/CommentItem';
@@ -23,6 +23,30 @@ const ArticleDetails = () => {
     fetchComments();
   }, [id]);
 
+  // Live comment updates: one open stream instead of re-fetching the list.
+  // EventSource reconnects by itself and resumes from the last event it got.
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+    const source = new EventSource(commentEventsUrl(id));
+
+    source.addEventListener('comment.created', (event) => {
+      const comment = JSON.parse(event.data);
+      setComments(prev => prev.some(c => c.id === comment.id) ? prev : [comment, ...prev]);
+    });
+    source.addEventListener('comment.updated', (event) => {
+      const comment = JSON.parse(event.data);
+      setComments(prev => prev.map(c => (c.id === comment.id ? comment : c)));
+    });
+    source.addEventListener('comment.deleted', (event) => {
+      const { id: commentId } = JSON.parse(event.data);
+      setComments(prev => prev.filter(c => c.id !== commentId));
+    });
+    // Missed events are no longer available: reload the list
+    source.addEventListener('reset', () => fetchComments());
+
+    return () => source.close();
+  }, [id]);
+
   const fetchArticle = async () => {
     try {
       setLoading(true);
@@ -1,11 +1,50 @@
+from django import forms
 from django.contrib import admin
-from .models import Article
+from .models import Article, Tag
+
+
+class ArticleAdminForm(forms.ModelForm):
+    """Edit tags as a comma-separated string, like the API does"""
+    tag_names = forms.CharField(
+        label='Tags',
+        required=False,
+        help_text='Comma-separated, e.g. "django, python"'
+    )
+
+    class Meta:
+        model = Article
+        fields = ['title', 'content', 'author']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['tag_names'].initial = self.instance.tag_string
 
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
     """Admin configuration for Article model"""
-    list_display = ['title', 'author', 'created_at', 'tags']
+    form = ArticleAdminForm
+    list_display = ['title', 'author', 'created_at', 'tag_list']
     list_filter = ['created_at', 'author']
-    search_fields = ['title', 'content', 'tags']
+    search_fields = ['title', 'content', 'tags__name']
     date_hierarchy = 'created_at'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author').prefetch_related('tags')
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.set_tags(form.cleaned_data.get('tag_names', ''))
+
+    def tag_list(self, obj):
+        return obj.tag_string
+    tag_list.short_description = 'Tags'
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    """Admin configuration for Tag model"""
+    list_display = ['name', 'article_count']
+    search_fields = ['name']
+    readonly_fields = ['article_count']
@@ -0,0 +1,177 @@
+"""
+Bulk writes of articles
+
+bulk_create(), bulk_update() and raw deletes bypass Article.save() and the
+model signals, so everything those normally take care of is done here, in
+bulk: excerpt and reading time, tag links and Tag.article_count, comments of
+deleted articles (and their comment.deleted events), search documents and
+cache generations.
+Callers are expected to run these functions inside a transaction.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from blog_project.invalidation import bump_generation
+from comments.models import Comment
+from comments.signals import publish_comments_deleted
+from .models import Article, ArticleTag, Tag
+from .search import get_search_backend
+
+BATCH_SIZE = 1000
+
+
+def get_or_create_tags(names):
+    """Return {name: Tag} for the given names, creating the missing ones in one query"""
+    names = set(names)
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+
+
+def apply_tag_count_deltas(deltas):
+    """Add the per-tag deltas ({tag_id: delta}) to Tag.article_count in one UPDATE"""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Tag.objects.filter(pk__in=deltas).update(
+        article_count=F('article_count') + Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            output_field=IntegerField(),
+        )
+    )
+
+
+def replace_tags(articles, tag_lists, new=False):
+    """
+    Give each article exactly the tags named in the matching list.
+    `new` skips looking up the links of articles that were just created.
+    """
+    current = defaultdict(dict)
+    if not new:
+        links = ArticleTag.objects.filter(article__in=articles).values_list(
+            'pk', 'article_id', 'tag_id', 'tag__name'
+        )
+        for link_pk, article_id, tag_id, name in links:
+            current[article_id][name] = (link_pk, tag_id)
+
+    tags = get_or_create_tags(name for names in tag_lists for name in names)
+    removed, added, deltas = [], [], Counter()
+    for article, names in zip(articles, tag_lists):
+        linked = current[article.pk]
+        for name, (link_pk, tag_id) in linked.items():
+            if name not in names:
+                removed.append(link_pk)
+                deltas[tag_id] -= 1
+        for name in names:
+            if name not in linked:
+                added.append(ArticleTag(article=article, tag=tags[name]))
+                deltas[tags[name].pk] += 1
+
+    if removed:
+        # Not QuerySet.delete(): its collector loads every link and sends
+        # post_delete for each (one Tag UPDATE per link). The private
+        # _raw_delete() is the only single-statement DELETE the ORM offers;
+        # what the signal handlers did is done here and by the callers
+        # (Tag.article_count below, cache generations in invalidate())
+        ArticleTag.objects.filter(pk__in=removed)._raw_delete(ArticleTag.objects.db)
+    ArticleTag.objects.bulk_create(added, batch_size=BATCH_SIZE)
+    apply_tag_count_deltas(deltas)
+
+
+def reindex(article_ids):
+    backend = get_search_backend()
+    if backend is not None and article_ids:
+        articles = Article.objects.filter(pk__in=article_ids).select_related('author').prefetch_related('tags')
+        for start in range(0, len(article_ids), BATCH_SIZE):
+            backend.index(articles.filter(pk__in=article_ids[start:start + BATCH_SIZE]))
+
+
+def invalidate(*scopes):
+    transaction.on_commit(lambda: bump_generation('articles.article', 'articles.tag', *scopes))
+
+
+def create_articles(items):
+    """Create articles from validated serializer data (author included)"""
+    tag_lists = []
+    articles = []
+    for item in items:
+        item = dict(item)
+        tag_lists.append(item.pop('tags', []))
+        article = Article(**item)
+        article.refresh_summary()
+        articles.append(article)
+
+    Article.objects.bulk_create(articles, batch_size=BATCH_SIZE)
+    replace_tags(articles, tag_lists, new=True)
+    reindex([article.pk for article in articles])
+    invalidate()
+    return articles
+
+
+def update_articles(articles, items):
+    """Apply validated partial updates, items[i] to articles[i]"""
+    now = timezone.now()
+    fields = {'updated_at'}
+    retagged, tag_lists = [], []
+    for article, item in zip(articles, items):
+        item = dict(item)
+        tags = item.pop('tags', None)
+        if tags is not None:
+            retagged.append(article)
+            tag_lists.append(tags)
+        for attr, value in item.items():
+            setattr(article, attr, value)
+        fields.update(item)
+        if 'content' in item:
+            article.refresh_summary()
+            fields.update(('excerpt', 'reading_time'))
+        # bulk_update() does not apply auto_now
+        article.updated_at = now
+
+    Article.objects.bulk_update(articles, sorted(fields), batch_size=BATCH_SIZE)
+    if retagged:
+        replace_tags(retagged, tag_lists)
+    reindex([article.pk for article in articles])
+    invalidate(*(f'article:{article.pk}' for article in articles))
+    return articles
+
+
+def delete_articles(article_ids):
+    """
+    Delete articles with one DELETE per table instead of the collector's
+    per-object cascade and signals; returns the number of deleted articles.
+    """
+    article_ids = list(article_ids)
+    deltas = Counter()
+    tag_counts = ArticleTag.objects.filter(article_id__in=article_ids).values_list('tag_id').annotate(
+        links=Count('pk')
+    )
+    for tag_id, links in tag_counts:
+        deltas[tag_id] -= links
+
+    # Announced once committed, like the comments deleted one by one
+    publish_comments_deleted(
+        Comment.objects.filter(article_id__in=article_ids).values_list('pk', 'article_id', 'parent_id')
+    )
+
+    # Raw deletes rather than QuerySet.delete(), whose collector loads every
+    # article, comment and tag link and sends pre/post_delete for each of
+    # them. _raw_delete() is private, but it is the only single-statement
+    # DELETE the ORM offers, and everything the signal handlers would have
+    # done is done here: tag counts, search documents, comment events and
+    # cache generations.
+    # Children first, the database does not cascade for us
+    Comment.objects.filter(article_id__in=article_ids)._raw_delete(Comment.objects.db)
+    ArticleTag.objects.filter(article_id__in=article_ids)._raw_delete(ArticleTag.objects.db)
+    deleted = Article.objects.filter(pk__in=article_ids)._raw_delete(Article.objects.db)
+    apply_tag_count_deltas(deltas)
+
+    backend = get_search_backend()
+    if backend is not None:
+        backend.remove(article_ids)
+    invalidate('comments.comment', *(f'article:{pk}' for pk in article_ids))
+    return deleted
@@ -0,0 +1,59 @@
+"""
+Filter backends for articles
+"""
+import django_filters
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from .models import Article, ArticleTag, parse_tags
+from .search import get_search_backend
+
+
+class ArticleFilter(django_filters.FilterSet):
+    """
+    ?tag=python returns the articles carrying exactly that tag
+    (an index lookup on the tag name and the article/tag link table);
+    ?tag=python,django those carrying any of the tags
+    """
+    tag = django_filters.CharFilter(method='filter_tag')
+
+    class Meta:
+        model = Article
+        fields = ['tag']
+
+    def filter_tag(self, queryset, name, value):
+        names = parse_tags(value)
+        if not names:
+            return queryset
+        if len(names) == 1:
+            return queryset.filter(tags__name=names[0])
+        # A subquery rather than a join, so articles with several of the tags
+        # are listed once without DISTINCT
+        return queryset.filter(pk__in=ArticleTag.objects.filter(tag__name__in=names).values('article_id'))
+
+
+class ArticleSearchFilter(SearchFilter):
+    """
+    ?search= backed by the indexed full-text search document.
+    Falls back to DRF's icontains search when no backend is available.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        backend = get_search_backend()
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, terms)
+
+
+class ArticleOrderingFilter(OrderingFilter):
+    """
+    Orders search results by relevance unless ?ordering= is given explicitly
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) \
+                and 'search_rank' in queryset.query.extra_select:
+            return ['-search_rank'] + list(self.get_default_ordering(view) or [])
+        return super().get_ordering(request, queryset, view)
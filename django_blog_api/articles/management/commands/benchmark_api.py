@@ -0,0 +1,181 @@
+"""
+Management command benchmarking every API route in-process (full middleware
+stack, Django test client) on the current database.
+
+For each scenario it records p50/p95/p99 latency, the number of SQL queries
+and the response size, writes the results as JSON and, given a baseline
+file, fails when a scenario regressed beyond the threshold:
+
+    python manage.py generate_data --clear --articles 10000 --comments 50000
+    python manage.py benchmark_api --output baseline.json
+    ... change code ...
+    python manage.py benchmark_api --baseline baseline.json
+"""
+import json
+import platform
+import uuid
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from articles.models import Article
+from articles.synthetic import SyntheticDataGenerator
+from blog_project.benchmark import find_regressions, format_summary, measure
+from blog_project.middleware import QueryCounter
+from comments.models import Comment
+from users.authentication import ClaimsRefreshToken
+
+BENCH_USERNAME = 'bench-user'
+BENCH_PASSWORD = 'bench-pass-123'
+REGISTER_PREFIX = 'bench-register-'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark all API endpoints (latency percentiles, queries, bytes) against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--only', nargs='+', default=[],
+                            help='Run the scenarios whose name contains one of these strings')
+        parser.add_argument('--articles', type=int, default=0,
+                            help='Top the corpus up to this many articles first (see generate_data)')
+        parser.add_argument('--output', default='benchmark_results.json')
+        parser.add_argument('--baseline', help='Results file to compare with')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed relative slowdown / growth (0.2 = 20%%)')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Ignore latency differences smaller than this')
+        parser.add_argument('--response-cache', action='store_true',
+                            help='Keep the response cache on (off by default: measure the views)')
+
+    def handle(self, *args, **options):
+        missing = options['articles'] - Article.objects.count()
+        if missing > 0:
+            self.stdout.write(f'Generating {missing} synthetic articles...')
+            SyntheticDataGenerator(
+                users=0 if User.objects.filter(is_staff=True).exists() else 1,
+                articles=missing,
+                comments=missing * 5,
+                seed=42,
+            ).run()
+        article = Article.objects.order_by('-comment_count', '-pk').first()
+        comment = Comment.objects.order_by('-pk').first()
+        if article is None or comment is None:
+            raise CommandError('No articles or comments, run manage.py generate_data first.')
+
+        user = self.bench_user()
+        self.client = Client(HTTP_HOST='localhost')
+        scenarios = self.scenarios(user, article, comment)
+        if options['only']:
+            scenarios = [s for s in scenarios if any(part in s[0] for part in options['only'])]
+
+        results = {}
+        with override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=options['response_cache']):
+            try:
+                for name, call in scenarios:
+                    results[name] = self.run_scenario(name, call, options)
+            finally:
+                User.objects.filter(username__startswith=REGISTER_PREFIX).delete()
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'articles': Article.objects.count(),
+                'comments': Comment.objects.count(),
+                'runs': options['runs'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(f"\nResults written to {options['output']}")
+
+        if options['baseline']:
+            self.compare(results, options)
+
+    def bench_user(self):
+        user, created = User.objects.get_or_create(
+            username=BENCH_USERNAME, defaults={'email': 'bench-user@example.com'}
+        )
+        if created:
+            user.set_password(BENCH_PASSWORD)
+            user.save(update_fields=['password'])
+        return user
+
+    def scenarios(self, user, article, comment):
+        """(name, call) pairs; call() performs one request and returns the response"""
+        client = self.client
+        token = ClaimsRefreshToken.for_user(user)
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token.access_token}'}
+
+        def get(path, params=None, **extra):
+            return lambda: client.get(path, params or {}, **extra)
+
+        def register():
+            username = f'{REGISTER_PREFIX}{uuid.uuid4().hex[:12]}'
+            return client.post('/api/register/', {
+                'username': username, 'email': f'{username}@example.com', 'password': BENCH_PASSWORD,
+            }, content_type='application/json')
+
+        return [
+            ('health', get('/api/health/')),
+            ('token', lambda: client.post('/api/token/', {
+                'username': BENCH_USERNAME, 'password': BENCH_PASSWORD,
+            }, content_type='application/json')),
+            ('token-refresh', lambda: client.post('/api/token/refresh/', {
+                'refresh': str(token),
+            }, content_type='application/json')),
+            ('register', register),
+            ('me', get('/api/me/', **auth)),
+            ('articles', get('/api/articles/')),
+            ('articles-page-size-50', get('/api/articles/', {'page_size': 50})),
+            ('articles-full-content', get('/api/articles/', {'summary': 'false'})),
+            ('articles-search', get('/api/articles/', {'search': 'django'})),
+            ('articles-ordering-title', get('/api/articles/', {'ordering': 'title'})),
+            ('articles-most-discussed', get('/api/articles/', {'ordering': '-comment_count'})),
+            ('articles-tag', get('/api/articles/', {'tag': 'python'})),
+            ('articles-cursor', get('/api/articles/', {'pagination': 'cursor'})),
+            ('articles-authenticated', get('/api/articles/', **auth)),
+            ('article-detail', get(f'/api/articles/{article.pk}/')),
+            ('tags', get('/api/tags/')),
+            ('comments', get(f'/api/articles/{article.pk}/comments/')),
+            ('comments-page-size-50', get(f'/api/articles/{article.pk}/comments/', {'page_size': 50})),
+            ('comment-detail', get(f'/api/comments/{comment.pk}/')),
+        ]
+
+    def run_scenario(self, name, call, options):
+        # One probe request for the deterministic numbers, then the timed runs
+        with QueryCounter() as queries:
+            response = call()
+        if response.status_code >= 400:
+            raise CommandError(f'{name}: HTTP {response.status_code} {response.content[:200]!r}')
+        summary = measure(call, runs=options['runs'], warmup=options['warmup'])
+        summary.update(queries=queries.count, bytes=len(response.content), status=response.status_code)
+        self.stdout.write(
+            f"{format_summary(name, summary)}  {summary['queries']:>3} queries  {summary['bytes']:>8} bytes"
+        )
+        return summary
+
+    def compare(self, results, options):
+        try:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)['results']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read baseline {options['baseline']}: {exc}")
+
+        regressions = find_regressions(
+            results, baseline, threshold=options['threshold'], min_delta_ms=options['min_delta_ms']
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(f'  {regression}')
+            raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
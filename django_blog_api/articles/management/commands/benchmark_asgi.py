@@ -0,0 +1,197 @@
+"""
+Management command comparing the throughput of the read endpoints served by
+a WSGI worker (sync views, a fixed pool of threads) and by an ASGI worker
+(async views, one event loop) under many concurrent slow clients:
+
+    python manage.py benchmark_asgi --clients 1000 --requests 3 --client-delay 0.05
+
+Each simulated client sends its requests one after the other, as over a
+keep-alive connection, and takes --client-delay seconds to read every
+response. A WSGI thread is held while the client reads, an ASGI worker
+awaits it. Both handlers are driven in-process (no HTTP server needed),
+each mode in its own process since ASYNC_VIEWS is read when the URLconf
+is loaded.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from articles.models import Article
+from blog_project.benchmark import format_summary, summarize
+
+MODES = ('wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    help = 'Compare WSGI (sync views) and ASGI (async views) throughput with many concurrent slow clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=3, help='Requests per client')
+        parser.add_argument('--client-delay', type=float, default=0.05,
+                            help='Seconds each client takes to read a response')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Threads of the WSGI worker (e.g. gunicorn --threads)')
+        parser.add_argument('--only', nargs='+', default=[],
+                            help='Run the scenarios whose name contains one of these strings')
+        parser.add_argument('--output', default='benchmark_asgi.json')
+        parser.add_argument('--mode', choices=MODES, help='Run one mode in this process (JSON on stdout)')
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            self.stdout.write(json.dumps(self.run_mode(options)))
+            return
+
+        report = {}
+        for mode in MODES:
+            self.stdout.write(f'{mode.upper()}:')
+            report[mode] = self.spawn(mode, options)
+            for name, summary in report[mode].items():
+                self.stdout.write(f"  {format_summary(name, summary)}  {summary['throughput']:8.1f} req/s")
+
+        self.stdout.write('\nASGI / WSGI throughput:')
+        for name, summary in report['asgi'].items():
+            ratio = summary['throughput'] / report['wsgi'][name]['throughput']
+            self.stdout.write(f'  {name:<40} x{ratio:.2f}')
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(f"\nResults written to {options['output']}")
+
+    def spawn(self, mode, options):
+        command = [
+            sys.executable, sys.argv[0], 'benchmark_asgi', '--mode', mode,
+            '--clients', str(options['clients']), '--requests', str(options['requests']),
+            '--client-delay', str(options['client_delay']), '--threads', str(options['threads']),
+        ]
+        if options['only']:
+            command += ['--only', *options['only']]
+        env = {**os.environ, 'ASYNC_VIEWS': str(mode == 'asgi'), 'THROTTLE_ENABLED': 'False'}
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f'{mode} run failed:\n{result.stderr}')
+        return json.loads(result.stdout)
+
+    def scenarios(self):
+        article = Article.objects.order_by('-comment_count', '-pk').first()
+        if article is None:
+            raise CommandError('No articles, run manage.py generate_data first.')
+        return [
+            ('articles', '/api/articles/', ''),
+            ('articles-cursor', '/api/articles/', 'pagination=cursor'),
+            ('article-detail', f'/api/articles/{article.pk}/', ''),
+            ('comments', f'/api/articles/{article.pk}/comments/', ''),
+        ]
+
+    def run_mode(self, options):
+        scenarios = self.scenarios()
+        if options['only']:
+            scenarios = [s for s in scenarios if any(part in s[0] for part in options['only'])]
+        run = self.run_wsgi if options['mode'] == 'wsgi' else self.run_asgi
+
+        results = {}
+        # Measure the views, not the response cache
+        with override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False, ALLOWED_HOSTS=['localhost']):
+            for name, path, query in scenarios:
+                start = time.perf_counter()
+                samples = run(path, query, options)
+                elapsed = time.perf_counter() - start
+                results[name] = {**summarize(samples), 'throughput': len(samples) / elapsed}
+        return results
+
+    def run_wsgi(self, path, query, options):
+        handler = WSGIHandler()
+        delay = options['client_delay']
+        samples = []
+        done = threading.Event()
+        remaining = [options['clients'] * options['requests']]
+        lock = threading.Lock()
+
+        def serve():
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+                'SCRIPT_NAME': '', 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+                'HTTP_HOST': 'localhost', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+            }
+            statuses = []
+            response = handler(environ, lambda status, headers: statuses.append(status))
+            try:
+                for _chunk in response:
+                    pass
+                # The client reading the response holds the thread
+                time.sleep(delay)
+            finally:
+                response.close()
+            if not statuses[0].startswith('200'):
+                raise CommandError(f'{path}?{query}: HTTP {statuses[0]}')
+
+        def client(pool, left):
+            start = time.perf_counter()
+
+            def finished(future):
+                future.result()
+                with lock:
+                    samples.append(time.perf_counter() - start)
+                    remaining[0] -= 1
+                    if not remaining[0]:
+                        done.set()
+                if left > 1:
+                    client(pool, left - 1)
+
+            pool.submit(serve).add_done_callback(finished)
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            for _ in range(options['clients']):
+                client(pool, options['requests'])
+            done.wait()
+        return samples
+
+    def run_asgi(self, path, query, options):
+        handler = ASGIHandler()
+        delay = options['client_delay']
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def request():
+            statuses = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif not message.get('more_body'):
+                    # The client reading the response, awaited
+                    await asyncio.sleep(delay)
+
+            start = time.perf_counter()
+            await handler(dict(scope), receive, send)
+            if statuses[0] != 200:
+                raise CommandError(f'{path}?{query}: HTTP {statuses[0]}')
+            return time.perf_counter() - start
+
+        async def client():
+            return [await request() for _ in range(options['requests'])]
+
+        async def main():
+            per_client = await asyncio.gather(*(client() for _ in range(options['clients'])))
+            return [sample for samples in per_client for sample in samples]
+
+        return asyncio.run(main())
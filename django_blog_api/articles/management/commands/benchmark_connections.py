@@ -0,0 +1,111 @@
+"""
+Management command measuring request latency under concurrency with each
+connection strategy (see blog_project.db):
+
+- per-request: a new connection for every request (CONN_MAX_AGE=0)
+- persistent: one connection per thread, kept between requests
+- pooled: an in-process pool of --pool-size connections
+
+    python manage.py benchmark_connections --workers 50 200 --pool-size 20
+
+Every worker thread sends --requests requests to the article detail
+endpoint in-process (full middleware stack). The connect column is the
+average time a request spent opening a connection or waiting for one.
+"""
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+
+from articles.models import Article
+from blog_project.benchmark import format_summary, summarize
+from blog_project.db.pool import close_pools
+from blog_project.middleware import QueryCounter
+
+STRATEGIES = ('per-request', 'persistent', 'pooled')
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request, persistent and pooled database connections at several concurrency levels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[50, 200])
+        parser.add_argument('--requests', type=int, default=20, help='Requests per worker')
+        parser.add_argument('--pool-size', type=int, default=20)
+        parser.add_argument('--strategies', nargs='+', choices=STRATEGIES, default=list(STRATEGIES))
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        article = Article.objects.using(options['database']).first()
+        if article is None:
+            raise CommandError('No articles, run manage.py generate_data first.')
+        path = f'/api/articles/{article.pk}/'
+        database = connections.settings[options['database']]
+        original = {key: database[key] for key in ('CONN_MAX_AGE', 'POOL')}
+        connections.close_all()
+
+        self.stdout.write(f"{connections[options['database']].vendor}, {path}")
+        try:
+            with override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False):
+                for strategy in options['strategies']:
+                    self.configure(database, strategy, options['pool_size'])
+                    for workers in options['workers']:
+                        summary = self.run(path, workers, options['requests'])
+                        self.stdout.write(
+                            f"{format_summary(f'{strategy} x{workers}', summary)}  "
+                            f"connect={summary['connect']:7.2f}ms  {summary['throughput']:8.1f} req/s"
+                        )
+                    close_pools()
+        finally:
+            database.update(original)
+            close_pools()
+
+    def configure(self, database, strategy, pool_size):
+        database['CONN_MAX_AGE'] = 60 if strategy == 'persistent' else 0
+        database['POOL'] = {**database.get('POOL', {}), 'max_size': pool_size if strategy == 'pooled' else 0}
+
+    def run(self, path, workers, requests):
+        samples = []
+        connect_waits = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(workers)
+
+        def worker():
+            client = Client(HTTP_HOST='localhost')
+            timings, waits = [], []
+            try:
+                barrier.wait()
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    with QueryCounter() as counter:
+                        response = client.get(path)
+                    timings.append(time.perf_counter() - start)
+                    waits.append(counter.connect_duration)
+                    if response.status_code != 200:
+                        raise CommandError(f'{path}: HTTP {response.status_code}')
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                # Persistent connections live as long as their thread
+                connections.close_all()
+            with lock:
+                samples.extend(timings)
+                connect_waits.extend(waits)
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise CommandError(f'{len(errors)} worker(s) failed, first error: {errors[0]}')
+
+        summary = summarize(samples)
+        summary['connect'] = sum(connect_waits) / len(connect_waits) * 1000
+        summary['throughput'] = len(samples) / elapsed
+        return summary
@@ -0,0 +1,73 @@
+"""
+Management command comparing DRF's JSONRenderer/JSONParser (stdlib json)
+with FastJSONRenderer/FastJSONParser (orjson when installed) on pages of
+ArticleSerializer (full content) and CommentSerializer data:
+
+    python manage.py benchmark_json --page-size 50 --runs 500
+
+The first row is the time to query and serialize the page, for scale: a
+response pays for it plus one render. Outputs must be identical bytes.
+"""
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from articles.models import Article
+from articles.serializers import ArticleSerializer
+from blog_project.benchmark import format_summary, measure
+from blog_project.parsers import FastJSONParser
+from blog_project.renderers import FastJSONRenderer, orjson
+from comments.models import Comment
+from comments.serializers import CommentSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JSON rendering and parsing of article and comment pages, stdlib json vs orjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--runs', type=int, default=500)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        pages = {
+            'articles': lambda: ArticleSerializer(
+                Article.objects.select_related('author').prefetch_related('tags')
+                .order_by('-created_at', '-id')[:page_size],
+                many=True,
+            ).data,
+            'comments': lambda: CommentSerializer(
+                Comment.objects.select_related('author').order_by('-created_at', '-id')[:page_size],
+                many=True,
+            ).data,
+        }
+        self.stdout.write(f"orjson {orjson.__version__ if orjson else 'not installed'}, {page_size} items per page")
+
+        for name, serialize in pages.items():
+            data = serialize()
+            if not data:
+                raise CommandError(f'No {name}, run manage.py generate_data first.')
+            content = JSONRenderer().render(data)
+            if FastJSONRenderer().render(data) != content:
+                raise CommandError(f'FastJSONRenderer output differs from JSONRenderer for {name}')
+            if FastJSONParser().parse(io.BytesIO(content)) != JSONParser().parse(io.BytesIO(content)):
+                raise CommandError(f'FastJSONParser result differs from JSONParser for {name}')
+            self.stdout.write(f'{name}: {len(data)} items, {len(content):,} bytes')
+
+            results = {}
+            for label, func in (
+                ('queries + .data', serialize),
+                ('JSONRenderer', lambda: JSONRenderer().render(data)),
+                ('FastJSONRenderer', lambda: FastJSONRenderer().render(data)),
+                ('JSONParser', lambda: JSONParser().parse(io.BytesIO(content))),
+                ('FastJSONParser', lambda: FastJSONParser().parse(io.BytesIO(content))),
+            ):
+                # Parsing and rendering are far cheaper than the queries behind .data
+                runs = options['runs'] if func is not serialize else max(1, options['runs'] // 10)
+                results[label] = measure(func, runs=runs, warmup=min(runs, 10))
+                self.stdout.write(format_summary(f'  {label}', results[label]))
+            for stdlib, fast in (('JSONRenderer', 'FastJSONRenderer'), ('JSONParser', 'FastJSONParser')):
+                speedup = results[stdlib]['p50'] / results[fast]['p50'] if results[fast]['p50'] else 0.0
+                self.stdout.write(f'  {fast} vs {stdlib}: {speedup:.1f}x faster (p50)')
@@ -0,0 +1,48 @@
+"""
+Management command measuring bytes on the wire and bytes read from the
+database for the articles list, in summary mode and full-content mode.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from articles.views import ArticleListCreateView
+
+
+def fetched_bytes(queries):
+    """Re-run the captured SELECTs and add up the size of every returned value"""
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute(query['sql'])
+            for row in cursor.fetchall():
+                total += sum(len(str(value).encode()) for value in row if value is not None)
+    return total
+
+
+class Command(BaseCommand):
+    help = 'Compare response and DB transfer sizes of the article list with and without content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+
+    # Measure the views themselves, not the response cache or rate limits
+    @override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+    def handle(self, *args, **options):
+        view = ArticleListCreateView.as_view()
+        factory = RequestFactory(HTTP_HOST='localhost')
+
+        for label, summary in (('full content', 'false'), ('summary', 'true')):
+            request = factory.get(
+                '/api/articles/', {'page_size': options['page_size'], 'summary': summary}
+            )
+            with CaptureQueriesContext(connection) as queries:
+                response = view(request).render()
+            self.stdout.write(
+                f'{label:<14} response={len(response.content):>10} bytes  '
+                f'db={fetched_bytes(queries.captured_queries):>10} bytes  '
+                f'({len(response.data["results"])} articles)'
+            )
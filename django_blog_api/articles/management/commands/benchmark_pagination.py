@@ -0,0 +1,77 @@
+"""
+Management command comparing page-1 and page-N latency of page number
+pagination and keyset pagination for the articles and comments lists.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import RequestFactory, override_settings
+
+from articles.models import Article
+from articles.views import ArticleListCreateView
+from blog_project.benchmark import format_summary, measure
+from blog_project.pagination import KeysetPagination
+from comments.models import Comment
+from comments.views import ArticleCommentListCreateView
+
+
+class Command(BaseCommand):
+    help = 'Benchmark page-1 vs page-N latency for page number and keyset pagination'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', type=int, default=0,
+                            help='Deep page to measure (default: the last page)')
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--runs', type=int, default=50)
+
+    # Measure the views themselves, not the response cache or rate limits
+    @override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+    def handle(self, *args, **options):
+        self.factory = RequestFactory(HTTP_HOST='localhost')
+        self.options = options
+
+        self.compare(
+            'articles',
+            ArticleListCreateView.as_view(),
+            '/api/articles/',
+            Article.objects.order_by('-created_at', '-id'),
+            {},
+        )
+
+        busiest = (
+            Article.objects.annotate(n=Count('comments')).order_by('-n').values_list('pk', flat=True).first()
+        )
+        if busiest is None:
+            raise CommandError('No articles, run manage.py generate_data first.')
+        self.compare(
+            f'comments of article {busiest}',
+            ArticleCommentListCreateView.as_view(),
+            f'/api/articles/{busiest}/comments/',
+            Comment.objects.filter(article_id=busiest).order_by('-created_at', '-id'),
+            {'article_id': busiest},
+        )
+
+    def compare(self, label, view, path, ordered, kwargs):
+        page_size = self.options['page_size']
+        total = ordered.count()
+        last_page = max(1, (total + page_size - 1) // page_size)
+        page = min(self.options['page'] or last_page, last_page)
+        self.stdout.write(f'\n{label}: {total} rows, page 1 vs page {page}')
+
+        requests = {
+            'page number, page 1': {'page_size': page_size},
+            f'page number, page {page}': {'page_size': page_size, 'page': page},
+            'keyset, page 1': {'page_size': page_size, 'pagination': 'cursor'},
+        }
+        offset = (page - 1) * page_size
+        if offset:
+            # Cursor pointing right after the last row of page N-1
+            anchor = ordered[offset - 1]
+            requests[f'keyset, page {page}'] = {
+                'page_size': page_size,
+                'cursor': KeysetPagination.encode_cursor(anchor),
+            }
+
+        for name, params in requests.items():
+            request = self.factory.get(path, params)
+            summary = measure(lambda: view(request, **kwargs).render(), runs=self.options['runs'])
+            self.stdout.write(format_summary(name, summary))
@@ -0,0 +1,55 @@
+"""
+Management command comparing the indexed article search with the legacy
+icontains search on the current database.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from articles.models import Article
+from articles.synthetic import SyntheticDataGenerator
+from articles.views import ArticleListCreateView
+from blog_project.benchmark import format_summary, measure
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ?search= latency (p50/p99) for indexed vs legacy search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--articles', type=int, default=0,
+            help='Top the corpus up to this many synthetic articles first (see generate_data)',
+        )
+        parser.add_argument('--runs', type=int, default=50)
+        parser.add_argument(
+            '--terms', nargs='+', default=['django', 'postgres index', 'latency'],
+        )
+
+    # Measure the views themselves, not the response cache or rate limits
+    @override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+    def handle(self, *args, **options):
+        if options['articles']:
+            self.top_up(options['articles'])
+
+        view = ArticleListCreateView.as_view()
+        factory = RequestFactory(HTTP_HOST='localhost')
+        self.stdout.write(f'Corpus: {Article.objects.count()} articles\n')
+
+        for term in options['terms']:
+            request = factory.get('/api/articles/', {'search': term})
+            for mode in ('legacy', 'auto'):
+                with override_settings(ARTICLE_SEARCH_BACKEND=mode):
+                    summary = measure(lambda: view(request).render(), runs=options['runs'])
+                self.stdout.write(format_summary(f'{mode:<7} search={term!r}', summary))
+
+    def top_up(self, target):
+        missing = target - Article.objects.count()
+        if missing <= 0:
+            return
+        self.stdout.write(f'Generating {missing} synthetic articles...')
+        generator = SyntheticDataGenerator(
+            users=0 if User.objects.filter(is_staff=True).exists() else 1,
+            articles=missing,
+            seed=42,
+        )
+        generator.run()
@@ -0,0 +1,149 @@
+"""
+Management command comparing two ways of loading comment threads:
+
+- per level: top-level comments, then one parent__in query per level of
+  replies (what a plain parent foreign key allows)
+- materialized path: the ?thread=true list (top-level comments, then all
+  their replies in one query on comment_thread_path_idx), also depth-limited
+  (?depth=), and a whole thread from /api/comments/<id>/thread/
+
+    python manage.py benchmark_threads --comments 10000 --depth 20
+
+An article with --comments comments in --threads threads is created for the
+run (every thread has a reply chain --depth levels deep, the other replies
+answer random comments above that depth) and rolled back afterwards.
+"""
+import random
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+
+from articles.models import Article
+from blog_project.benchmark import format_summary, measure
+from blog_project.middleware import QueryCounter
+from comments.models import MAX_THREAD_DEPTH, Comment, path_segment
+from comments.serializers import CommentThreadSerializer
+from comments.views import ArticleCommentListCreateView, CommentThreadView
+
+
+class Command(BaseCommand):
+    help = 'Benchmark loading comment threads per level vs with the materialized path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10000, help='Comments on the benchmark article')
+        parser.add_argument('--depth', type=int, default=20, help='Deepest reply level')
+        parser.add_argument('--threads', type=int, default=100, help='Top-level comments')
+        parser.add_argument('--page-size', type=int, default=10, help='Threads per page')
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    # Measure the views themselves, not the response cache or rate limits
+    @override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+    def handle(self, *args, **options):
+        if not 0 < options['depth'] <= MAX_THREAD_DEPTH:
+            raise CommandError(f'--depth must be between 1 and {MAX_THREAD_DEPTH}')
+        if options['comments'] < options['threads'] * (options['depth'] + 1):
+            raise CommandError('--comments is too small for a reply chain of --depth in every thread')
+        author = User.objects.order_by('pk').first()
+        if author is None:
+            raise CommandError('No users, run manage.py generate_data first.')
+        self.options = options
+
+        with transaction.atomic():
+            article = self.create_threads(author)
+            self.stdout.write(
+                f"article {article.pk}: {options['comments']} comments in {options['threads']} threads, "
+                f"depth {options['depth']}, {options['page_size']} threads per page"
+            )
+            self.run_benchmarks(article)
+            transaction.set_rollback(True)
+
+    def create_threads(self, author):
+        """Insert the comments level by level: a level's paths need its ids"""
+        options = self.options
+        rng = random.Random(options['seed'])
+        article = Article.objects.create(title='Thread benchmark', content='Thread benchmark', author=author)
+
+        # (thread, parent node or None, depth) per comment, parents first
+        nodes = []
+        per_thread = options['comments'] // options['threads']
+        for thread in range(options['threads']):
+            first = len(nodes)
+            nodes.append((thread, None, 0))
+            for depth in range(1, options['depth'] + 1):
+                nodes.append((thread, len(nodes) - 1, depth))
+            for _ in range(per_thread - options['depth'] - 1):
+                parent = rng.randrange(first, len(nodes))
+                while nodes[parent][2] >= options['depth']:
+                    parent = rng.randrange(first, len(nodes))
+                nodes.append((thread, parent, nodes[parent][2] + 1))
+
+        levels = defaultdict(list)
+        for index, (thread, parent, depth) in enumerate(nodes):
+            levels[depth].append(index)
+        comments = [None] * len(nodes)
+        for depth in sorted(levels):
+            batch = []
+            for index in levels[depth]:
+                parent = comments[nodes[index][1]] if depth else None
+                comment = Comment(
+                    article=article, author=author, content=f'Reply at depth {depth}',
+                    parent=parent, depth=depth,
+                    root_id=(parent.root_id or parent.pk) if parent else None,
+                )
+                comments[index] = comment
+                batch.append(comment)
+            Comment.objects.bulk_create(batch, batch_size=500)
+            if depth:
+                for comment in batch:
+                    comment.path = comment.parent.path + path_segment(comment.pk)
+                Comment.objects.bulk_update(batch, ['path'], batch_size=500)
+        Article.objects.filter(pk=article.pk).update(comment_count=len(comments))
+        return article
+
+    def run_benchmarks(self, article):
+        factory = RequestFactory(HTTP_HOST='localhost')
+        list_view = ArticleCommentListCreateView.as_view()
+        thread_view = CommentThreadView.as_view()
+        path = f'/api/articles/{article.pk}/comments/'
+        page_size = self.options['page_size']
+        top = Comment.objects.filter(article=article, parent__isnull=True).order_by('-created_at', '-id').first()
+
+        scenarios = {
+            'per level': lambda: self.per_level(article, page_size),
+            'materialized path': lambda: list_view(
+                factory.get(path, {'thread': 'true', 'page_size': page_size}), article_id=article.pk
+            ).render(),
+            'materialized path, ?depth=2': lambda: list_view(
+                factory.get(path, {'thread': 'true', 'page_size': page_size, 'depth': 2}), article_id=article.pk
+            ).render(),
+            'materialized path, one thread': lambda: thread_view(
+                factory.get(f'/api/comments/{top.pk}/thread/'), pk=top.pk
+            ).render(),
+        }
+        for name, func in scenarios.items():
+            with QueryCounter() as counter:
+                func()
+            summary = measure(func, runs=self.options['runs'], warmup=2)
+            self.stdout.write(f'{format_summary(name, summary)}  {counter.count:3d} queries')
+
+    def per_level(self, article, page_size):
+        """Nested threads of the first page, one query per level of replies"""
+        level = list(
+            Comment.objects.select_related('author')
+            .filter(article=article, parent__isnull=True)
+            .order_by('-created_at', '-id')[:page_size]
+        )
+        comments = []
+        while level:
+            comments.extend(level)
+            level = list(
+                Comment.objects.select_related('author')
+                .filter(parent__in=[comment.pk for comment in level])
+                .order_by('pk')
+            )
+        # Parents come before their replies, which is all the nesting needs
+        return CommentThreadSerializer(comments, many=True).data
@@ -0,0 +1,118 @@
+"""
+Management command measuring the cost of a rate limit check with each
+bucket store (see blog_project.throttling):
+
+- store: one consume() call (the token bucket itself)
+- DRF check: APIView.check_throttles() of an anonymous request, i.e. every
+  DEFAULT_THROTTLE_CLASSES throttle as a request pays for it
+
+    python manage.py benchmark_throttle --checks 100000 --keys 1000 --fail
+
+Checks cycle through --keys clients (IP addresses of the documentation
+range 192.0.2.0/24 and up for the DRF check). The cache store uses the
+default cache (CACHE_BACKEND). --fail exits with an error when a mean check
+takes more than --target-us microseconds.
+"""
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from blog_project.benchmark import percentile
+from blog_project.throttling import cache_store, local_store, parse_rate
+
+STORES = {'local': local_store, 'cache': cache_store}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rate limit checks (microseconds per check) with the local and cache bucket stores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=100000, help='Checks per scenario')
+        parser.add_argument('--keys', type=int, default=1000, help='Distinct clients')
+        parser.add_argument('--rate', default='600/min', help='Bucket rate of the store scenarios')
+        parser.add_argument('--stores', nargs='+', choices=STORES, default=list(STORES))
+        parser.add_argument('--target-us', type=float, default=50.0)
+        parser.add_argument('--fail', action='store_true', help='Exit with an error when a check misses the target')
+
+    def handle(self, *args, **options):
+        if not 0 < options['keys'] <= 65536:
+            raise CommandError('--keys must be between 1 and 65536')
+        rate = parse_rate(options['rate'])
+        if rate is None:
+            raise CommandError('--rate must be N/period')
+        self.options = options
+        self.stdout.write(f"default cache: {type(caches['default']).__name__}, "
+                          f"{options['checks']} checks over {options['keys']} clients")
+
+        missed = []
+        for name in options['stores']:
+            store = STORES[name]
+            for label, check in (
+                (f'{name} store', self.store_check(store, rate)),
+                (f'{name} store, DRF check', self.drf_check()),
+            ):
+                with override_settings(THROTTLE_ENABLED=True, THROTTLE_STORE=name):
+                    result = self.run(check)
+                self.stdout.write(
+                    f"{label:<24} mean={result['mean']:7.2f}us  p50={result['p50']:7.2f}us  "
+                    f"p99={result['p99']:7.2f}us  allowed={result['allowed']:6.1%}"
+                )
+                if result['mean'] > options['target_us']:
+                    missed.append(label)
+            local_store.clear()
+
+        if missed:
+            message = f"Over {options['target_us']}us per check: {', '.join(missed)}"
+            if options['fail']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Every check under {options['target_us']}us"))
+
+    def store_check(self, store, rate):
+        burst, interval = rate
+        keys = [f'benchmark:{index}' for index in range(self.options['keys'])]
+
+        def check(index):
+            return not store.consume(keys[index % len(keys)], burst, interval, time.time())
+        return check
+
+    def drf_check(self):
+        factory = RequestFactory()
+        requests = []
+        for index in range(self.options['keys']):
+            request = Request(factory.get('/', REMOTE_ADDR=f'192.0.{2 + index // 256}.{index % 256}'))
+            request.user  # authenticate up front (anonymous)
+            requests.append(request)
+        view = APIView()
+
+        def check(index):
+            try:
+                view.check_throttles(requests[index % len(requests)])
+            except Throttled:
+                return False
+            return True
+        return check
+
+    def run(self, check):
+        for index in range(min(1000, self.options['checks'])):
+            check(index)
+        samples = []
+        allowed = 0
+        clock = time.perf_counter
+        for index in range(self.options['checks']):
+            start = clock()
+            allowed += check(index)
+            samples.append(clock() - start)
+        micros = [sample * 1e6 for sample in samples]
+        return {
+            'mean': sum(micros) / len(micros) if micros else 0.0,
+            'p50': percentile(micros, 50),
+            'p99': percentile(micros, 99),
+            'allowed': allowed / len(micros) if micros else 0.0,
+        }
@@ -0,0 +1,184 @@
+"""
+Management command checking that every list access path is served by an
+index: it requests each combination of the filters, search and ordering
+fields the list views declare (plus the admin filters), runs EXPLAIN on
+every query they issue and flags
+
+- sequential scans of tables with at least --min-rows rows
+- sorts of paginated queries (LIMIT n > 1) that no index provides, except
+  for ranked search results
+
+    python manage.py generate_data --articles 20000 --comments 100000
+    python manage.py explain_indexes [--verbose] [--fail]
+"""
+import itertools
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from articles.models import Article, Tag
+from articles.synthetic import SyntheticDataGenerator
+from articles.views import ArticleListCreateView
+from comments.models import Comment
+from comments.views import ArticleCommentListCreateView
+
+SEQ_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'^SCAN (\w+)(?: AS \w+)?$'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY'),
+    'postgresql': re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b'),
+}
+
+# Page queries; LIMIT 1 is a lookup (first()) sorting at most a few rows
+PAGINATED = re.compile(r' LIMIT (?!1\b)\d+')
+
+
+def orderings(view_class):
+    """No ?ordering= (the default), then every declared field both ways"""
+    return [None] + [prefix + field for field in view_class.ordering_fields for prefix in ('', '-')]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every filter/search/ordering combination of the list views and flag sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help='Ignore sequential scans of tables smaller than this')
+        parser.add_argument('--search', default='django', help='Search term used for ?search=')
+        parser.add_argument('--articles', type=int, default=0,
+                            help='Top the corpus up to this many articles first (see generate_data)')
+        parser.add_argument('--verbose', action='store_true', help='Print the plan of every query')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error when something is flagged')
+
+    def handle(self, *args, **options):
+        missing = options['articles'] - Article.objects.count()
+        if missing > 0:
+            self.stdout.write(f'Generating {missing} synthetic articles...')
+            SyntheticDataGenerator(
+                users=0 if User.objects.filter(is_staff=True).exists() else 1,
+                articles=missing,
+                comments=missing * 5,
+                seed=42,
+            ).run()
+        if connection.vendor not in SEQ_SCAN_PATTERNS:
+            raise CommandError(f'Unsupported database: {connection.vendor}')
+        article = Article.objects.order_by('-comment_count', '-pk').first()
+        if article is None:
+            raise CommandError('No articles, run manage.py generate_data first.')
+
+        self.options = options
+        self.row_counts = {}
+        flagged = 0
+        with override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=False, PAGINATION_COUNT_CACHE_TIMEOUT=0,
+                               ALLOWED_HOSTS=['localhost'], DEBUG=False):
+            for name, client, path, params, ranked in self.scenarios(article):
+                issues = self.check_access_path(client, path, params, ranked)
+                label = f"{path}?{'&'.join(f'{k}={v}' for k, v in params.items())}".rstrip('?')
+                if issues:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f'FLAG {name:<10} {label}'))
+                    for issue in issues:
+                        self.stdout.write(f'       {issue}')
+                else:
+                    self.stdout.write(f'ok   {name:<10} {label}')
+
+        summary = f'{flagged} access path(s) flagged'
+        if flagged and options['fail']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.WARNING(summary) if flagged else self.style.SUCCESS(summary))
+
+    def scenarios(self, article):
+        """(name, client, path, params, ranked search) for every access path"""
+        client = Client(HTTP_HOST='localhost')
+        tag = Tag.objects.order_by('-article_count').values_list('name', flat=True).first()
+
+        filters = [{}]
+        if tag:
+            filters.append({'tag': tag})
+        searches = [{}]
+        if ArticleListCreateView.search_fields:
+            searches.append({'search': self.options['search']})
+        for filter_params, search_params, ordering in itertools.product(
+            filters, searches, orderings(ArticleListCreateView)
+        ):
+            params = {**filter_params, **search_params}
+            if ordering:
+                params['ordering'] = ordering
+            yield 'articles', client, '/api/articles/', params, 'search' in params
+        for filter_params in filters:
+            yield 'articles', client, '/api/articles/', {**filter_params, 'pagination': 'cursor'}, False
+
+        comments = f'/api/articles/{article.pk}/comments/'
+        for ordering in orderings(ArticleCommentListCreateView):
+            yield 'comments', client, comments, {'ordering': ordering} if ordering else {}, False
+        yield 'comments', client, comments, {'pagination': 'cursor'}, False
+        yield 'comments', client, comments, {'thread': 'true'}, False
+        yield 'comments', client, comments, {'thread': 'true', 'pagination': 'cursor'}, False
+        reply = Comment.objects.filter(parent__isnull=False).order_by('-depth').first()
+        if reply is not None:
+            yield 'comments', client, f'/api/comments/{reply.root_id}/thread/', {}, False
+            yield 'comments', client, f'/api/comments/{reply.parent_id}/thread/', {}, False
+
+        admin = User.objects.filter(is_superuser=True).first()
+        if admin is None:
+            self.stdout.write('No superuser: skipping the admin changelists')
+            return
+        admin_client = Client(HTTP_HOST='localhost')
+        admin_client.force_login(admin)
+        year = article.created_at.year
+        for path, author_id in (
+            ('/admin/articles/article/', article.author_id),
+            ('/admin/comments/comment/', Comment.objects.values_list('author_id', flat=True).first()),
+        ):
+            yield 'admin', admin_client, path, {}, False
+            yield 'admin', admin_client, path, {'author__id__exact': author_id}, False
+            yield 'admin', admin_client, path, {'created_at__year': year}, False
+
+    def check_access_path(self, client, path, params, ranked):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(path, params)
+        if response.status_code != 200:
+            return [f'HTTP {response.status_code}']
+
+        issues = []
+        for query in captured.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = self.explain(sql)
+            if self.options['verbose']:
+                self.stdout.write(f'     {sql[:160]}')
+                for line in plan:
+                    self.stdout.write(f'       | {line}')
+            for line in plan:
+                match = SEQ_SCAN_PATTERNS[connection.vendor].search(line)
+                if match and self.row_count(match.group(1)) >= self.options['min_rows']:
+                    issues.append(f'sequential scan of {match.group(1)} '
+                                  f'({self.row_count(match.group(1)):,} rows): {sql[:120]}')
+                if not ranked and PAGINATED.search(sql) and SORT_PATTERNS[connection.vendor].search(line):
+                    issues.append(f'sort without an index: {sql[:120]}')
+        return issues
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            rows = cursor.fetchall()
+        # SQLite: (id, parent, notused, detail); PostgreSQL: one line per row
+        return [row[-1] for row in rows]
+
+    def row_count(self, table):
+        if table not in self.row_counts:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [table])
+                else:
+                    cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                row = cursor.fetchone()
+            self.row_counts[table] = int(row[0]) if row else 0
+        return self.row_counts[table]
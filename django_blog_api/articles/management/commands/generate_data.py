@@ -0,0 +1,125 @@
+"""
+Management command generating synthetic users, articles and comments,
+from a small development dataset up to millions of rows for capacity tests.
+Replaces the former seed and seed_data commands.
+"""
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from articles.models import Article, ArticleTag, Tag
+from articles.search import get_search_backend
+from articles.synthetic import SyntheticDataGenerator
+from blog_project.invalidation import bump_generation
+from comments.models import Comment
+
+DEMO_ACCOUNTS = [
+    {'username': 'admin', 'email': 'admin@example.com', 'password': 'admin123',
+     'is_staff': True, 'is_superuser': True},
+    {'username': 'testuser', 'email': 'test@example.com', 'password': 'testpass123',
+     'first_name': 'Test', 'last_name': 'User'},
+    {'username': 'reg', 'email': 'reg@example.com', 'password': 'reg!1234',
+     'first_name': 'Regular', 'last_name': 'User'},
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, articles and comments (bulk inserts, deterministic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--articles', type=int, default=100)
+        parser.add_argument('--comments', type=int, default=500)
+        parser.add_argument('--staff-ratio', type=float, default=0.02,
+                            help='Share of the generated users that are staff (article authors)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help='Same seed, same data')
+        parser.add_argument('--password', default='password',
+                            help='Password of every generated user (hashed once)')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread creation dates over this many past days')
+        parser.add_argument('--copy', action='store_true',
+                            help='Use COPY FROM STDIN instead of INSERTs (PostgreSQL only)')
+        parser.add_argument('--no-search-index', action='store_true',
+                            help='Skip indexing (run rebuild_search_index afterwards)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete all articles, comments and non-superusers first')
+
+    def handle(self, *args, **options):
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy is only supported on PostgreSQL.')
+
+        if options['clear']:
+            self.clear()
+        self.create_demo_accounts()
+
+        generator = SyntheticDataGenerator(
+            users=options['users'],
+            articles=options['articles'],
+            comments=options['comments'],
+            staff_ratio=options['staff_ratio'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            password=options['password'],
+            days=options['days'],
+            use_copy=options['copy'],
+            index=not options['no_search_index'],
+            progress=self.report,
+        )
+        try:
+            result = generator.run()
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        rows = result['users'] + result['articles'] + result['comments']
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {result['users']:,} users, {result['articles']:,} articles and "
+            f"{result['comments']:,} comments in {result['seconds']:.1f}s "
+            f"({rows / result['seconds'] if result['seconds'] else 0:,.0f} rows/s)"
+        ))
+        self.stdout.write(
+            f'Totals: {User.objects.count():,} users, {Article.objects.count():,} articles, '
+            f'{Comment.objects.count():,} comments'
+        )
+        self.stdout.write('\nCredentials:')
+        for account in DEMO_ACCOUNTS:
+            self.stdout.write(f"  {account['username']} / {account['password']}")
+        if options['users']:
+            self.stdout.write(f"  synthetic users: syntheticN / {options['password']}")
+
+    def report(self, label, done, total, rate):
+        self.stdout.write(f'  {label:<9} {done:>12,}/{total:,}  ({rate:,.0f}/s)')
+
+    def create_demo_accounts(self):
+        """The few fixed accounts documented in the README (idempotent)"""
+        for account in DEMO_ACCOUNTS:
+            account = dict(account)
+            password = account.pop('password')
+            user, created = User.objects.get_or_create(username=account.pop('username'), defaults=account)
+            if created:
+                user.set_password(password)
+                user.save(update_fields=['password'])
+
+    def clear(self):
+        self.stdout.write(self.style.WARNING('Clearing existing data...'))
+        with transaction.atomic():
+            # Raw deletes (the private QuerySet._raw_delete(), the ORM's only
+            # single-statement DELETE): QuerySet.delete() would load every row
+            # and send its signals, a few queries per row. A wholesale reset
+            # of the data needs none of their per-row work (comment events,
+            # token revocations); tag counts, search documents and cache
+            # generations are reset here instead.
+            Comment.objects.all()._raw_delete(Comment.objects.db)
+            ArticleTag.objects.all()._raw_delete(ArticleTag.objects.db)
+            Article.objects.all()._raw_delete(Article.objects.db)
+            Tag.objects.update(article_count=0)
+            users = User.objects.filter(is_superuser=False)
+            # Children first, the database does not cascade for us
+            for model in (LogEntry, User.groups.through, User.user_permissions.through):
+                model.objects.filter(user__in=users)._raw_delete(model.objects.db)
+            users._raw_delete(User.objects.db)
+            backend = get_search_backend()
+            if backend is not None:
+                backend.clear()
+        bump_generation('articles.article', 'articles.tag', 'comments.comment', 'auth.user')
@@ -0,0 +1,69 @@
+"""
+Management command load-testing the public GET endpoints with and without
+the response cache, reporting requests/sec, latency percentiles and the
+cache hit ratio. Optionally interleaves writes to show invalidation at work.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from articles.models import Article
+from blog_project.benchmark import format_summary, summarize
+from blog_project.response_cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec of the public endpoints with and without the response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--urls', type=int, default=50,
+                            help='Number of distinct URLs the requests are spread over')
+        parser.add_argument('--write-every', type=int, default=0,
+                            help='Touch a random article every N requests (0 = read only)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        article_ids = list(Article.objects.values_list('pk', flat=True)[:max(options['urls'], 1)])
+        if not article_ids:
+            raise CommandError('No articles, run manage.py generate_data first.')
+
+        rng = random.Random(options['seed'])
+        urls = self.build_urls(article_ids, options['urls'], rng)
+        sequence = [rng.choice(urls) for _ in range(options['requests'])]
+
+        for label, enabled in (('no cache', False), ('response cache', True)):
+            with override_settings(THROTTLE_ENABLED=False, RESPONSE_CACHE_ENABLED=enabled):
+                self.run(label, sequence, article_ids, options['write_every'], rng)
+
+    def build_urls(self, article_ids, count, rng):
+        urls = ['/api/articles/', '/api/articles/?page=2', '/api/articles/?pagination=cursor']
+        while len(urls) < count:
+            pk = rng.choice(article_ids)
+            urls.append(rng.choice([f'/api/articles/{pk}/', f'/api/articles/{pk}/comments/']))
+        return urls
+
+    def run(self, label, sequence, article_ids, write_every, rng):
+        client = Client(HTTP_HOST='localhost')
+        reset_stats()
+        timings = []
+        started = time.perf_counter()
+        for number, url in enumerate(sequence, 1):
+            if write_every and number % write_every == 0:
+                # The save signals invalidate the cached responses of that article and the lists
+                Article.objects.get(pk=rng.choice(article_ids)).save(update_fields=['title'])
+            begin = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - begin)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(format_summary(label, summarize(timings)))
+        stats = get_stats()
+        self.stdout.write(
+            f'    {len(sequence) / elapsed:,.0f} requests/sec, '
+            f'{stats["hits"]} hits / {stats["misses"]} misses'
+        )
@@ -0,0 +1,20 @@
+"""
+Management command to rebuild the article full-text search index.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from articles.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every article'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            raise CommandError('No full-text search backend for this database.')
+        total = backend.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Indexed {total} articles'))
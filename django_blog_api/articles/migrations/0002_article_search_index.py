@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import migrations
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE IF NOT EXISTS articles_article_search (
+        article_id bigint PRIMARY KEY
+            REFERENCES articles_article (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS articles_article_search_document_gin '
+    'ON articles_article_search USING gin (document)',
+]
+# Backfill documents for the existing articles
+POSTGRES_BACKFILL = """
+    INSERT INTO articles_article_search (article_id, document)
+    SELECT a.id,
+        setweight(to_tsvector(%s::regconfig, a.title), 'A') ||
+        setweight(to_tsvector(%s::regconfig, a.tags), 'B') ||
+        setweight(to_tsvector(%s::regconfig, u.username), 'B') ||
+        setweight(to_tsvector(%s::regconfig, a.content), 'C')
+    FROM articles_article a JOIN auth_user u ON u.id = a.author_id
+"""
+POSTGRES_DROP = ['DROP TABLE IF EXISTS articles_article_search']
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_article_fts "
+    "USING fts5(title, content, tags, author, tokenize='unicode61')",
+    """
+    INSERT INTO articles_article_fts (rowid, title, content, tags, author)
+    SELECT a.id, a.title, a.content, a.tags, u.username
+    FROM articles_article a JOIN auth_user u ON u.id = a.author_id
+    """,
+]
+SQLITE_DROP = ['DROP TABLE IF EXISTS articles_article_fts']
+
+
+def postgres_create():
+    # Documents must use the text-search configuration the runtime queries
+    # and reindexing use (articles/search.py PostgresSearchBackend.config)
+    config = getattr(settings, 'ARTICLE_SEARCH_CONFIG', 'english')
+    return [*POSTGRES_CREATE, (POSTGRES_BACKFILL, [config] * 4)]
+
+
+def run_statements(schema_editor, statements_by_vendor):
+    """Statements are SQL strings or (sql, params) pairs"""
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        sql, params = statement if isinstance(statement, tuple) else (statement, ())
+        schema_editor.execute(sql, params)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, {
+        'postgresql': postgres_create(),
+        'sqlite': SQLITE_CREATE,
+    })
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, {
+        'postgresql': POSTGRES_DROP,
+        'sqlite': SQLITE_DROP,
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
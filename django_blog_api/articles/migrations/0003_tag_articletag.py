@@ -0,0 +1,83 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def split_tag_strings(apps, schema_editor):
+    """Turn every comma-separated Article.tags string into Tag rows"""
+    Article = apps.get_model('articles', 'Article')
+    Tag = apps.get_model('articles', 'Tag')
+    ArticleTag = apps.get_model('articles', 'ArticleTag')
+
+    tag_ids = {}
+    links = []
+    counts = {}
+    for article_id, value in Article.objects.values_list('id', 'tags').iterator():
+        names = []
+        for name in (value or '').split(','):
+            name = name.strip().lower()[:50]
+            if name and name not in names:
+                names.append(name)
+        for name in names:
+            if name not in tag_ids:
+                tag_ids[name] = Tag.objects.create(name=name).pk
+            links.append(ArticleTag(article_id=article_id, tag_id=tag_ids[name]))
+            counts[name] = counts.get(name, 0) + 1
+
+    ArticleTag.objects.bulk_create(links, batch_size=1000)
+    for name, count in counts.items():
+        Tag.objects.filter(pk=tag_ids[name]).update(article_count=count)
+
+
+def join_tag_strings(apps, schema_editor):
+    """Reverse: write the tag names back into the CharField"""
+    Article = apps.get_model('articles', 'Article')
+    ArticleTag = apps.get_model('articles', 'ArticleTag')
+
+    names = {}
+    for article_id, name in ArticleTag.objects.order_by('id').values_list('article_id', 'tag__name'):
+        names.setdefault(article_id, []).append(name)
+    for article_id, article_names in names.items():
+        Article.objects.filter(pk=article_id).update(tags=','.join(article_names)[:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0002_article_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('article_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_tags', to='articles.article')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_tags', to='articles.tag')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='articletag',
+            constraint=models.UniqueConstraint(fields=('tag', 'article'), name='articles_articletag_unique'),
+        ),
+        migrations.RunPython(split_tag_strings, join_tag_strings),
+        migrations.RemoveField(
+            model_name='article',
+            name='tags',
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='articles', through='articles.ArticleTag', to='articles.tag'),
+        ),
+    ]
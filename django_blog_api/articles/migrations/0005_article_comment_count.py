@@ -0,0 +1,43 @@
+# Generated by Django 4.2.9 on 2026-10-18 08:06
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    Comment = apps.get_model('comments', 'Comment')
+    per_article = Comment.objects.filter(article_id=OuterRef('pk')).order_by().values('article_id')
+    Article.objects.update(
+        comment_count=Coalesce(
+            Subquery(per_article.annotate(n=Count('pk')).values('n'), output_field=IntegerField()), 0
+        ),
+        last_commented_at=Subquery(per_article.annotate(latest=Max('created_at')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_article_created_id_idx'),
+        ('comments', '0002_comment_article_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='last_commented_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-comment_count', '-id'], name='article_comment_count_idx'),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.9 on 2026-10-18 08:08
+
+import math
+
+from django.db import migrations, models
+
+# Frozen copies of articles.models.make_excerpt/estimate_reading_time as of
+# this migration: later changes to them must not change what it backfills
+
+EXCERPT_LENGTH = 150
+WORDS_PER_MINUTE = 200
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    text = ' '.join(content.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(' ', 1)[0] + '...'
+
+
+def estimate_reading_time(content):
+    return max(1, math.ceil(len(content.split()) / WORDS_PER_MINUTE))
+
+
+def backfill_summaries(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    batch = []
+    for article in Article.objects.only('id', 'content').iterator(chunk_size=1000):
+        article.excerpt = make_excerpt(article.content)
+        article.reading_time = estimate_reading_time(article.content)
+        batch.append(article)
+        if len(batch) >= 1000:
+            Article.objects.bulk_update(batch, ['excerpt', 'reading_time'])
+            batch = []
+    Article.objects.bulk_update(batch, ['excerpt', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
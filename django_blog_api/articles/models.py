@@ -1,5 +1,55 @@
+import math
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.dispatch import Signal
+from django.utils import timezone
+
+# Sent with the article after its tags were replaced via Article.set_tags()
+tags_changed = Signal()
+
+EXCERPT_LENGTH = 150
+WORDS_PER_MINUTE = 200
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """Plain-text preview of the content, cut on a word boundary"""
+    text = ' '.join(content.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(' ', 1)[0] + '...'
+
+
+def estimate_reading_time(content):
+    """Reading time in whole minutes (at least 1)"""
+    return max(1, math.ceil(len(content.split()) / WORDS_PER_MINUTE))
+
+
+def parse_tags(value):
+    """
+    Normalize tags given as a comma-separated string (or a list of names):
+    stripped, lowercased, de-duplicated, in their original order.
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    names = []
+    for name in value:
+        name = str(name).strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class Tag(models.Model):
+    """Normalized article tag with a precomputed number of tagged articles"""
+    name = models.CharField(max_length=50, unique=True)
+    article_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
 
 
 class Article(models.Model):
@@ -9,13 +59,103 @@ class Article(models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='articles'
+        related_name='articles',
+        # Covered by article_author_created_idx
+        db_index=False,
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    tags = models.CharField(max_length=255, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+    # Precomputed from content on save, so lists never need to load it
+    excerpt = models.CharField(max_length=200, blank=True, default='', editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False)
+    # Denormalized from comments, maintained by the comment signals
+    comment_count = models.PositiveIntegerField(default=0)
+    last_commented_at = models.DateTimeField(null=True, blank=True)
+    tags = models.ManyToManyField(
+        Tag,
+        through='ArticleTag',
+        related_name='articles',
+        blank=True
+    )
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Backs keyset pagination on (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='article_created_id_idx'),
+            # "Most discussed" listings (?ordering=-comment_count)
+            models.Index(fields=['-comment_count', '-id'], name='article_comment_count_idx'),
+            # ?ordering=title
+            models.Index(fields=['title', 'id'], name='article_title_idx'),
+            # An author's articles, newest first (admin author filter)
+            models.Index(fields=['author', '-created_at', '-id'], name='article_author_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        """Refresh the excerpt and reading time whenever content is saved"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.refresh_summary()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt', 'reading_time'}
+        super().save(*args, **kwargs)
+
+    def refresh_summary(self):
+        """Recompute the fields derived from content"""
+        self.excerpt = make_excerpt(self.content)
+        self.reading_time = estimate_reading_time(self.content)
+
+    @property
+    def tag_string(self):
+        """Tags as the comma-separated string the API has always exposed"""
+        return ', '.join(tag.name for tag in self.tags.all())
+
+    def set_tags(self, names):
+        """Replace the article's tags with the given names"""
+        names = parse_tags(names)
+        current = {tag.name: tag for tag in self.tags.all()}
+
+        removed = [tag.pk for name, tag in current.items() if name not in names]
+        if removed:
+            ArticleTag.objects.filter(article=self, tag_id__in=removed).delete()
+
+        added = [name for name in names if name not in current]
+        for name in added:
+            tag, _ = Tag.objects.get_or_create(name=name)
+            ArticleTag.objects.create(article=self, tag=tag)
+
+        if removed or added:
+            # Tags are part of the representation, so a retag counts as an update
+            self.updated_at = timezone.now()
+            Article.objects.filter(pk=self.pk).update(updated_at=self.updated_at)
+
+        # Drop any prefetched tags so tag_string reflects the new set
+        getattr(self, '_prefetched_objects_cache', {}).pop('tags', None)
+        tags_changed.send(sender=Article, instance=self)
+
+
+class ArticleTag(models.Model):
+    """Through table between articles and tags"""
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name='article_tags'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='article_tags'
+    )
+
+    class Meta:
+        constraints = [
+            # (tag, article) also serves ?tag= lookups as an index-only scan
+            models.UniqueConstraint(fields=['tag', 'article'], name='articles_articletag_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id}:{self.tag_id}'
+
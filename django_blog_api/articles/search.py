@@ -0,0 +1,213 @@
+"""
+Full-text search backends for articles
+
+Instead of running ILIKE '%term%' over every article column, each article
+gets a precomputed search document stored in an indexed structure that
+depends on the database in use:
+
+- PostgreSQL: ``articles_article_search`` table with a ``tsvector`` column
+  and a GIN index
+- SQLite: ``articles_article_fts`` FTS5 virtual table
+
+Documents are kept in sync by the Article save/delete signals (see signals.py)
+and can be rebuilt with ``python manage.py rebuild_search_index``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Article
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(terms):
+    """Split raw search terms into plain word tokens (no query syntax)"""
+    tokens = []
+    for term in terms:
+        tokens.extend(TOKEN_RE.findall(term.lower()))
+    return tokens
+
+
+def article_id_column():
+    return f'"{Article._meta.db_table}"."id"'
+
+
+def build_document(article):
+    """Return the searchable text of an article, one entry per column"""
+    return {
+        'title': article.title,
+        'content': article.content,
+        'tags': article.tag_string,
+        'author': article.author.username,
+    }
+
+
+class BaseSearchBackend:
+    """
+    Interface shared by all search backends.
+    `search()` must join the queryset with the search documents, filter it
+    and select a `search_rank` column (higher is more relevant).
+    """
+    table = None
+
+    def index(self, articles):
+        raise NotImplementedError
+
+    def remove(self, article_ids):
+        raise NotImplementedError
+
+    def search(self, queryset, terms):
+        raise NotImplementedError
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def rebuild(self, batch_size=1000):
+        """Reindex every article, returns the number of indexed articles"""
+        self.clear()
+        total = 0
+        batch = []
+        articles = Article.objects.select_related('author').prefetch_related('tags').order_by('pk')
+        for article in articles.iterator(chunk_size=batch_size):
+            batch.append(article)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self.index(batch)
+            total += len(batch)
+        return total
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector documents with weighted columns, ranked with ts_rank_cd"""
+    table = 'articles_article_search'
+
+    @property
+    def config(self):
+        return getattr(settings, 'ARTICLE_SEARCH_CONFIG', 'english')
+
+    def index(self, articles):
+        rows = []
+        for article in articles:
+            doc = build_document(article)
+            rows.append((
+                article.pk,
+                self.config, doc['title'],
+                self.config, doc['tags'],
+                self.config, doc['author'],
+                self.config, doc['content'],
+            ))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"""
+                INSERT INTO {self.table} (article_id, document) VALUES (
+                    %s,
+                    setweight(to_tsvector(%s::regconfig, %s), 'A') ||
+                    setweight(to_tsvector(%s::regconfig, %s), 'B') ||
+                    setweight(to_tsvector(%s::regconfig, %s), 'B') ||
+                    setweight(to_tsvector(%s::regconfig, %s), 'C')
+                )
+                ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                rows,
+            )
+
+    def remove(self, article_ids):
+        # Rows are also removed by the ON DELETE CASCADE foreign key
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE article_id = ANY(%s)',
+                [list(article_ids)],
+            )
+
+    def search(self, queryset, terms):
+        tokens = tokenize(terms)
+        if not tokens:
+            return queryset.none()
+        # Prefix matching keeps the behaviour close to the old substring search
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        tsquery = 'to_tsquery(%s::regconfig, %s)'
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'{self.table}.article_id = {article_id_column()}',
+                f'{self.table}.document @@ {tsquery}',
+            ],
+            params=[self.config, query],
+            select={'search_rank': f'ts_rank_cd({self.table}.document, {tsquery})'},
+            select_params=[self.config, query],
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 virtual table keyed by article id, ranked with bm25"""
+    table = 'articles_article_fts'
+    # bm25 column weights: title, content, tags, author
+    weights = '10.0, 1.0, 5.0, 5.0'
+
+    def index(self, articles):
+        rows = []
+        for article in articles:
+            doc = build_document(article)
+            rows.append((
+                article.pk, doc['title'], doc['content'], doc['tags'], doc['author'],
+            ))
+        if not rows:
+            return
+        self.remove([row[0] for row in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, content, tags, author) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, article_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk in article_ids],
+            )
+
+    def search(self, queryset, terms):
+        tokens = tokenize(terms)
+        if not tokens:
+            return queryset.none()
+        # Quoted prefix tokens, implicitly AND-ed by FTS5
+        match = ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                # Unary + hides the rowid from the planner: the MATCH drives the
+                # join instead of being re-run for every row of the other tables
+                # (a count with ?tag= took seconds instead of milliseconds)
+                f'+{self.table}.rowid = {article_id_column()}',
+                f'{self.table} MATCH %s',
+            ],
+            params=[match],
+            select={'search_rank': f'-bm25({self.table}, {self.weights})'},
+        )
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Return the search backend for the current database, or None when the
+    legacy icontains search is configured or the database is not supported.
+    """
+    if getattr(settings, 'ARTICLE_SEARCH_BACKEND', 'auto') == 'legacy':
+        return None
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
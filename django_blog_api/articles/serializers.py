@@ -1,15 +1,175 @@
 """
 Article serializers
 """
+from collections import Counter
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import Article
+from blog_project.fieldsets import DynamicFieldsMixin
+from . import bulk
+from .models import Article, Tag, parse_tags
+
+
+class TagListField(serializers.Field):
+    """
+    Tags as a comma-separated string ("django, python"), which is what the
+    client has always sent and rendered. Lists of names are accepted too.
+    """
+    default_error_messages = {
+        'invalid': 'Expected a comma-separated string or a list of tag names.',
+        'max_length': 'Tag names must be at most {max_length} characters.',
+    }
+
+    def to_representation(self, value):
+        return ', '.join(tag.name for tag in value.all())
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, list)):
+            self.fail('invalid')
+        names = parse_tags(data)
+        max_length = Tag._meta.get_field('name').max_length
+        if any(len(name) > max_length for name in names):
+            self.fail('max_length', max_length=max_length)
+        return names
+
+
+class ArticleListSerializer(serializers.ListSerializer):
+    """
+    List-mode ArticleSerializer (many=True) saving with bulk queries.
+    For updates, the instance is the list of articles matching the data items.
+    """
 
+    def create(self, validated_data):
+        return bulk.create_articles(validated_data)
 
-class ArticleSerializer(serializers.ModelSerializer):
-    """Serializer for Article model"""
+    def update(self, instance, validated_data):
+        return bulk.update_articles(instance, validated_data)
+
+
+class ArticleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Serializer for Article model (supports ?fields= and ?exclude=)"""
     author = serializers.CharField(source='author.username', read_only=True)
+    tags = TagListField(required=False)
     
     class Meta:
         model = Article
-        fields = ['id', 'title', 'content', 'author', 'created_at', 'tags']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'title', 'content', 'excerpt', 'reading_time', 'author', 'created_at',
+            'updated_at', 'tags', 'comment_count', 'last_commented_at',
+        ]
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'excerpt', 'reading_time', 'comment_count',
+            'last_commented_at',
+        ]
+        list_serializer_class = ArticleListSerializer
+
+    def create(self, validated_data):
+        tags = validated_data.pop('tags', [])
+        article = super().create(validated_data)
+        article.set_tags(tags)
+        return article
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        article = super().update(instance, validated_data)
+        if tags is not None:
+            article.set_tags(tags)
+        return article
+
+
+class ArticleSummarySerializer(ArticleSerializer):
+    """Article without its full content, for list responses"""
+
+    class Meta(ArticleSerializer.Meta):
+        fields = [field for field in ArticleSerializer.Meta.fields if field != 'content']
+        read_only_fields = fields
+
+
+class ArticleBulkSerializer(serializers.Serializer):
+    """
+    Batch of article writes:
+    {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}
+    Updates are partial. Errors are reported per item, in request order.
+    """
+
+    def get_fields(self):
+        # Declared here because the field names clash with Serializer.create()/update()
+        return {
+            'create': serializers.ListField(child=serializers.DictField(), required=False),
+            'update': serializers.ListField(child=serializers.DictField(), required=False),
+            'delete': serializers.ListField(child=serializers.IntegerField(min_value=1), required=False),
+        }
+
+    def validate(self, attrs):
+        creates, updates, deletes = attrs.get('create', []), attrs.get('update', []), attrs.get('delete', [])
+        max_items = settings.ARTICLE_BULK_MAX_ITEMS
+        if len(creates) + len(updates) + len(deletes) > max_items:
+            raise serializers.ValidationError(f'A batch can contain at most {max_items} items.')
+
+        errors = {}
+        self.create_serializer = ArticleSerializer(data=creates, many=True, context=self.context)
+        if not self.create_serializer.is_valid():
+            errors['create'] = self.create_serializer.errors
+
+        # Counted once: batches may hold thousands of items
+        update_ids = [item.get('id') for item in updates]
+        update_counts = Counter(pk for pk in update_ids if isinstance(pk, int))
+        delete_counts = Counter(deletes)
+        articles = Article.objects.in_bulk(list(update_counts))
+        update_errors = [{} for _ in updates]
+        for index, pk in enumerate(update_ids):
+            if not isinstance(pk, int) or pk not in articles:
+                update_errors[index]['id'] = ['Article not found.']
+            elif update_counts[pk] > 1:
+                update_errors[index]['id'] = ['Article is updated more than once.']
+            elif pk in delete_counts:
+                update_errors[index]['id'] = ['Article is also deleted in this batch.']
+        self.update_serializer = ArticleSerializer(
+            [articles.get(pk) for pk in update_ids],
+            data=[{key: value for key, value in item.items() if key != 'id'} for item in updates],
+            many=True,
+            partial=True,
+            context=self.context,
+        )
+        if not self.update_serializer.is_valid():
+            for index, item_errors in enumerate(self.update_serializer.errors):
+                update_errors[index].update(item_errors)
+        if any(update_errors):
+            errors['update'] = update_errors
+
+        existing = set(Article.objects.filter(pk__in=list(delete_counts)).values_list('pk', flat=True))
+        delete_errors = [{} for _ in deletes]
+        for index, pk in enumerate(deletes):
+            if pk not in existing:
+                delete_errors[index]['id'] = ['Article not found.']
+            elif delete_counts[pk] > 1:
+                delete_errors[index]['id'] = ['Article is deleted more than once.']
+        if any(delete_errors):
+            errors['delete'] = delete_errors
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        """Apply the whole batch, returns the per-item results"""
+        author = validated_data['author']
+        created = self.create_serializer.save(author=author) if validated_data.get('create') else []
+        updated = self.update_serializer.save() if validated_data.get('update') else []
+        deletes = validated_data.get('delete', [])
+        if deletes:
+            bulk.delete_articles(deletes)
+        return {
+            'create': [{'id': article.pk, 'status': 201} for article in created],
+            'update': [{'id': article.pk, 'status': 200} for article in updated],
+            'delete': [{'id': pk, 'status': 204} for pk in deletes],
+        }
+
+
+class TagSerializer(serializers.ModelSerializer):
+    """Serializer for Tag model"""
+
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'article_count']
+        read_only_fields = fields
@@ -0,0 +1,74 @@
+"""
+Signal handlers for articles
+"""
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog_project.invalidation import bump_generation
+from .models import Article, ArticleTag, Tag, tags_changed
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, raw=False, **kwargs):
+    """Keep the article's search document in sync after every save"""
+    backend = get_search_backend()
+    if backend is not None and not raw:
+        backend.index([instance])
+
+
+@receiver(tags_changed, sender=Article)
+def reindex_retagged_article(sender, instance, **kwargs):
+    """Tags are part of the search document"""
+    backend = get_search_backend()
+    if backend is not None:
+        backend.index([instance])
+
+
+@receiver(post_delete, sender=Article)
+def unindex_article(sender, instance, **kwargs):
+    """Drop the search document of a deleted article"""
+    backend = get_search_backend()
+    if backend is not None:
+        backend.remove([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def reindex_author_articles(sender, instance, created, update_fields=None, **kwargs):
+    """The author's username is part of the search document"""
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    backend = get_search_backend()
+    if backend is not None:
+        backend.index(instance.articles.select_related('author').prefetch_related('tags'))
+
+
+@receiver(post_save, sender=ArticleTag)
+def increment_tag_count(sender, instance, created, raw=False, **kwargs):
+    """Keep Tag.article_count up to date without COUNT queries"""
+    if created and not raw:
+        Tag.objects.filter(pk=instance.tag_id).update(article_count=F('article_count') + 1)
+
+
+@receiver(post_delete, sender=ArticleTag)
+def decrement_tag_count(sender, instance, **kwargs):
+    """Also runs for the tag links removed when an article is deleted"""
+    Tag.objects.filter(pk=instance.tag_id).update(article_count=F('article_count') - 1)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(tags_changed, sender=Article)
+def invalidate_article_caches(sender, instance, **kwargs):
+    """Cached article counts and responses are stale after any article write"""
+    bump_generation('articles.article', 'articles.tag', f'article:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_caches(sender, instance, created, update_fields=None, **kwargs):
+    """Cached responses embed the author's username"""
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    bump_generation('auth.user')
@@ -0,0 +1,304 @@
+"""
+Synthetic data for capacity testing and benchmarks
+
+SyntheticDataGenerator writes users, articles (with tags) and comments in
+batches, with bulk_create() or, on PostgreSQL, with COPY. Sizes loosely
+follow a real blog:
+
+- article and comment lengths are log-normal (median ~400 and ~25 words)
+- a few staff users write the articles, every user may comment, and the
+  most active commenters write most of the comments (Zipf)
+- a few articles get most of the comments, a few tags are on most articles
+
+The output only depends on the seed (timestamps are relative to `now`).
+Denormalized counters (comment_count, last_commented_at, Tag.article_count)
+are computed while generating, so no recount is needed afterwards.
+"""
+import io
+import itertools
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog_project.invalidation import bump_generation
+from comments.models import Comment
+from .bulk import apply_tag_count_deltas, get_or_create_tags, reindex
+from .models import Article, ArticleTag
+
+TOPIC_WORDS = (
+    'django python api rest query index search database postgres sqlite cache latency '
+    'throughput server client react model view serializer token session request response '
+    'pagination cursor filter ordering migration schema table column transaction lock '
+    'replica backup deploy docker container kubernetes cluster node worker queue async '
+    'thread process memory cpu disk network socket http json payload header cookie '
+    'browser frontend backend component hook state render template static media upload '
+    'test fixture mock coverage benchmark profile trace metric log alert incident '
+    'release version branch merge review commit refactor design pattern service domain '
+    'user account password login permission role admin staff author reader comment '
+    'article post blog tag category feed archive draft publish edit delete update create'
+).split()
+VOCABULARY = TOPIC_WORDS + 'the a an of to in for with on at by from and or but not is are was be this that it'.split()
+
+TAGS = (
+    'django python javascript react api rest postgresql database performance devops '
+    'docker tutorial testing security architecture frontend backend css typescript '
+    'kubernetes cloud aws linux git career productivity design ux mobile android ios '
+    'rust go java kotlin swift ruby rails php laravel node vue angular svelte graphql '
+    'microservices caching search monitoring observability ci cd sql nosql redis'
+).split()
+
+FIRST_NAMES = 'Ada Alan Grace Linus Guido Barbara Ken Dennis Margaret Tim Radia Donald Edsger Frances John'.split()
+LAST_NAMES = 'Lovelace Turing Hopper Torvalds Rossum Liskov Thompson Ritchie Hamilton Berners-Lee Perlman Knuth'.split()
+
+SENTENCE_POOL = 2000
+WORDS_PER_SENTENCE = 12
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """Cumulative weights for random.choices(): rank r gets weight 1/r**exponent"""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def lognormal_int(rng, median, sigma, low, high):
+    return int(min(max(rng.lognormvariate(math.log(median), sigma), low), high))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create() keep the generated created_at/updated_at instead of now()"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def copy_value(value):
+    """Encode a value for COPY ... FROM STDIN in text format"""
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+class BulkCreateWriter:
+    """Inserts rows with bulk_create(), primary keys end up on the objects"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+
+    def write(self, model, objects):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Old SQLite: hand out the keys ourselves (we are the only writer)
+            start = (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for pk, obj in enumerate(objects, start):
+                obj.pk = pk
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+
+class CopyWriter:
+    """
+    PostgreSQL COPY ... FROM STDIN, several times faster than multi-row
+    INSERTs. Primary keys are reserved from the table's sequence first.
+    """
+
+    def write(self, model, objects):
+        opts = model._meta
+        fields = opts.concrete_fields
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [opts.db_table, opts.pk.column, len(objects)],
+            )
+            for obj, (pk,) in zip(objects, cursor.fetchall()):
+                obj.pk = pk
+
+            buffer = io.StringIO()
+            for obj in objects:
+                buffer.write('\t'.join(
+                    copy_value(field.get_db_prep_save(getattr(obj, field.attname), connection))
+                    for field in fields
+                ))
+                buffer.write('\n')
+            buffer.seek(0)
+            columns = ', '.join(quote(field.column) for field in fields)
+            cursor.cursor.copy_expert(f'COPY {quote(opts.db_table)} ({columns}) FROM STDIN', buffer)
+
+
+class SyntheticDataGenerator:
+    """
+    Generate `users` users (a `staff_ratio` share of them staff), `articles`
+    articles written by staff users and `comments` comments spread over them.
+    With users=0 the articles and comments go to the existing users.
+    `progress(label, done, total, rows_per_second)` is called after every batch.
+    """
+
+    def __init__(self, users=0, articles=0, comments=0, staff_ratio=0.02, batch_size=5000,
+                 seed=0, password='password', days=365, use_copy=False, index=True,
+                 now=None, progress=None):
+        self.counts = {'users': users, 'articles': articles, 'comments': comments}
+        self.staff_ratio = staff_ratio
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.password = password
+        self.period = timedelta(days=days)
+        self.writer = CopyWriter() if use_copy else BulkCreateWriter(batch_size)
+        self.index = index
+        self.now = now or timezone.now()
+        self.progress = progress or (lambda *args: None)
+        self.sentences = [self.sentence() for _ in range(SENTENCE_POOL)]
+
+    def run(self):
+        """Generate everything, returns the number of rows written per kind"""
+        started = time.perf_counter()
+        with explicit_timestamps(User, Article, Comment):
+            self.create_users()
+            self.create_articles_and_comments()
+        bump_generation('articles.article', 'articles.tag', 'comments.comment', 'auth.user')
+        return {**self.counts, 'seconds': time.perf_counter() - started}
+
+    # Text
+
+    def sentence(self):
+        words = self.rng.choices(VOCABULARY, k=self.rng.randint(WORDS_PER_SENTENCE // 2, WORDS_PER_SENTENCE * 3 // 2))
+        return ' '.join(words).capitalize() + '.'
+
+    def text(self, words, paragraph=5):
+        sentences = self.rng.choices(self.sentences, k=max(1, words // WORDS_PER_SENTENCE))
+        return '\n\n'.join(
+            ' '.join(sentences[start:start + paragraph]) for start in range(0, len(sentences), paragraph)
+        )
+
+    def timestamp(self, after=None):
+        """A moment in the generated period, skewed towards `after` when given"""
+        start = after or self.now - self.period
+        return start + (self.now - start) * (self.rng.random() ** 3 if after else self.rng.random())
+
+    # Rows
+
+    def report(self, label, done, total, started):
+        elapsed = time.perf_counter() - started
+        self.progress(label, done, total, done / elapsed if elapsed else 0.0)
+
+    def create_users(self):
+        total = self.counts['users']
+        if total:
+            # Hashing once: the synthetic users all share the same password
+            password = make_password(self.password)
+            offset = User.objects.filter(username__startswith='synthetic').count()
+            staff = max(1, math.ceil(total * self.staff_ratio))
+            started = time.perf_counter()
+            for start in range(0, total, self.batch_size):
+                users = []
+                for number in range(start, min(start + self.batch_size, total)):
+                    username = f'synthetic{offset + number}'
+                    users.append(User(
+                        username=username,
+                        email=f'{username}@example.com',
+                        password=password,
+                        first_name=self.rng.choice(FIRST_NAMES),
+                        last_name=self.rng.choice(LAST_NAMES),
+                        is_staff=number < staff,
+                        date_joined=self.timestamp(),
+                    ))
+                with transaction.atomic():
+                    self.writer.write(User, users)
+                self.report('users', start + len(users), total, started)
+
+        self.staff_ids = list(User.objects.filter(is_staff=True).order_by('pk').values_list('pk', flat=True))
+        self.user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        self.rng.shuffle(self.user_ids)
+        self.user_weights = zipf_cum_weights(len(self.user_ids))
+
+    def comment_counts(self):
+        """Comments per article: proportional to a log-normal popularity, summing to the total"""
+        total, articles = self.counts['comments'], self.counts['articles']
+        popularity = [self.rng.lognormvariate(0, 1.5) for _ in range(articles)]
+        scale = total / sum(popularity)
+        counts = [int(weight * scale) for weight in popularity]
+        for index in self.rng.sample(range(articles), total - sum(counts)):
+            counts[index] += 1
+        return counts
+
+    def create_articles_and_comments(self):
+        total = self.counts['articles']
+        if not total:
+            return
+        if not self.staff_ids:
+            raise ValueError('No staff user to write the articles, generate users first.')
+        comment_counts = self.comment_counts()
+        tags = get_or_create_tags(TAGS)
+        tag_weights = zipf_cum_weights(len(TAGS))
+        tag_deltas = {tag.pk: 0 for tag in tags.values()}
+        started = time.perf_counter()
+
+        for start in range(0, total, self.batch_size):
+            articles, links, comments = [], [], []
+            for index in range(start, min(start + self.batch_size, total)):
+                created_at = self.timestamp()
+                article = Article(
+                    title=' '.join(self.rng.choices(TOPIC_WORDS, k=self.rng.randint(3, 8))).capitalize(),
+                    content=self.text(lognormal_int(self.rng, 400, 0.7, 20, 8000)),
+                    author_id=self.rng.choice(self.staff_ids),
+                    created_at=created_at,
+                    updated_at=created_at,
+                    comment_count=comment_counts[index],
+                )
+                article.refresh_summary()
+                names = set(self.rng.choices(TAGS, cum_weights=tag_weights, k=self.rng.randint(1, 5)))
+                links.append([tags[name] for name in sorted(names)])
+
+                article_comments = []
+                for _ in range(comment_counts[index]):
+                    commented_at = self.timestamp(after=created_at)
+                    article_comments.append(Comment(
+                        author_id=self.rng.choices(self.user_ids, cum_weights=self.user_weights)[0],
+                        content=self.text(lognormal_int(self.rng, 25, 0.8, 3, 600)),
+                        created_at=commented_at,
+                        updated_at=commented_at,
+                    ))
+                article.last_commented_at = max(
+                    (comment.created_at for comment in article_comments), default=None
+                )
+                comments.append(article_comments)
+                articles.append(article)
+
+            with transaction.atomic():
+                self.writer.write(Article, articles)
+                article_tags = []
+                for article, article_links in zip(articles, links):
+                    for tag in article_links:
+                        article_tags.append(ArticleTag(article_id=article.pk, tag_id=tag.pk))
+                        tag_deltas[tag.pk] += 1
+                self.writer.write(ArticleTag, article_tags)
+                batch_comments = []
+                for article, article_comments in zip(articles, comments):
+                    for comment in article_comments:
+                        comment.article_id = article.pk
+                        batch_comments.append(comment)
+                if batch_comments:
+                    self.writer.write(Comment, batch_comments)
+                if self.index:
+                    reindex([article.pk for article in articles])
+            self.report('articles', start + len(articles), total, started)
+
+        apply_tag_count_deltas(tag_deltas)
@@ -1,3 +1,571 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from importlib import import_module
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from blog_project.events import get_broker, load_broker
+from comments.models import Comment
+from users.authentication import ClaimsRefreshToken
+from users.models import TokenRevocation
+from .management.commands.generate_data import Command as GenerateDataCommand
+from .models import Article, Tag
+from .synthetic import SyntheticDataGenerator
+
+
+def create_articles(author, count):
+    for i in range(count):
+        article = Article.objects.create(
+            title=f'Article {i}', content=f'Content about django {i}', author=author
+        )
+        article.set_tags(['django', f'tag{i % 3}'])
+        Comment.objects.create(article=article, author=author, content='First!')
+
+
+def auth_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(user).access_token}')
+    return client
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ArticleQueryBudgetTests(TestCase):
+    """
+    Every article endpoint runs a fixed number of queries, whatever the page
+    size. A failure here usually means an N+1 query was introduced.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        # Several authors, so a missing select_related would show up
+        for i in range(5):
+            create_articles(User.objects.create_user(f'author{i}', f'author{i}@example.com', 'pass'), 6)
+        cls.article = Article.objects.first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        for page_size in (1, 10, 50):
+            cache.clear()
+            # count, articles + authors, tags
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/articles/', {'page_size': page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), min(page_size, 30))
+
+    def test_list_with_search_tag_and_ordering(self):
+        responses = {}
+        for name, params in (
+            ('search', {'search': 'django'}), ('tag', {'tag': 'tag1'}), ('ordering', {'ordering': '-comment_count'}),
+        ):
+            cache.clear()
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/articles/', {**params, 'page_size': 50})
+            self.assertEqual(response.status_code, 200)
+            responses[name] = response.data
+        self.assertEqual(responses['search']['count'], 30)
+        self.assertEqual(responses['tag']['count'], 10)
+        self.assertTrue(all('tag1' in article['tags'].split(', ') for article in responses['tag']['results']))
+        counts = [article['comment_count'] for article in responses['ordering']['results']]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_list_count_is_cached(self):
+        self.client.get('/api/articles/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/articles/', {'page': 2})
+
+    def test_keyset_list_skips_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/articles/', {'pagination': 'cursor', 'page_size': 50})
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_list_omits_content_unless_requested(self):
+        response = self.client.get('/api/articles/')
+        self.assertNotIn('content', response.data['results'][0])
+        self.assertTrue(response.data['results'][0]['excerpt'].startswith('Content about django'))
+        response = self.client.get('/api/articles/', {'summary': 'false'})
+        self.assertIn('content', response.data['results'][0])
+
+    def test_sparse_fieldset_skips_joins_and_prefetches(self):
+        # count, articles (no author join, no tags prefetch)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/articles/', {'fields': 'id,title,created_at'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'created_at'})
+        response = self.client.get(f'/api/articles/{self.article.pk}/', {'exclude': 'content,tags'})
+        self.assertNotIn('content', response.data)
+        self.assertIn('author', response.data)
+
+    def test_detail(self):
+        # validators, article + author, tags
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/articles/{self.article.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_tags(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/tags/')
+        self.assertEqual(response.data['results'][0]['name'], 'django')
+        self.assertEqual(response.data['results'][0]['article_count'], 30)
+
+    def test_create(self):
+        client = auth_client(self.admin)
+        response = client.post(
+            '/api/articles/', {'title': 'New', 'content': 'Body', 'tags': 'django, new'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['tags'], 'django, new')
+
+    def test_update_and_delete(self):
+        client = auth_client(self.admin)
+        response = client.patch(f'/api/articles/{self.article.pk}/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = client.delete(f'/api/articles/{self.article.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+
+class ArticleSearchTests(TestCase):
+    """?search= matches every term (as a prefix) and ranks title matches first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer', 'writer@example.com', 'pass')
+        cls.in_title = Article.objects.create(title='Django tips', content='Short notes', author=author)
+        cls.in_content = Article.objects.create(
+            title='Weekly digest', content='One link about Django and many about Flask', author=author
+        )
+        cls.unrelated = Article.objects.create(title='Flask tips', content='Nothing else', author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, **params):
+        response = self.client.get('/api/articles/', params)
+        self.assertEqual(response.status_code, 200)
+        return [article['id'] for article in response.data['results']]
+
+    def test_results_are_ranked_by_relevance(self):
+        self.assertEqual(self.search(search='django'), [self.in_title.pk, self.in_content.pk])
+        self.assertEqual(self.search(search='DJAN'), [self.in_title.pk, self.in_content.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search(search='django tips'), [self.in_title.pk])
+        self.assertEqual(self.search(search='tips'), [self.unrelated.pk, self.in_title.pk])
+        self.assertEqual(self.search(search='missing'), [])
+
+    def test_explicit_ordering_replaces_the_rank(self):
+        self.assertEqual(self.search(search='django', ordering='-title'), [self.in_content.pk, self.in_title.pk])
+
+    def test_index_follows_writes(self):
+        self.in_title.title = 'Python tips'
+        self.in_title.save()
+        self.assertEqual(self.search(search='django'), [self.in_content.pk])
+        self.in_content.delete()
+        self.assertEqual(self.search(search='django'), [])
+        self.assertEqual(self.search(search='python'), [self.in_title.pk])
+
+    @override_settings(ARTICLE_SEARCH_CONFIG='simple')
+    def test_migration_backfill_uses_the_search_config(self):
+        migration = import_module('articles.migrations.0002_article_search_index')
+        sql, params = migration.postgres_create()[-1]
+        self.assertEqual(sql.count('%s::regconfig'), 4)
+        self.assertEqual(params, ['simple'] * 4)
+
+
+class ArticleTagTests(TestCase):
+    """?tag= matches tag names exactly; Tag.article_count follows tag changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer', 'writer@example.com', 'pass')
+        cls.python = Article.objects.create(title='Python', content='Body', author=author)
+        cls.python.set_tags('Python, web')
+        cls.pythonic = Article.objects.create(title='Pythonic', content='Body', author=author)
+        cls.pythonic.set_tags(['pythonic'])
+        cls.django = Article.objects.create(title='Django', content='Body', author=author)
+        cls.django.set_tags('django, web')
+
+    def setUp(self):
+        cache.clear()
+
+    def tagged(self, value):
+        response = self.client.get('/api/articles/', {'tag': value, 'ordering': 'title'})
+        self.assertEqual(response.status_code, 200)
+        return [article['id'] for article in response.data['results']]
+
+    def article_counts(self):
+        return dict(Tag.objects.values_list('name', 'article_count'))
+
+    def test_exact_name_match(self):
+        self.assertEqual(self.tagged('python'), [self.python.pk])
+        self.assertEqual(self.tagged(' PYTHON '), [self.python.pk])
+        self.assertEqual(self.tagged('pyth'), [])
+        self.assertEqual(self.tagged('web'), [self.django.pk, self.python.pk])
+
+    def test_several_tags_match_any(self):
+        self.assertEqual(self.tagged('python, django'), [self.django.pk, self.python.pk])
+        # Listed once even when carrying several of the tags
+        response = self.client.get('/api/articles/', {'tag': 'web,python'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_article_counts_follow_tag_changes(self):
+        self.assertEqual(self.article_counts(), {'python': 1, 'web': 2, 'pythonic': 1, 'django': 1})
+        self.python.set_tags('python, pythonic')
+        self.assertEqual(self.article_counts(), {'python': 1, 'web': 1, 'pythonic': 2, 'django': 1})
+        self.django.delete()
+        self.assertEqual(self.article_counts(), {'python': 1, 'web': 0, 'pythonic': 2, 'django': 0})
+        response = self.client.get('/api/tags/', {'ordering': '-article_count'})
+        self.assertEqual(response.data['results'][0], {'id': Tag.objects.get(name='pythonic').pk,
+                                                       'name': 'pythonic', 'article_count': 2})
+
+
+class KeysetPaginationTests(TestCase):
+    """?pagination=cursor walks (created_at, id) both ways, ties included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer', 'writer@example.com', 'pass')
+        create_articles(author, 7)
+        # Three articles share a timestamp, the id breaks the tie
+        same = Article.objects.order_by('pk').values_list('created_at', flat=True)[2]
+        Article.objects.filter(pk__in=list(Article.objects.order_by('pk').values_list('pk', flat=True)[2:5])) \
+            .update(created_at=same)
+        cls.newest_first = list(Article.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url, params=None, link='next'):
+        """Ids of every page following `link`, and the last page's data"""
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()  # repeated pages come from the response cache
+            ids.extend(article['id'] for article in data['results'])
+            last, url, params = data, data[link], None
+            pages += 1
+            self.assertLess(pages, 10)
+        return ids, last
+
+    def test_next_and_previous_walk_every_article_once(self):
+        ids, last = self.walk('/api/articles/', {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(ids, self.newest_first)
+        self.assertIsNone(last['next'])
+        # Back from the last page: the pages come in reverse, each one in list order
+        response = self.client.get(last['previous'])
+        self.assertEqual([article['id'] for article in response.data['results']], self.newest_first[4:6])
+        ids, first = self.walk(last['previous'], link='previous')
+        self.assertEqual(ids, self.newest_first[4:6] + self.newest_first[2:4] + self.newest_first[0:2])
+        self.assertIsNone(first['previous'])
+
+    def test_oldest_first(self):
+        ids, _ = self.walk('/api/articles/', {'pagination': 'cursor', 'page_size': 3, 'ordering': 'created_at'})
+        self.assertEqual(ids, self.newest_first[::-1])
+
+    def test_other_orderings_are_rejected(self):
+        for params in ({'ordering': 'title'}, {'ordering': '-comment_count'}, {'search': 'django'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/articles/', {**params, 'pagination': 'cursor'})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ordering', response.data)
+        response = self.client.get('/api/articles/', {'search': 'django', 'ordering': '-created_at',
+                                                      'pagination': 'cursor', 'page_size': 50})
+        self.assertEqual([article['id'] for article in response.data['results']], self.newest_first)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class RecountCommentsTests(TestCase):
+    """recount_comments repairs drifted counters and refreshes cached responses"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer', 'writer@example.com', 'pass')
+        create_articles(author, 3)
+        cls.drifted, cls.emptied, cls.correct = Article.objects.order_by('pk')
+        cls.latest = Comment.objects.filter(article=cls.drifted).latest('created_at').created_at
+        Comment.objects.create(article=cls.correct, author=author, content='Second')
+        # Writes that bypassed the signals
+        Article.objects.filter(pk=cls.drifted.pk).update(comment_count=7, last_commented_at=None)
+        Comment.objects.filter(article=cls.emptied).delete()
+        Article.objects.filter(pk=cls.emptied.pk).update(comment_count=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self):
+        return {
+            pk: (count, latest) for pk, count, latest
+            in Article.objects.values_list('pk', 'comment_count', 'last_commented_at')
+        }
+
+    def test_check_only_reports(self):
+        before = self.counters()
+        out = io.StringIO()
+        call_command('recount_comments', '--check', stdout=out)
+        self.assertIn('2 articles out of sync', out.getvalue())
+        self.assertEqual(self.counters(), before)
+
+    def test_fixes_drifted_counters(self):
+        correct = self.counters()[self.correct.pk]
+        call_command('recount_comments', stdout=io.StringIO())
+        counters = self.counters()
+        self.assertEqual(counters[self.drifted.pk], (1, self.latest))
+        self.assertEqual(counters[self.emptied.pk], (0, None))
+        self.assertEqual(counters[self.correct.pk], correct)
+        self.assertEqual(correct[0], 2)
+        out = io.StringIO()
+        call_command('recount_comments', stdout=out)
+        self.assertIn('0 articles out of sync', out.getvalue())
+
+    def test_cached_responses_are_refreshed(self):
+        path = f'/api/articles/{self.drifted.pk}/'
+        self.client.get(path)
+        response = self.client.get(path)
+        self.assertEqual((response['X-Cache'], response.json()['comment_count']), ('HIT', 7))
+        self.client.get('/api/articles/')
+        call_command('recount_comments', stdout=io.StringIO())
+        response = self.client.get(path)
+        self.assertEqual((response['X-Cache'], response.json()['comment_count']), ('MISS', 1))
+        listed = self.client.get('/api/articles/').json()['results']
+        self.assertEqual({article['id']: article['comment_count'] for article in listed}[self.drifted.pk], 1)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ArticleBulkTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        create_articles(cls.admin, 4)
+
+    def setUp(self):
+        cache.clear()
+        self.client = auth_client(self.admin)
+
+    def bulk(self, **payload):
+        return self.client.post('/api/articles/bulk/', payload, format='json')
+
+    def test_create_update_delete_in_one_request(self):
+        first, second, third, fourth = Article.objects.order_by('pk')
+        response = self.bulk(
+            create=[{'title': 'New', 'content': 'Fresh content', 'tags': 'django, bulk'}],
+            update=[{'id': first.pk, 'content': 'Edited', 'tags': 'bulk'}, {'id': second.pk, 'title': 'Renamed'}],
+            delete=[third.pk, fourth.pk],
+        )
+        self.assertEqual(response.status_code, 200)
+        created = Article.objects.get(pk=response.data['create'][0]['id'])
+        self.assertEqual(response.data['update'], [{'id': first.pk, 'status': 200}, {'id': second.pk, 'status': 200}])
+        self.assertEqual(response.data['delete'], [{'id': third.pk, 'status': 204}, {'id': fourth.pk, 'status': 204}])
+
+        self.assertEqual((created.author, created.excerpt, created.tag_string), (self.admin, 'Fresh content', 'bulk, django'))
+        first.refresh_from_db()
+        self.assertEqual((first.excerpt, first.tag_string), ('Edited', 'bulk'))
+        self.assertEqual(Article.objects.get(pk=second.pk).title, 'Renamed')
+        self.assertFalse(Article.objects.filter(pk__in=[third.pk, fourth.pk]).exists())
+        self.assertFalse(Comment.objects.filter(article_id__in=[third.pk, fourth.pk]).exists())
+
+        # Counters maintained without the signals
+        counts = dict(Tag.objects.values_list('name', 'article_count'))
+        self.assertEqual(counts['bulk'], 2)
+        self.assertEqual(counts['django'], 2)
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.article_count, tag.article_tags.count(), tag.name)
+
+        # Search documents follow too
+        response = self.client.get('/api/articles/', {'search': 'fresh'})
+        self.assertEqual([item['title'] for item in response.data['results']], ['New'])
+
+    def test_invalid_batch_is_rejected_with_item_errors(self):
+        article = Article.objects.first()
+        response = self.bulk(
+            create=[{'title': 'Valid', 'content': 'Body'}, {'title': 'No content'}],
+            update=[{'id': 999999, 'title': 'Missing'}],
+            delete=[article.pk],
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['create'][0], {})
+        self.assertIn('content', response.data['create'][1])
+        self.assertIn('id', response.data['update'][0])
+        self.assertNotIn('delete', response.data)
+        self.assertTrue(Article.objects.filter(pk=article.pk).exists())
+        self.assertFalse(Article.objects.filter(title='Valid').exists())
+
+    def test_query_count_is_independent_of_batch_size(self):
+        def create(count):
+            return [{'title': f'Bulk {i}', 'content': 'Body', 'tags': f'bulk, b{i}'} for i in range(count)]
+
+        # The first request also reads the admin's token revocation time
+        self.bulk(create=create(1))
+        with CaptureQueriesContext(connection) as small:
+            self.bulk(create=create(2))
+        with CaptureQueriesContext(connection) as large:
+            self.bulk(create=create(50))
+        self.assertEqual(len(small), len(large))
+
+    def test_deletes_announce_comments_and_refresh_caches(self):
+        article = Article.objects.first()
+        comment = article.comments.get()
+        reply = Comment.objects.create(article=article, author=self.admin, content='Reply', parent=comment)
+        detail = f'/api/articles/{article.pk}/'
+        self.assertEqual(APIClient().get(detail)['X-Cache'], 'MISS')
+        self.assertEqual(APIClient().get(detail)['X-Cache'], 'HIT')
+        load_broker.cache_clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bulk(delete=[article.pk])
+        events = get_broker().history[f'article:{article.pk}']
+        self.assertEqual(
+            sorted((event.type, event.data['id'], event.data['parent']) for event in events),
+            [('comment.deleted', comment.pk, None), ('comment.deleted', reply.pk, comment.pk)],
+        )
+        self.assertEqual(APIClient().get(detail).status_code, 404)
+
+    def test_staff_only(self):
+        response = auth_client(User.objects.create_user('reader', 'reader@example.com', 'pass')).post(
+            '/api/articles/bulk/', {'delete': [Article.objects.first().pk]}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class SyntheticDataGeneratorTests(TestCase):
+
+    def generate(self, seed):
+        SyntheticDataGenerator(users=10, articles=20, comments=100, staff_ratio=0.2, seed=seed, batch_size=7).run()
+        return list(Article.objects.order_by('pk').values_list('title', 'comment_count', 'reading_time'))
+
+    def test_counts_and_denormalized_fields(self):
+        self.generate(seed=1)
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertEqual(Comment.objects.count(), 100)
+        for article in Article.objects.all():
+            self.assertEqual(article.comment_count, article.comments.count())
+            self.assertTrue(article.author.is_staff)
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.article_count, tag.article_tags.count())
+
+    def test_same_seed_same_data(self):
+        first = self.generate(seed=3)
+        Comment.objects.all().delete()
+        Article.objects.all().delete()
+        User.objects.all().delete()
+        self.assertEqual(self.generate(seed=3), first)
+
+    def test_clear_query_count_is_independent_of_the_data(self):
+        admin = User.objects.create_superuser('root', 'root@example.com', 'pass')
+        queries = []
+        for seed in (1, 2):
+            SyntheticDataGenerator(users=5 * seed, articles=4 * seed, comments=20 * seed, seed=seed).run()
+            with CaptureQueriesContext(connection) as captured:
+                GenerateDataCommand(stdout=io.StringIO()).clear()
+            queries.append(len(captured))
+            self.assertEqual(list(User.objects.all()), [admin])
+            self.assertFalse(Article.objects.exists() or Comment.objects.exists())
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(TokenRevocation.objects.exists())
+
+
+class ArticleExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', 'pass')
+        create_articles(cls.admin, 5)
+        cls.bare = Article.objects.create(title='No comments', content='Body', author=cls.admin)
+
+    def export(self, **params):
+        response = auth_client(self.admin).get('/api/articles/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_staff_only(self):
+        self.assertEqual(APIClient().get('/api/articles/export/').status_code, 401)
+        self.assertEqual(auth_client(self.reader).get('/api/articles/export/').status_code, 403)
+
+    def test_ndjson_articles_with_nested_comments(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        *lines, trailer = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([line['id'] for line in lines], sorted(Article.objects.values_list('pk', flat=True)))
+        self.assertEqual(lines[0]['tags'], ['django', 'tag0'])
+        self.assertEqual([c['content'] for c in lines[0]['comments']], ['First!'])
+        self.assertEqual(lines[-1]['comments'], [])
+        self.assertEqual(trailer['export']['articles'], 6)
+        self.assertEqual(trailer['export']['comments'], 5)
+        self.assertEqual(trailer['export']['next_since'], response['X-Export-Next-Since'])
+
+    def test_csv_has_one_row_per_comment(self):
+        response, body = self.export(format='csv')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['comment_content'], 'First!')
+        self.assertEqual(rows[-1]['article_id'], str(self.bare.pk))
+        self.assertEqual(rows[-1]['comment_id'], '')
+
+    def test_since_exports_changes_only(self):
+        response, _ = self.export()
+        since = response['X-Export-Next-Since']
+        self.assertEqual(self.export(since=since)[1].count('\n'), 1)  # the trailer only
+
+        edited = Article.objects.order_by('pk')[1]
+        edited.title = 'Edited'
+        edited.save()
+        Comment.objects.create(article=self.bare, author=self.reader, content='New')
+        _, body = self.export(since=since)
+        ids = [json.loads(line).get('id') for line in body.splitlines()[:-1]]
+        self.assertEqual(ids, [edited.pk, self.bare.pk])
+
+    def test_invalid_since(self):
+        client = auth_client(self.admin)
+        for since in ('yesterday', '2024-13-01', '2024-01-01T25:00'):
+            with self.subTest(since=since):
+                response = client.get('/api/articles/export/', {'since': since})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'since': 'Expected an ISO 8601 date or datetime.'})
+
+    def test_queries_grow_with_chunks_not_rows(self):
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            response = auth_client(self.admin).get('/api/articles/export/')
+            # Per chunk of 2 articles: tags and comments prefetch, plus the article query
+            with self.assertNumQueries(1 + 3 * 2):
+                b''.join(response.streaming_content)
+
+
+class IndexAdvisorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        create_articles(cls.admin, 5)
+
+    def explain_indexes(self, *args):
+        out = io.StringIO()
+        call_command('explain_indexes', *args, stdout=out)
+        return out.getvalue()
+
+    def test_list_paths_use_indexes(self):
+        output = self.explain_indexes('--min-rows', '1')
+        flagged = [line for line in output.splitlines() if line.startswith('FLAG')]
+        # Only tag filters sort: the join is driven by the tag's ArticleTag rows
+        self.assertTrue(flagged)
+        self.assertTrue(all('tag=' in line for line in flagged), output)
+        self.assertIn('ok   articles   /api/articles/?ordering=title', output)
+        self.assertIn('ok   comments', output)
+        self.assertIn('ok   admin      /admin/articles/article/?author__id__exact=', output)
+
+    def test_fail(self):
+        with self.assertRaisesMessage(CommandError, 'access path(s) flagged'):
+            self.explain_indexes('--min-rows', '1', '--fail')
@@ -2,9 +2,14 @@
 Article URL patterns
 """
 from django.urls import path
-from .views import ArticleListCreateView, ArticleRetrieveUpdateDestroyView
+from .views import (
+    ArticleBulkView, ArticleExportView, ArticleListCreateView, ArticleRetrieveUpdateDestroyView, TagListView,
+)
 
 urlpatterns = [
     path('articles/', ArticleListCreateView.as_view(), name='article-list-create'),
+    path('articles/bulk/', ArticleBulkView.as_view(), name='article-bulk'),
+    path('articles/export/', ArticleExportView.as_view(), name='article-export'),
     path('articles/<int:pk>/', ArticleRetrieveUpdateDestroyView.as_view(), name='article-detail'),
+    path('tags/', TagListView.as_view(), name='tag-list'),
 ]
@@ -1,37 +1,190 @@
 """
 Article views
 """
-from rest_framework import generics
-from .models import Article
-from .serializers import ArticleSerializer
+from datetime import datetime, time
+
+from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from blog_project.async_views import AsyncReadMixin
+from blog_project.conditional import ConditionalRequestMixin, make_etag
+from blog_project.fieldsets import SparseFieldsetMixin
+from blog_project.pagination import PageNumberOrKeysetPagination
+from blog_project.response_cache import CachedResponseMixin
+from users.authentication import model_user
+from .export import ArticleExport, CSVRenderer, NDJSONRenderer, aiterate, isoformat
+from .models import Article, Tag
+from .serializers import ArticleBulkSerializer, ArticleSerializer, ArticleSummarySerializer, TagSerializer
 from .permissions import IsStaffOrReadOnly
+from .filters import ArticleFilter, ArticleSearchFilter, ArticleOrderingFilter
 
 
-class ArticleListCreateView(generics.ListCreateAPIView):
+class ArticleListCreateView(AsyncReadMixin, CachedResponseMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     """
     GET: List all articles (public access)
     POST: Create a new article (admin only)
-    Supports search via ?search=query on title, content, tags
-    Supports ordering via ?ordering=created_at or ?ordering=-title
+    Supports full-text search via ?search=query on title, content, tags, author
+    (results ranked by relevance unless ?ordering= is given)
+    Supports ordering via ?ordering=created_at, ?ordering=-title or
+    ?ordering=-comment_count (most discussed, no comments table access)
+    Supports filtering by tag via ?tag=python
+    Supports keyset pagination via ?pagination=cursor (then follow ?cursor=)
+    Lists articles without their full content (excerpt and reading_time only);
+    ?summary=false returns the full content as well
+    Supports sparse fieldsets via ?fields=id,title or ?exclude=tags
+    Anonymous GET responses are cached until the next article or comment write
+    and, under ASGI, served by the async read path (see blog_project.async_views)
     """
-    queryset = Article.objects.all()
+    response_cache_scopes = ('articles.article', 'comments.comment', 'auth.user')
+    queryset = Article.objects.select_related('author').prefetch_related('tags')
     serializer_class = ArticleSerializer
     permission_classes = [IsStaffOrReadOnly]
-    search_fields = ['title', 'content', 'tags', 'author__username']
-    ordering_fields = ['created_at', 'title']
+    pagination_class = PageNumberOrKeysetPagination
+    sparse_always_fetch = ('id', 'created_at')
+    filter_backends = [ArticleSearchFilter, ArticleOrderingFilter, DjangoFilterBackend]
+    filterset_class = ArticleFilter
+    search_fields = ['title', 'content', 'tags__name', 'author__username']
+    ordering_fields = ['created_at', 'title', 'comment_count']
     ordering = ['-created_at']  # default ordering
     
+    def is_summary(self):
+        """Summary mode is the default for GET, opted out with ?summary=false"""
+        return (
+            self.request.method == 'GET'
+            and self.request.query_params.get('summary', '').lower() not in ('false', '0', 'no')
+        )
+
+    async def async_get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_summary():
+            # Never fetch the content column for list pages
+            queryset = queryset.defer('content')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return ArticleSummarySerializer
+        return ArticleSerializer
+
     def perform_create(self, serializer):
         """Set the author to the current user when creating an article"""
-        serializer.save(author=self.request.user)
+        serializer.save(author=model_user(self.request.user))
 
 
-class ArticleRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ArticleRetrieveUpdateDestroyView(AsyncReadMixin, CachedResponseMixin, ConditionalRequestMixin,
+                                       SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
-    GET: Retrieve a single article (public access)
+    GET: Retrieve a single article (public access, supports ?fields=/?exclude=)
     PUT/PATCH: Update an article (admin only)
     DELETE: Delete an article (admin only)
+    Anonymous GET responses are cached until the article or its comments change
+    Responses carry ETag/Last-Modified: GET honours If-None-Match/If-Modified-Since
+    (304), PUT/PATCH honour If-Match/If-Unmodified-Since (412 when outdated)
+    Anonymous GET requests take the async read path under ASGI
     """
-    queryset = Article.objects.all()
+    queryset = Article.objects.select_related('author').prefetch_related('tags')
     serializer_class = ArticleSerializer
     permission_classes = [IsStaffOrReadOnly]
+
+    async def async_get(self, request, *args, **kwargs):
+        return await self.aconditional(self.aretrieve, request, *args, **kwargs)
+
+    def get_validators_queryset(self):
+        """One primary key lookup: the article changes with its row or its comment counters"""
+        return Article.objects.filter(pk=self.kwargs['pk']).values_list(
+            'updated_at', 'comment_count', 'last_commented_at'
+        )
+
+    def validators_from_row(self, row):
+        if row is None:
+            raise Http404
+        updated_at, comment_count, last_commented_at = row
+        last_modified = max(updated_at, last_commented_at or updated_at)
+        return make_etag(updated_at.isoformat(), comment_count, last_commented_at), last_modified
+
+    def get_response_cache_scopes(self):
+        return (f"article:{self.kwargs['pk']}", 'auth.user')
+
+
+class ArticleBulkView(generics.GenericAPIView):
+    """
+    POST: Create, partially update and delete many articles at once (admin only)
+    Body: {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}
+    The batch is validated as a whole and applied in one transaction with bulk
+    queries; the response lists the result of every item in request order.
+    An invalid batch is rejected (400) with the errors of each item.
+    """
+    serializer_class = ArticleBulkSerializer
+    permission_classes = [IsStaffOrReadOnly]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            results = serializer.save(author=model_user(request.user))
+        return Response(results)
+
+
+class ArticleExportView(generics.GenericAPIView):
+    """
+    GET: Stream all articles with their comments (staff only)
+    ?format=ndjson (default, one article per line with nested comments) or
+    ?format=csv (one row per comment); ?since=<ISO 8601 date or datetime>
+    exports only the articles created, edited or commented since then.
+    X-Export-Next-Since gives the since value of the next incremental export;
+    NDJSON ends with an {"export": {...}} line with row counts and rows/sec.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.accepted_renderer.format
+        export = ArticleExport(export_format, self.get_since(), chunk_size=settings.EXPORT_CHUNK_SIZE)
+        content = aiterate(export) if isinstance(request._request, ASGIRequest) else export
+        response = StreamingHttpResponse(
+            content, content_type=f'{request.accepted_renderer.media_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="articles.{export_format}"'
+        response['X-Export-Next-Since'] = isoformat(export.started_at)
+        return response
+
+    def get_since(self):
+        value = self.request.query_params.get('since')
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+            date = parse_date(value) if since is None else None
+        except ValueError:
+            # Well formatted, but not a real date or time (e.g. 2024-13-01)
+            since = date = None
+        if since is None:
+            if date is None:
+                raise ValidationError({'since': 'Expected an ISO 8601 date or datetime.'})
+            since = datetime.combine(date, time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+
+class TagListView(CachedResponseMixin, generics.ListAPIView):
+    """
+    GET: List tags in use with their precomputed article counts (public access)
+    Supports ordering via ?ordering=name or ?ordering=-article_count (default)
+    """
+    response_cache_scopes = ('articles.tag',)
+    queryset = Tag.objects.filter(article_count__gt=0)
+    serializer_class = TagSerializer
+    search_fields = ['name']
+    ordering_fields = ['name', 'article_count']
+    ordering = ['-article_count', 'name']  # default ordering
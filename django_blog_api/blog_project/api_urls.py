@@ -4,10 +4,9 @@ API URL configuration
 from django.urls import path, include
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from users.views import TokenObtainView
 
 
 @api_view(['GET'])
@@ -21,7 +20,7 @@ urlpatterns = [
     path('health/', health_check, name='health-check'),
     
     # JWT authentication endpoints
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/', TokenObtainView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
     # User registration and management
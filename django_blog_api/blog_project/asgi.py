@@ -7,5 +7,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_project.settings')
+# Async read views for the public endpoints (see blog_project.async_views)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+# Comment events (/api/articles/<id>/comments/events/) are streamed by this
+# application only; see blog_project.events
+# Requests run in a new thread each: a persistent connection would never be
+# reused (set DB_POOL_SIZE to reuse connections)
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,148 @@
+"""
+Async read path for the public list/detail endpoints (ASGI deployments)
+
+DRF views are synchronous: under ASGI every request is handed to a thread
+with sync_to_async, so concurrency is bounded by the thread pool. Views
+using AsyncReadMixin serve anonymous GET requests natively async instead:
+
+- the DRF machinery that does no I/O is reused as is (request parsing,
+  permissions, filter backends, sparse fieldsets, serializers, renderers)
+- the queries run with the async ORM: validators with afirst(), counts
+  with acount(), page rows with async iteration, objects with aget()
+- the response cache, conditional requests and pagination behave exactly
+  as on the sync path; cache lookups use the async cache API, and
+  throttle checks against the shared cache run in a thread, so a network
+  cache never blocks the event loop
+
+Everything else (writes, authenticated requests, HEAD/OPTIONS) goes to the
+regular sync view. The async views are used when ASYNC_VIEWS is on, which
+blog_project/asgi.py does by default; WSGI deployments keep the sync views,
+where an async view would cost an event loop per request.
+
+Serializers must not trigger lazy queries on this path (select_related and
+prefetch_related cover what they read): Django raises SynchronousOnlyOperation
+if one does.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework.response import Response
+
+from .throttling import checks_do_io
+
+
+def is_async_read(request):
+    """Anonymous GET: no authentication query and nothing written"""
+    return request.method == 'GET' and 'HTTP_AUTHORIZATION' not in request.META
+
+
+class AsyncReadMixin:
+    """
+    Generic view mixin adding the async read path. Views implement
+    async_get(), usually with alist() or aretrieve().
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if settings.ASYNC_VIEWS:
+            return cls.as_async_view(**initkwargs)
+        return super().as_view(**initkwargs)
+
+    @classmethod
+    def as_async_view(cls, **initkwargs):
+        sync_view = sync_to_async(super().as_view(**initkwargs))
+
+        async def view(request, *args, **kwargs):
+            if is_async_read(request):
+                return await cls(**initkwargs).adispatch(request, *args, **kwargs)
+            return await sync_view(request, *args, **kwargs)
+
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        # Not csrf_exempt(): on Django 4.2 it would turn the view into a sync one
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """dispatch() with an awaited handler"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        cache_key = None
+        if getattr(self, 'is_response_cacheable', None) and self.is_response_cacheable(request):
+            cache_key = await self.aget_response_cache_key(request)
+            cached = await self.aget_cached_response(cache_key, request)
+            if cached is not None:
+                throttled = await self.off_loop_if_io(self.throttled_response, request, *args, **kwargs)
+                return self.rendered(throttled) if throttled is not None else cached
+
+        try:
+            await self.off_loop_if_io(self.initial, request, *args, **kwargs)
+            response = await self.async_get(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response = self.rendered(response)
+        if cache_key is not None:
+            response = await self.acache_response(cache_key, response)
+        return response
+
+    async def off_loop_if_io(self, func, *args, **kwargs):
+        """
+        Call func, which checks the throttles, in a thread when the checks
+        go to the shared cache (the sync cache API would block the loop)
+        """
+        if checks_do_io():
+            return await sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+        return func(*args, **kwargs)
+
+    def rendered(self, response):
+        """
+        Render here, in the event loop: Django's async handler would render
+        a DRF Response in a thread
+        """
+        if not hasattr(response, 'render'):
+            return response
+        response.render()
+        plain = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            plain[header] = value
+        return plain
+
+    async def async_get(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    async def alist(self, request, *args, **kwargs):
+        """list() with the async ORM"""
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            page = await self.apaginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        """paginate_queryset() with the async ORM"""
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """retrieve() with the async ORM"""
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def aget_object(self):
+        """get_object() with the async ORM"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,72 @@
+"""
+Helpers shared by the benchmark management commands
+"""
+import math
+import time
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples):
+    """Latency summary (milliseconds) of a list of durations in seconds"""
+    millis = [sample * 1000 for sample in samples]
+    return {
+        'runs': len(millis),
+        'mean': sum(millis) / len(millis) if millis else 0.0,
+        'p50': percentile(millis, 50),
+        'p95': percentile(millis, 95),
+        'p99': percentile(millis, 99),
+    }
+
+
+def measure(func, runs=100, warmup=5):
+    """Call func() repeatedly and return its latency summary"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def format_summary(label, summary):
+    return (
+        f"{label:<40} p50={summary['p50']:8.2f}ms  p95={summary['p95']:8.2f}ms  "
+        f"p99={summary['p99']:8.2f}ms  ({summary['runs']} runs)"
+    )
+
+
+def find_regressions(results, baseline, threshold=0.2, min_delta_ms=1.0):
+    """
+    Compare benchmark results ({name: {'p50', 'p95', 'queries', 'bytes', ...}})
+    with a baseline of the same shape and describe every regression:
+    - p50/p95 slower by more than `threshold` (relative) and `min_delta_ms`
+    - more SQL queries than the baseline (query counts are deterministic)
+    - responses larger by more than `threshold`
+    Scenarios missing from either side are ignored.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('p50', 'p95'):
+            delta = current[metric] - previous[metric]
+            if delta > min_delta_ms and delta > previous[metric] * threshold:
+                regressions.append(
+                    f'{name}: {metric} {previous[metric]:.2f}ms -> {current[metric]:.2f}ms'
+                )
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        if current['bytes'] > previous['bytes'] * (1 + threshold):
+            regressions.append(f"{name}: response size {previous['bytes']} -> {current['bytes']} bytes")
+    return regressions
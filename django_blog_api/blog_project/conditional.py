@@ -0,0 +1,103 @@
+"""
+Conditional requests (ETag / Last-Modified) for API views
+
+Views using ConditionalRequestMixin compute cheap validators for the
+requested resource (a single aggregate or row lookup, no serialization):
+
+- GET with If-None-Match / If-Modified-Since returns 304 Not Modified when
+  the resource did not change, before the queryset is serialized
+- PUT/PATCH with If-Match / If-Unmodified-Since returns 412 Precondition
+  Failed when the resource changed since the client fetched it, which
+  prevents lost updates
+
+Responses carry the current ETag and Last-Modified headers.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has been modified since it was fetched.'
+    default_code = 'precondition_failed'
+
+
+def make_etag(*parts):
+    """
+    ETag from the given validator values. It is a strong ETag because
+    If-Match only ever matches strong ones.
+    """
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+class ConditionalRequestMixin:
+    """
+    Generic view mixin evaluating conditional request headers for
+    retrieve, list and update. Subclasses implement
+    get_validators_queryset() and validators_from_row().
+    """
+
+    def get_validators_queryset(self):
+        """Queryset whose first row holds the validator values of the requested resource"""
+        raise NotImplementedError
+
+    def validators_from_row(self, row):
+        """
+        Return (etag, last_modified datetime or None) from the row, which is
+        None when the resource does not exist
+        """
+        raise NotImplementedError
+
+    def get_validators(self):
+        return self.validators_from_row(self.get_validators_queryset().first())
+
+    async def aget_validators(self):
+        return self.validators_from_row(await self.get_validators_queryset().afirst())
+
+    def set_validator_headers(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(timestamp(last_modified))
+        return response
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp(last_modified))
+        if response is not None:
+            if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+                raise PreconditionFailed()
+            return self.set_validator_headers(response, etag, last_modified)
+
+        response = handler(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            if not status.is_success(response.status_code):
+                return response
+            # The write changed the validators
+            etag, last_modified = self.get_validators()
+        return self.set_validator_headers(response, etag, last_modified)
+
+    async def aconditional(self, handler, request, *args, **kwargs):
+        """conditional() for the async read path (see blog_project.async_views)"""
+        etag, last_modified = await self.aget_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp(last_modified))
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self.conditional(super().update, request, *args, **kwargs)
@@ -0,0 +1,125 @@
+"""
+Counting strategies for paginated list responses
+
+An exact COUNT(*) with the same filters runs for every list page. Instead:
+- exact counts are cached per view path + normalized filter parameters, and
+  invalidated through generation counters bumped on writes
+  (see blog_project.invalidation); PAGINATION_COUNT_CACHE_TIMEOUT=0, the
+  default with a per-process cache, counts every time
+- on PostgreSQL, when the planner estimates more rows than
+  PAGINATION_COUNT_ESTIMATE_THRESHOLD, the estimate is returned instead
+  (pg_class.reltuples for unfiltered lists, EXPLAIN rows otherwise)
+
+count() returns (count, exact) so responses can flag estimated counts.
+"""
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .invalidation import aget_generations, arecently_bumped, get_generations, recently_bumped
+from .routers import read_from_replica
+
+# Parameters that change the page, not the set of rows being counted
+IGNORED_PARAMS = {'page', 'page_size', 'cursor', 'pagination', 'ordering', 'format'}
+
+
+class CountStrategy:
+    """Cached exact count, or a planner estimate above the threshold"""
+
+    def __init__(self, queryset, request, scopes=None):
+        self.queryset = queryset
+        self.request = request
+        self.scopes = scopes or (queryset.model._meta.label_lower,)
+
+    @property
+    def cache_timeout(self):
+        return getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 300)
+
+    @property
+    def estimate_threshold(self):
+        return getattr(settings, 'PAGINATION_COUNT_ESTIMATE_THRESHOLD', 0)
+
+    def make_cache_key(self, generations):
+        params = sorted(
+            (key, value)
+            for key, values in self.request.query_params.lists()
+            if key not in IGNORED_PARAMS
+            for value in values
+        )
+        raw = json.dumps([self.request.path, params, generations])
+        return 'count:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def cache_key(self):
+        return self.make_cache_key(get_generations(*self.scopes))
+
+    async def acache_key(self):
+        return self.make_cache_key(await aget_generations(*self.scopes))
+
+    def count(self):
+        key = self.cache_key() if self.cache_timeout else None
+        cached = cache.get(key) if key else None
+        if cached is not None:
+            return cached
+
+        result = self.estimated_count() if self.estimate_threshold else None
+        if result is None:
+            result = (self.queryset.count(), True)
+
+        if key and not self.may_be_stale():
+            cache.set(key, result, self.cache_timeout)
+        return result
+
+    async def acount(self):
+        """count() for the async read path, with the async cache API"""
+        key = await self.acache_key() if self.cache_timeout else None
+        cached = await cache.aget(key) if key else None
+        if cached is not None:
+            return cached
+
+        result = await sync_to_async(self.estimated_count)() if self.estimate_threshold else None
+        if result is None:
+            result = (await self.queryset.acount(), True)
+
+        if key and not await self.amay_be_stale():
+            await cache.aset(key, result, self.cache_timeout)
+        return result
+
+    def may_be_stale(self):
+        """Counted on a replica that may not have the latest writes yet (see blog_project.routers)"""
+        return read_from_replica() and recently_bumped(*self.scopes)
+
+    async def amay_be_stale(self):
+        return read_from_replica() and await arecently_bumped(*self.scopes)
+
+    def estimated_count(self):
+        """(estimate, False) when the estimate reaches the threshold, otherwise None"""
+        estimate = self.estimate()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate, False
+        return None
+
+    def estimate(self):
+        """Planner row estimate, or None when the database cannot provide one"""
+        connection = connections[self.queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        query = self.queryset.query
+        with connection.cursor() as cursor:
+            if not query.where and not query.extra_tables:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [self.queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # reltuples is -1 (or 0) before the table was first analyzed
+                return row[0] if row and row[0] > 0 else None
+            sql, params = query.sql_with_params()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,10 @@
+"""
+Database backends of the blog API: Django's PostgreSQL and SQLite backends
+plus connection management
+
+- every connection opened is timed and reported to the active QueryCounter
+  (Server-Timing "db-connect" on requests that had to connect)
+- with DATABASES[alias]['POOL']['max_size'] > 0 (DB_POOL_SIZE), connections
+  come from an in-process pool instead of being opened per request
+  (see blog_project.db.pool)
+"""
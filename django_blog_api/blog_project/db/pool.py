@@ -0,0 +1,189 @@
+"""
+In-process database connection pool (one per worker process and database)
+
+Django opens a connection per request (CONN_MAX_AGE=0) or keeps one per
+thread (persistent connections). Neither suits many threads that each hold
+a connection briefly, nor ASGI, where every request runs in a new thread.
+With a pool, closing a connection at the end of a request hands it back
+and the next connect() reuses it: at most max_size connections per process,
+and a request waits up to `timeout` seconds for one when all are in use.
+
+Connections returned are rolled back; connections older than max_lifetime
+are recycled, and with CONN_HEALTH_CHECKS an idle connection is pinged
+before it is reused.
+"""
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+from blog_project.middleware import record_connect
+
+POOL_DEFAULTS = {'max_size': 0, 'timeout': 10.0, 'max_lifetime': 3600.0}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def ping(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections created by connect()"""
+
+    def __init__(self, connect, max_size, timeout=10.0, max_lifetime=3600.0, check=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.size = 0
+        self._idle = []
+        self._created_at = {}
+        self._available = threading.Condition()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._available:
+                while not self._idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f'No connection available within {self.timeout}s ({self.max_size} in use)'
+                        )
+                    self._available.wait(remaining)
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    self.size += 1
+
+            if conn is None:
+                try:
+                    conn = self.connect()
+                except BaseException:
+                    self._forget(None)
+                    raise
+                self._created_at[conn] = time.monotonic()
+                return conn
+
+            if self.check is None:
+                return conn
+            try:
+                self.check(conn)
+                return conn
+            except Exception:
+                self.discard(conn)
+
+    def release(self, conn):
+        try:
+            conn.rollback()
+        except Exception:
+            self.discard(conn)
+            return
+        if time.monotonic() - self._created_at.get(conn, 0) > self.max_lifetime:
+            self.discard(conn)
+            return
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._forget(conn)
+
+    def _forget(self, conn):
+        self._created_at.pop(conn, None)
+        with self._available:
+            self.size -= 1
+            self._available.notify()
+
+    def close(self):
+        """Close the idle connections (those in use are closed when released)"""
+        with self._available:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self.discard(conn)
+
+    def stats(self):
+        return {'size': self.size, 'idle': len(self._idle), 'max_size': self.max_size}
+
+
+def close_pools():
+    """Close and drop every pool, e.g. after changing the pool settings"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    DatabaseWrapper mixin timing connect() and, when POOL max_size is set,
+    taking connections from a ConnectionPool and handing them back on close()
+    """
+
+    @property
+    def pool_options(self):
+        return {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+
+    def check_settings(self):
+        super().check_settings()
+        if self.pool_options['max_size'] and self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured(
+                f"Database '{self.alias}': connection pooling needs CONN_MAX_AGE = 0, "
+                f"connections are returned to the pool at the end of each request."
+            )
+
+    def get_pool(self, conn_params=None):
+        options = self.pool_options
+        if not options['max_size']:
+            return None
+        key = (self.alias, self.settings_dict['NAME'])
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None and conn_params is not None:
+                new_connection = super().get_new_connection
+                pool = _pools[key] = ConnectionPool(
+                    lambda: new_connection(conn_params),
+                    max_size=options['max_size'],
+                    timeout=options['timeout'],
+                    max_lifetime=options['max_lifetime'],
+                    check=ping if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+                )
+            return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_connect(time.perf_counter() - start)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            return pool.acquire()
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.release(self.connection)
@@ -0,0 +1,200 @@
+"""
+Server-sent events: per-channel publish/subscribe (e.g. 'article:12' for the
+comments of article 12)
+
+Writers publish events (from transaction.on_commit, so only committed data
+is announced); every open stream of the channel in this process receives
+them through its own asyncio queue. The broker (EVENTS_BROKER) numbers the
+events of each channel and keeps the last EVENTS_HISTORY of them, so a
+client reconnecting with Last-Event-ID gets what it missed, or a `reset`
+event when those are gone (it must then reload).
+
+LocalBroker delivers the events published in its own process: run the ASGI
+application as one process (an event loop serves thousands of streams), or
+plug in a broker shared by all processes implementing BaseBroker.publish()
+and events_since() and feeding deliver().
+
+Django 4.2 does not notice a client that disconnected in the middle of a
+streaming response, so streams end after EVENTS_STREAM_TIMEOUT seconds;
+EventSource clients reconnect on their own and resume from Last-Event-ID.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Events a slow stream may have pending before it is closed (the client
+# reconnects and resumes from the history)
+STREAM_QUEUE_SIZE = 1000
+# Channels LocalBroker keeps a history for (least recently published dropped)
+MAX_CHANNELS = 10000
+RECONNECT_MILLISECONDS = 3000
+
+
+class Event:
+    def __init__(self, id, type, data):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def encode(self):
+        # Events without an id leave the client's Last-Event-ID unchanged
+        id_line = f'id: {self.id}\n' if self.id is not None else ''
+        return f'{id_line}event: {self.type}\ndata: {json.dumps(self.data)}\n\n'.encode()
+
+
+class Subscription:
+    """An open stream: events are handed to its queue on its event loop"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+
+    def put(self, event):
+        """Called on the stream's loop; None tells the stream to close"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Make room for the sentinel: the stream ends and the client resumes
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class BaseBroker:
+    """
+    Publishes events and hands them to the subscriptions of this process.
+    Subclasses store the history behind publish() and events_since().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channel, type, data):
+        """Number and record an event, deliver it, return it"""
+        raise NotImplementedError
+
+    def events_since(self, channel, last_id):
+        """Events after last_id, oldest first, or None when some are no longer known"""
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def deliver(self, channel, event):
+        """Fan an event out to the streams of the channel, from any thread"""
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Its event loop is closed
+                self.unsubscribe(subscription)
+
+
+class LocalBroker(BaseBroker):
+    """In-process broker: events are numbered and kept per channel in memory"""
+
+    def __init__(self):
+        super().__init__()
+        self.history = OrderedDict()
+        self.last_ids = {}
+
+    def publish(self, channel, type, data):
+        with self.lock:
+            # Numbering starts from the clock, so ids given out before a
+            # restart are older than any current one and trigger a reset
+            event = Event(self.last_ids.get(channel, int(time.time() * 1000)) + 1, type, data)
+            self.last_ids[channel] = event.id
+            history = self.history.pop(channel, None) or deque(maxlen=settings.EVENTS_HISTORY)
+            history.append(event)
+            self.history[channel] = history
+            if len(self.history) > MAX_CHANNELS:
+                dropped, _ = self.history.popitem(last=False)
+                self.last_ids.pop(dropped, None)
+        self.deliver(channel, event)
+        return event
+
+    def events_since(self, channel, last_id):
+        with self.lock:
+            history = list(self.history.get(channel, ()))
+        if not history or last_id > history[-1].id or last_id < history[0].id - 1:
+            return None
+        return [event for event in history if event.id > last_id]
+
+
+@lru_cache(maxsize=None)
+def load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return load_broker(settings.EVENTS_BROKER)
+
+
+def parse_event_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def event_stream(channel, last_event_id=None, broker=None):
+    """
+    The body of an SSE response: replays the events after last_event_id,
+    then streams new ones, with a comment line every EVENTS_KEEPALIVE
+    seconds of silence, for EVENTS_STREAM_TIMEOUT seconds at most
+    """
+    broker = broker or get_broker()
+    # Subscribe before reading the history: an event published in between
+    # is in both, and skipped the second time
+    subscription = broker.subscribe(channel)
+    try:
+        yield f'retry: {RECONNECT_MILLISECONDS}\n\n'.encode()
+        last_id = parse_event_id(last_event_id)
+        if last_id is not None:
+            missed = broker.events_since(channel, last_id)
+            if missed is None:
+                yield Event(None, 'reset', {}).encode()
+                last_id = None
+            else:
+                for event in missed:
+                    yield event.encode()
+                    last_id = event.id
+
+        deadline = subscription.loop.time() + settings.EVENTS_STREAM_TIMEOUT
+        while True:
+            remaining = deadline - subscription.loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), min(settings.EVENTS_KEEPALIVE, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            if event is None:
+                return
+            if last_id is not None and event.id <= last_id:
+                continue
+            yield event.encode()
+    finally:
+        broker.unsubscribe(subscription)
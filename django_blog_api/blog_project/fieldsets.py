@@ -0,0 +1,120 @@
+"""
+Sparse fieldsets: ?fields= and ?exclude= on GET requests
+
+    GET /api/articles/?fields=id,title,created_at
+    GET /api/me/?exclude=first_name,last_name
+
+DynamicFieldsMixin (serializers) drops the fields that were not asked for.
+SparseFieldsetMixin (views) pushes the same selection down to the queryset:
+only the columns behind the remaining fields are fetched (.only()), and
+joins/prefetches that no remaining field needs are dropped.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.relations import RelatedField
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def split_param(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_field_names(request, available):
+    """
+    Names of the fields to keep for this request, or None to keep them all.
+    Unknown names are ignored.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and EXCLUDE_PARAM not in params:
+        return None
+    names = set(available)
+    if params.get(FIELDS_PARAM):
+        names &= split_param(params[FIELDS_PARAM])
+    if params.get(EXCLUDE_PARAM):
+        names -= split_param(params[EXCLUDE_PARAM])
+    return names
+
+
+class DynamicFieldsMixin:
+    """ModelSerializer mixin honouring ?fields= and ?exclude="""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = requested_field_names(self.context.get('request'), self.fields)
+        if keep is not None:
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+
+def queryset_projection(serializer, model):
+    """
+    Return (columns, select_related, prefetch_related) needed to serialize
+    the model with the given serializer fields, or None when a field's
+    source cannot be mapped to the model (e.g. a property or source='*').
+    """
+    columns, select, prefetch = set(), set(), set()
+    for field in serializer.fields.values():
+        if field.source == '*':
+            return None
+        attrs = field.source.split('.')
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return None
+
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.add(attrs[0])
+        elif model_field.is_relation:
+            if len(attrs) > 1:
+                select.add(attrs[0])
+                columns.add('__'.join(attrs))
+            elif isinstance(field, RelatedField) and field.use_pk_only_optimization():
+                # Only the foreign key column is needed, no join
+                columns.add(attrs[0])
+            else:
+                select.add(attrs[0])
+                columns.add(attrs[0])
+        else:
+            columns.add(attrs[0])
+    return columns, select, prefetch
+
+
+class SparseFieldsetMixin:
+    """
+    Generic view mixin projecting the queryset onto the requested fields.
+    `sparse_always_fetch` lists columns needed regardless of the fields
+    (e.g. created_at for keyset pagination cursors).
+    """
+    sparse_always_fetch = ('id',)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        request = self.request
+        if request.method != 'GET' or not (
+            FIELDS_PARAM in request.query_params or EXCLUDE_PARAM in request.query_params
+        ):
+            return queryset
+
+        projection = queryset_projection(self.get_serializer(), queryset.model)
+        if projection is None:
+            return queryset
+        columns, select, prefetch = projection
+
+        # select_related=True (follow everything) is left alone
+        if queryset.query.select_related is not True:
+            queryset = queryset.select_related(None)
+            if select:
+                queryset = queryset.select_related(*select)
+
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0] in prefetch
+        ]
+        queryset = queryset.prefetch_related(None)
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
+
+        return queryset.only(*columns, *self.sparse_always_fetch)
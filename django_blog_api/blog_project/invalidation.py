@@ -0,0 +1,78 @@
+"""
+Generation counters used to invalidate cached data on writes
+
+Cached entries embed the current generation of the data they depend on
+(e.g. 'articles.article') in their cache key. A write bumps the generation,
+so every entry built from older data simply stops being looked up and
+expires on its own; nothing has to be deleted or enumerated.
+
+With read replicas, bumps are also remembered for DB_REPLICA_LAG seconds
+(recently_bumped()): data read from a replica in that window may predate
+the write and must not be cached under the new generation.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def generation_key(scope):
+    return f'generation:{scope}'
+
+
+def get_generations(*scopes):
+    """Return the current generation of each scope, as a tuple"""
+    keys = [generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in found:
+            # Start from the clock so a counter lost to eviction can never
+            # come back with a value that older cache entries still use
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            found[key] = cache.get(key)
+        generations.append(found[key])
+    return tuple(generations)
+
+
+async def aget_generations(*scopes):
+    """get_generations() with the async cache API, for the async read path"""
+    keys = [generation_key(scope) for scope in scopes]
+    found = await cache.aget_many(keys)
+    generations = []
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, int(time.time() * 1000), timeout=None)
+            found[key] = await cache.aget(key)
+        generations.append(found[key])
+    return tuple(generations)
+
+
+def bumped_key(scope):
+    return f'generation-bumped:{scope}'
+
+
+def recently_bumped(*scopes):
+    """Whether any of the scopes was bumped less than DB_REPLICA_LAG seconds ago"""
+    if not settings.DATABASE_REPLICAS or not settings.DB_REPLICA_LAG:
+        return False
+    return bool(cache.get_many([bumped_key(scope) for scope in scopes]))
+
+
+async def arecently_bumped(*scopes):
+    """recently_bumped() with the async cache API"""
+    if not settings.DATABASE_REPLICAS or not settings.DB_REPLICA_LAG:
+        return False
+    return bool(await cache.aget_many([bumped_key(scope) for scope in scopes]))
+
+
+def bump_generation(*scopes):
+    """Invalidate everything cached for the given scopes"""
+    if settings.DATABASE_REPLICAS and settings.DB_REPLICA_LAG:
+        cache.set_many({bumped_key(scope): True for scope in scopes}, settings.DB_REPLICA_LAG)
+    for scope in scopes:
+        key = generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), timeout=None)
@@ -0,0 +1,152 @@
+"""
+Custom middleware for the blog API
+"""
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .routers import replica_reads, request_client
+
+# Counters active in the current context; sync_to_async() copies the context,
+# so the queries an async view runs in worker threads are counted as well
+active_counters = ContextVar('active_query_counters', default=())
+
+
+def count_queries(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection, feeding the active counters"""
+    counters = active_counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        for counter in counters:
+            counter.count += 1
+            counter.duration += elapsed
+
+
+def record_connect(elapsed):
+    """Called by the database backends (blog_project.db) for every connection opened"""
+    for counter in active_counters.get():
+        counter.connects += 1
+        counter.connect_duration += elapsed
+
+
+def install_query_counting(connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+connection_created.connect(install_query_counting)
+
+
+class QueryCounter:
+    """
+    Records the number and total duration of SQL queries run on every
+    database connection while active, in this context. Usable in tests:
+
+        with QueryCounter() as queries:
+            client.get('/api/articles/')
+        assert queries.count == 3
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        # Connections opened (or taken from the pool) and the time spent waiting
+        self.connects = 0
+        self.connect_duration = 0.0
+        self._token = None
+
+    def __enter__(self):
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install_query_counting(connection)
+        self._token = active_counters.set((*active_counters.get(), self))
+        return self
+
+    def __exit__(self, *exc_info):
+        active_counters.reset(self._token)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the SQL queries of every request (available to later middleware
+    and views as request.query_counter). When QUERY_TIMING_HEADERS is on
+    (DEBUG by default) the totals are exposed as a Server-Timing header:
+
+        Server-Timing: db;dur=1.92;desc="3 queries", app;dur=7.41
+
+    Requests that had to open a database connection (or wait for one from
+    the pool) also get db-connect;dur=...;desc="N connections".
+
+    Sync and async capable, so it does not force async views into a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with QueryCounter() as counter:
+            request.query_counter = counter
+            response = self.get_response(request)
+        return self.add_timing(response, counter, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with QueryCounter() as counter:
+            request.query_counter = counter
+            response = await self.get_response(request)
+        return self.add_timing(response, counter, start)
+
+    def add_timing(self, response, counter, start):
+        if getattr(settings, 'QUERY_TIMING_HEADERS', settings.DEBUG):
+            total = (time.perf_counter() - start) * 1000
+            timing = f'db;dur={counter.duration * 1000:.2f};desc="{counter.count} queries", '
+            if counter.connects:
+                timing += (
+                    f'db-connect;dur={counter.connect_duration * 1000:.2f};'
+                    f'desc="{counter.connects} connections", '
+                )
+            timing += f'app;dur={total:.2f}'
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets the reads of safe-method requests go to the read replicas (see
+    blog_project.routers); other requests read from the primary
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replica_reads(request.method in self.safe_methods, request_client(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with replica_reads(request.method in self.safe_methods, request_client(request)):
+            return await self.get_response(request)
@@ -1,7 +1,34 @@
 """
 Custom pagination classes for the blog API
 """
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counting import CountStrategy
+
+
+class CountingPaginator(Paginator):
+    """Django paginator taking its count from a CountStrategy"""
+
+    def __init__(self, object_list, per_page, count_strategy=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy
+        self.count_exact = True
+
+    @cached_property
+    def count(self):
+        if self.count_strategy is None:
+            return super().count
+        count, self.count_exact = self.count_strategy.count()
+        return count
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -10,7 +37,211 @@ class CustomPageNumberPagination(PageNumberPagination):
     - Default page size: 10
     - Client can override with ?page_size= parameter
     - Maximum page size: 50
+    Total counts are cached or estimated (see blog_project.counting);
+    responses carry "count_exact": false when the count is an estimate.
     """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
+    count_strategy_class = CountStrategy
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_strategy = self.count_strategy_class(
+            queryset, request, getattr(view, 'count_cache_scopes', None)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for the async read path: the count and the page
+        rows are fetched with the async ORM
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.count_strategy = self.count_strategy_class(
+            queryset, request, getattr(view, 'count_cache_scopes', None)
+        )
+        paginator = CountingPaginator(queryset, page_size)
+        paginator.count, paginator.count_exact = await self.count_strategy.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        # Rows and prefetches in one hop (aiterator() does not prefetch on Django 4.2)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountingPaginator(object_list, per_page, count_strategy=self.count_strategy)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_exact'] = self.page.paginator.count_exact
+        return response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on (created_at, id):
+    - Every page is an index range scan, so ?cursor= deep in the list costs
+      the same as the first page, and no COUNT(*) is issued
+    - Honours ?page_size= and the same maximum page size
+    - Newest first, or oldest first when the queryset is ordered by created_at;
+      other orderings (?ordering=title, search ranking) are rejected with a 400
+      rather than silently replaced
+    Responses contain next/previous links and results, without a count.
+    """
+    page_size = CustomPageNumberPagination.page_size
+    page_size_query_param = CustomPageNumberPagination.page_size_query_param
+    max_page_size = CustomPageNumberPagination.max_page_size
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_ordering_message = 'Cursor pagination only supports ordering by created_at or -created_at.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for the async read path"""
+        return self.set_page([obj async for obj in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """The page rows plus one, to tell whether there is a next page"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = page_size = self.get_page_size(request)
+        ordering = list(queryset.query.order_by[:1]) or list(queryset.model._meta.ordering[:1])
+        if ordering not in (['created_at'], ['-created_at']):
+            raise ValidationError({'ordering': [self.invalid_ordering_message]})
+        self.descending = ordering != ['created_at']
+
+        self.cursor = cursor = self.decode_cursor(request)
+        self.reverse = reverse = bool(cursor and cursor[2])
+        # Walking backwards means querying in the opposite direction
+        descending = self.descending != reverse
+        if descending:
+            queryset = queryset.order_by('-created_at', '-id')
+        else:
+            queryset = queryset.order_by('created_at', 'id')
+
+        if cursor:
+            created_at, pk = cursor[0], cursor[1]
+            # created_at__lte/gte keeps the predicate usable as an index range
+            if descending:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(id__lt=pk),
+                    created_at__lte=created_at,
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(id__gt=pk),
+                    created_at__gte=created_at,
+                )
+
+        return queryset[:page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        """Return (created_at, id, reverse) from ?cursor=, or None"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk, reverse = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), int(pk), reverse == 'r'
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(obj, reverse=False):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}|{'r' if reverse else 'f'}"
+        return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.page[0], reverse=True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    Page number pagination by default; keyset pagination when the request
+    asks for it with ?pagination=cursor or carries a ?cursor= parameter.
+    The mode is chosen per request, so existing clients keep working.
+    """
+    mode_query_param = 'pagination'
+    page_number_class = CustomPageNumberPagination
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.delegate = self.page_number_class()
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.delegate = self.keyset_class()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.delegate = self.keyset_class()
+        return await self.delegate.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    @property
+    def display_page_controls(self):
+        return self.delegate.display_page_controls
+
+    def to_html(self):
+        return self.delegate.to_html()
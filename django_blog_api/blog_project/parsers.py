@@ -0,0 +1,28 @@
+"""
+JSON request bodies parsed with orjson when it is installed
+
+FastJSONParser returns what DRF's JSONParser returns. UTF-8 bodies are
+parsed by orjson; a body orjson rejects is parsed again by JSONParser, which
+accepts what json does (integers over 64 bits, NaN when STRICT_JSON is off)
+and reports the errors. Other encodings go through JSONParser.
+"""
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
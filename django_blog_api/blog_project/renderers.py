@@ -0,0 +1,41 @@
+"""
+JSON rendering with orjson when it is installed (pip install orjson)
+
+FastJSONRenderer produces the same bytes as DRF's JSONRenderer: datetimes,
+dates, times, Decimals, lazy strings, querysets, ... are converted by DRF's
+encoder, and U+2028/U+2029 are escaped. The exceptions:
+
+- floats in exponent notation are written 1e16 rather than 1e+16 (the same
+  number; serializers render Decimals as strings anyway)
+- NaN and infinities are written null instead of failing under STRICT_JSON
+
+Indented output (the browsable API, `Accept: application/json; indent=4`),
+ensure_ascii (UNICODE_JSON off), COMPACT_JSON off and what orjson cannot
+encode (e.g. integers over 64 bits) go through JSONRenderer. Without orjson
+FastJSONRenderer is JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # JSONRenderer encodes it or raises its own error
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,181 @@
+"""
+Response cache for anonymous GET requests on public endpoints
+
+CachedResponseMixin stores the rendered body of successful anonymous GET
+responses in Django's cache framework, keyed on the path, the normalized
+query parameters, the Accept header and the current generation of the data
+the view depends on (see blog_project.invalidation). A hit skips DRF
+dispatch, the queryset and serialization entirely; only the throttles run,
+so cached responses count against the client's rate limit.
+
+Writes bump the generations (articles/signals.py, comments/signals.py), so a
+cached response never outlives a write to the data it was built from.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.exceptions import Throttled
+
+from .invalidation import aget_generations, arecently_bumped, get_generations, recently_bumped
+from .routers import read_from_replica
+
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+CACHED_HEADERS = ('Content-Type', 'Vary', 'Allow', 'ETag', 'Last-Modified')
+
+
+def increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+async def aincrement(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+def get_stats():
+    """Hit/miss counters of the response cache"""
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+class CachedResponseMixin:
+    """
+    APIView mixin caching anonymous GET responses.
+    `response_cache_scopes` (or get_response_cache_scopes()) names the
+    generation scopes whose writes must invalidate the cached responses.
+    """
+    response_cache_scopes = ()
+
+    def get_response_cache_scopes(self):
+        return self.response_cache_scopes
+
+    def is_response_cacheable(self, request):
+        return (
+            settings.RESPONSE_CACHE_ENABLED
+            and request.method == 'GET'
+            # JWT is the only authentication scheme, so no header means anonymous
+            and 'HTTP_AUTHORIZATION' not in request.META
+        )
+
+    def make_response_cache_key(self, request, generations):
+        params = sorted(
+            (key, value) for key, values in request.GET.lists() for value in values
+        )
+        raw = json.dumps([
+            request.path,
+            params,
+            request.META.get('HTTP_ACCEPT', ''),
+            generations,
+        ])
+        return 'response:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def get_response_cache_key(self, request):
+        return self.make_response_cache_key(request, get_generations(*self.get_response_cache_scopes()))
+
+    async def aget_response_cache_key(self, request):
+        return self.make_response_cache_key(request, await aget_generations(*self.get_response_cache_scopes()))
+
+    def get_cached_response(self, key, request):
+        """The cached response for `key`, or None on a miss (both are counted)"""
+        cached = cache.get(key)
+        increment(MISSES_KEY if cached is None else HITS_KEY)
+        return self.response_from_cache(cached, request) if cached is not None else None
+
+    async def aget_cached_response(self, key, request):
+        """get_cached_response() with the async cache API"""
+        cached = await cache.aget(key)
+        await aincrement(MISSES_KEY if cached is None else HITS_KEY)
+        return self.response_from_cache(cached, request) if cached is not None else None
+
+    def response_from_cache(self, cached, request):
+        content, status, headers = cached
+        response = HttpResponse(content, status=status)
+        for header, value in headers.items():
+            response[header] = value
+        response['X-Cache'] = 'HIT'
+        # Cached validators still answer If-None-Match/If-Modified-Since
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+            response=response,
+        )
+
+    def may_be_stale(self):
+        """Built from a replica that may not have the latest writes to the scopes yet"""
+        return read_from_replica() and recently_bumped(*self.get_response_cache_scopes())
+
+    async def amay_be_stale(self):
+        return read_from_replica() and await arecently_bumped(*self.get_response_cache_scopes())
+
+    def cache_entry(self, response):
+        """What to store for a fresh response, None when it is not cacheable"""
+        if response.status_code != 200 or response.streaming:
+            return None
+        if hasattr(response, 'render'):
+            response.render()
+        headers = {header: response[header] for header in CACHED_HEADERS if header in response}
+        return response.content, response.status_code, headers
+
+    def cache_response(self, key, response):
+        """Store a fresh response under `key` when it is cacheable"""
+        entry = self.cache_entry(response)
+        if entry is not None and not self.may_be_stale():
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def acache_response(self, key, response):
+        """cache_response() with the async cache API"""
+        entry = self.cache_entry(response)
+        if entry is not None and not await self.amay_be_stale():
+            await cache.aset(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def throttled_response(self, request, *args, **kwargs):
+        """
+        Hits are served before DRF's initial(), which checks the throttles:
+        check them for the DRF `request` and return the 429 response, or
+        None when the request is allowed
+        """
+        try:
+            self.check_throttles(request)
+        except Throttled as exc:
+            return self.finalize_response(request, self.handle_exception(exc), *args, **kwargs)
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        # self.kwargs is needed by get_response_cache_scopes() before dispatch sets it
+        self.kwargs = kwargs
+        if not self.is_response_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        response = self.get_cached_response(key, request)
+        if response is not None:
+            self.args = args
+            self.request = self.initialize_request(request, *args, **kwargs)
+            self.headers = self.default_response_headers
+            throttled = self.throttled_response(self.request, *args, **kwargs)
+            return throttled if throttled is not None else response
+        return self.cache_response(key, super().dispatch(request, *args, **kwargs))
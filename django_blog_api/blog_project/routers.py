@@ -0,0 +1,121 @@
+"""
+Database router sending reads to the read replicas (DATABASE_REPLICAS)
+
+Reads go to a random replica only where stale data is harmless:
+
+- inside a GET/HEAD/OPTIONS request (ReplicaRoutingMiddleware) or a
+  replica_reads() block, e.g. in a script
+- until the request or block writes: a write goes to the primary, and so
+  does every read after it (read-after-write, e.g. perform_create() then
+  serializing the response)
+- outside transactions on the primary
+- except for the client that wrote: its reads stay on the primary for
+  DB_REPLICA_LAG seconds (the time a replica may lag behind, recorded in
+  the shared cache per Authorization header), so it reads its own writes
+
+Other clients may read data up to DB_REPLICA_LAG seconds old. They never
+cache it as current: responses and counts built from replica reads are not
+stored while their generations were bumped less than DB_REPLICA_LAG ago
+(see read_from_replica() and blog_project.invalidation.recently_bumped()).
+
+Everything else (writes, unsafe requests, management commands, tests
+without replicas) uses the primary.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+def recent_write_key(client):
+    return f'db:recent-write:{client}'
+
+
+def request_client(request):
+    """The requester's credentials (a digest), None for anonymous requests"""
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return hashlib.md5(authorization.encode()).hexdigest()
+
+
+class RoutingState:
+    def __init__(self, replicas_allowed, client=None):
+        self.replicas_allowed = replicas_allowed
+        self.client = client
+        self.wrote = False
+        self.read_replica = False
+        self._recent_write = None
+
+    @property
+    def recent_write(self):
+        """Whether replicas may lag behind a write of this client, checked once per request"""
+        if self._recent_write is None:
+            self._recent_write = (
+                bool(settings.DB_REPLICA_LAG and self.client)
+                and cache.get(recent_write_key(self.client)) is not None
+            )
+        return self._recent_write
+
+
+@contextmanager
+def replica_reads(allowed=True, client=None):
+    """
+    Route the reads of the block to the replicas (allowed=False: to the
+    primary); `client` identifies the requester for read-your-writes
+    """
+    token = _routing.set(RoutingState(allowed, client))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def read_from_replica():
+    """Whether the current request or block read from a replica so far"""
+    state = _routing.get()
+    return state is not None and state.read_replica
+
+
+def record_write():
+    state = _routing.get()
+    if state is None or state.wrote:
+        return
+    state.wrote = True
+    if settings.DB_REPLICA_LAG and state.client:
+        cache.set(recent_write_key(state.client), True, settings.DB_REPLICA_LAG)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        state = _routing.get()
+        if (
+            not replicas
+            or state is None
+            or not state.replicas_allowed
+            or state.wrote
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or state.recent_write
+        ):
+            return DEFAULT_DB_ALIAS
+        state.read_replica = True
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if settings.DATABASE_REPLICAS:
+            record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
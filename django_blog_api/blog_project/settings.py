@@ -2,9 +2,11 @@
 Django settings for blog_project project.
 """
 
+import os
 from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog_project.middleware.QueryBudgetMiddleware',
+    'blog_project.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -54,6 +58,13 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'blog_project.urls'
 
+# Serve anonymous GET requests on the article list/detail and comment list with
+# async views (see blog_project.async_views); asgi.py turns this on by default
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Expose per-request SQL query count/time as a Server-Timing header
+QUERY_TIMING_HEADERS = config('QUERY_TIMING_HEADERS', default=DEBUG, cast=bool)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -79,26 +90,97 @@ WSGI_APPLICATION = 'blog_project.wsgi.application'
 # Allow SQLite for testing when PostgreSQL is not available
 USE_SQLITE = config('USE_SQLITE', default=False, cast=bool)
 
+# Connection management (blog_project.db): persistent connections are kept
+# DB_CONN_MAX_AGE seconds (0 = one connection per request) and checked before
+# reuse when DB_CONN_HEALTH_CHECKS is on. DB_POOL_SIZE > 0 takes connections
+# from an in-process pool of that size instead (persistent connections off),
+# which also works under ASGI, where every request runs in a new thread.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=0, cast=int)
+
+DATABASE_CONNECTION = {
+    'CONN_MAX_AGE': 0 if DB_POOL_SIZE else DB_CONN_MAX_AGE,
+    'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+    'POOL': {
+        'max_size': DB_POOL_SIZE,
+        # Seconds a request waits for a free connection before failing
+        'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+        # Connections are recycled after this many seconds
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+    },
+}
+
 if USE_SQLITE:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'blog_project.db.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            **DATABASE_CONNECTION,
         }
     }
 else:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': 'blog_project.db.postgresql',
             'NAME': config('DB_NAME'),
             'USER': config('DB_USER'),
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
+            **DATABASE_CONNECTION,
         }
     }
 
 
+# Read replicas of the default database: hosts (host or host:port, same name and
+# credentials) with PostgreSQL, database files with USE_SQLITE. Reads of GET
+# requests go to a random replica (blog_project.routers), except those of a
+# client for DB_REPLICA_LAG seconds after it wrote, while a replica may be behind.
+DB_READ_REPLICAS = config('DB_READ_REPLICAS', default='', cast=Csv())
+DB_REPLICA_LAG = config('DB_REPLICA_LAG', default=5.0, cast=float)
+
+DATABASE_REPLICAS = []
+for index, replica in enumerate(DB_READ_REPLICAS, start=1):
+    alias = f'replica{index}'
+    if USE_SQLITE:
+        location = {'NAME': BASE_DIR / replica}
+    else:
+        host, _, port = replica.partition(':')
+        location = {'HOST': host, 'PORT': port or DATABASES['default']['PORT']}
+    DATABASES[alias] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['blog_project.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Defaults to a per-process in-memory cache; point CACHE_BACKEND/CACHE_LOCATION
+# at a shared cache (e.g. django.core.cache.backends.redis.RedisCache) in production
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='blog-api'),
+    }
+}
+
+# Whether every process sees the same default cache. Caches invalidated by
+# bumping generations on writes (responses, list counts) are only correct then:
+# with a per-process cache a write invalidates the process that handled it,
+# other workers keep serving stale data. Per-process backends are not shared
+# unless the app runs as a single process (set CACHE_SHARED=True then).
+CACHE_SHARED = config(
+    'CACHE_SHARED',
+    default=CACHES['default']['BACKEND'] not in (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.dummy.DummyCache',
+    ),
+    cast=bool,
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -118,6 +200,36 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (see users.hashers): PASSWORD_HASHER picks the algorithm
+# of new hashes, the others keep verifying existing ones; passwords are
+# rehashed on login when the algorithm or its cost changed.
+# argon2 needs the argon2-cffi package.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(f'PASSWORD_HASHER must be one of {", ".join(_PASSWORD_HASHERS)}')
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS.pop(PASSWORD_HASHER),
+    *_PASSWORD_HASHERS.values(),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=600000, cast=int)
+# OWASP's minimum for argon2id: 19 MiB, 2 iterations, 1 lane
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config('PASSWORD_SCRYPT_BLOCK_SIZE', default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config('PASSWORD_SCRYPT_PARALLELISM', default=1, cast=int)
+# Threads computing hashes (0 = hash in the request thread)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=os.cpu_count() or 1, cast=int)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -140,11 +252,16 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Tests
+# blog_project.test_runner.TestRunner applies its test_settings to the whole suite
+
+TEST_RUNNER = 'blog_project.test_runner.TestRunner'
+
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
@@ -152,14 +269,101 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_PAGINATION_CLASS': 'blog_project.pagination.CustomPageNumberPagination',
+    # JSON with orjson when installed, byte for byte what DRF's JSONRenderer
+    # and JSONParser produce otherwise (see blog_project.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'blog_project.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'blog_project.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets (see blog_project.throttling): 'N/period' lets a client
+    # burst N requests, then refills one every period/N; 'none' disables one
+    'DEFAULT_THROTTLE_CLASSES': [
+        'blog_project.throttling.AnonBucketThrottle',
+        'blog_project.throttling.UserBucketThrottle',
+        'blog_project.throttling.ScopedBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Every request, per IP address (anonymous) or per user
+        'anon': config('THROTTLE_RATE_ANON', default='600/min'),
+        'user': config('THROTTLE_RATE_USER', default='1200/min'),
+        # Writes of the views declaring these scopes
+        'register': config('THROTTLE_RATE_REGISTER', default='10/hour'),
+        'login': config('THROTTLE_RATE_LOGIN', default='20/min'),
+        'comments': config('THROTTLE_RATE_COMMENTS', default='30/min'),
+    },
+    # Reverse proxies in front of the app: the client address is taken that
+    # many entries from the end of X-Forwarded-For. 0 uses REMOTE_ADDR, so
+    # clients cannot pick their own bucket with a forged header.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
+# Rate limiting: THROTTLE_STORE is 'cache' (buckets in the default cache,
+# shared by every process), 'local' (in this process only) or 'auto' (local
+# unless the default cache is shared, see CACHE_SHARED).
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+THROTTLE_STORE = config('THROTTLE_STORE', default='auto')
+if THROTTLE_STORE not in ('auto', 'cache', 'local'):
+    raise ImproperlyConfigured('THROTTLE_STORE must be one of auto, cache, local')
+
+# Paginated list counts: exact counts are cached (invalidated on writes, so
+# by default only with a shared cache; 0 disables caching them); on
+# PostgreSQL, lists the planner estimates above the threshold report the
+# estimate instead ("count_exact": false). A threshold of 0 disables estimates.
+PAGINATION_COUNT_CACHE_TIMEOUT = config(
+    'PAGINATION_COUNT_CACHE_TIMEOUT', default=300 if CACHE_SHARED else 0, cast=int
+)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = config('PAGINATION_COUNT_ESTIMATE_THRESHOLD', default=100000, cast=int)
+
+# Anonymous GET responses of the public endpoints are cached (see
+# blog_project.response_cache), by default only with a shared cache; writes
+# invalidate them immediately, the timeout only bounds how long unused
+# entries stay in the cache
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=CACHE_SHARED, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Articles read per query by the streaming export (/api/articles/export/), with
+# their tags and comments prefetched per chunk: bounds the export's memory
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=500, cast=int)
+
+# Comment events (/api/articles/<id>/comments/events/, see blog_project.events):
+# the broker, the events kept per article for Last-Event-ID resume, the seconds
+# between keepalive comments and after which a stream ends (clients reconnect)
+EVENTS_BROKER = config('EVENTS_BROKER', default='blog_project.events.LocalBroker')
+EVENTS_HISTORY = config('EVENTS_HISTORY', default=100, cast=int)
+EVENTS_KEEPALIVE = config('EVENTS_KEEPALIVE', default=15.0, cast=float)
+EVENTS_STREAM_TIMEOUT = config('EVENTS_STREAM_TIMEOUT', default=300.0, cast=float)
+
+# Article search backend: 'auto' uses the indexed full-text search of the
+# current database (PostgreSQL tsvector or SQLite FTS5), 'legacy' uses icontains.
+# ARTICLE_SEARCH_CONFIG is the PostgreSQL text-search configuration used by the
+# documents (including the migration backfill) and the queries; existing
+# documents keep the old one until `manage.py rebuild_search_index`
+ARTICLE_SEARCH_BACKEND = config('ARTICLE_SEARCH_BACKEND', default='auto')
+ARTICLE_SEARCH_CONFIG = config('ARTICLE_SEARCH_CONFIG', default='english')
+
+# Maximum number of items (creates + updates + deletes) per POST /api/articles/bulk/
+ARTICLE_BULK_MAX_ITEMS = config('ARTICLE_BULK_MAX_ITEMS', default=10000, cast=int)
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    # Tokens carry username/is_staff claims, see users.authentication
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.ClaimsTokenObtainPairSerializer',
 }
 
+# Seconds the fields of users authenticated with claim-less (or revoked) tokens
+# are cached (with a shared cache, see CACHE_SHARED)
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+# Seconds a per-process cache keeps those fields and the time the user's claims
+# were last revoked: revocations by other processes take effect after that long
+AUTH_LOCAL_CACHE_TIMEOUT = config('AUTH_LOCAL_CACHE_TIMEOUT', default=5, cast=int)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -0,0 +1,25 @@
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the suite with test_settings overridden (tests can override them again)"""
+    test_settings = {
+        # The suite runs in one process: its in-process cache is shared by
+        # every request, so the caches relying on it are on as in production
+        'CACHE_SHARED': True,
+        'RESPONSE_CACHE_ENABLED': True,
+        'PAGINATION_COUNT_CACHE_TIMEOUT': 300,
+        # The suite's clients share one IP address; the throttling tests turn
+        # rate limiting back on
+        'THROTTLE_ENABLED': False,
+    }
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.settings_override = override_settings(**self.test_settings)
+        self.settings_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.settings_override.disable()
+        super().teardown_test_environment(**kwargs)
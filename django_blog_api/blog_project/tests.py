@@ -0,0 +1,718 @@
+import asyncio
+import datetime
+import decimal
+import io
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router, transaction
+from django.db.utils import ConnectionHandler
+from django.test import (
+    AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from articles.models import Article
+from articles.views import ArticleListCreateView, ArticleRetrieveUpdateDestroyView
+from comments.models import Comment
+from comments.views import ArticleCommentListCreateView
+from users.authentication import ClaimsRefreshToken
+from .benchmark import find_regressions
+from .counting import CountStrategy
+from .db.pool import ConnectionPool, PoolTimeout, close_pools, ping
+from .middleware import QueryCounter
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .routers import replica_reads
+from .response_cache import get_stats
+from .throttling import CacheBucketStore, LocalBucketStore, local_store, parse_rate
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+
+    @override_settings(QUERY_TIMING_HEADERS=True)
+    def test_server_timing_header(self):
+        response = self.client.get('/api/articles/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    @override_settings(QUERY_TIMING_HEADERS=False)
+    def test_no_header_when_disabled(self):
+        response = self.client.get('/api/health/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_query_counter(self):
+        with QueryCounter() as queries:
+            self.client.get('/api/articles/')
+        self.assertGreater(queries.count, 0)
+        self.assertGreater(queries.duration, 0)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        cls.article = Article.objects.create(title='Cached', content='Body', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_second_anonymous_request_is_served_from_cache(self):
+        first = self.client.get('/api/articles/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/articles/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(get_stats()['hits'], 1)
+
+    def test_query_params_are_normalized(self):
+        self.client.get('/api/articles/?page=1&page_size=5')
+        response = self.client.get('/api/articles/?page_size=5&page=1')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.get('/api/articles/')
+        token = RefreshToken.for_user(self.author).access_token
+        response = self.client.get('/api/articles/', headers={'Authorization': f'Bearer {token}'})
+        self.assertNotIn('X-Cache', response)
+
+    def test_writes_invalidate_cached_responses(self):
+        detail = f'/api/articles/{self.article.pk}/'
+        comments = f'/api/articles/{self.article.pk}/comments/'
+        for url in ('/api/articles/', detail, comments):
+            self.client.get(url)
+
+        Comment.objects.create(article=self.article, author=self.author, content='New')
+        for url in ('/api/articles/', detail, comments):
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], 'MISS', url)
+        self.assertEqual(response.json()['count'], 1)
+
+        self.article.title = 'Renamed'
+        self.article.save()
+        response = self.client.get(detail)
+        self.assertEqual(response.json()['title'], 'Renamed')
+
+    def test_other_articles_stay_cached(self):
+        other = Article.objects.create(title='Other', content='Body', author=self.author)
+        self.client.get(f'/api/articles/{other.pk}/')
+        Comment.objects.create(article=self.article, author=self.author, content='New')
+        response = self.client.get(f'/api/articles/{other.pk}/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_errors_are_not_cached(self):
+        self.client.get('/api/articles/999999/')
+        response = self.client.get('/api/articles/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, PAGINATION_COUNT_ESTIMATE_THRESHOLD=100)
+class CountStrategyTests(TestCase):
+    """Exact counts are cached until a write; large planner estimates replace them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'pass')
+        for i in range(3):
+            Article.objects.create(title=f'Article {i}', content='Body', author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def list_counts(self):
+        data = self.client.get('/api/articles/').json()
+        return data['count'], data['count_exact']
+
+    def test_estimate_above_the_threshold(self):
+        with patch.object(CountStrategy, 'estimate', return_value=25000) as estimate:
+            self.assertEqual(self.list_counts(), (25000, False))
+        estimate.assert_called_once()
+
+    def test_exact_count_below_the_threshold_or_without_estimate(self):
+        for estimate in (99, None):
+            cache.clear()
+            with self.subTest(estimate=estimate), patch.object(CountStrategy, 'estimate', return_value=estimate):
+                self.assertEqual(self.list_counts(), (3, True))
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_no_estimate_when_disabled(self):
+        with patch.object(CountStrategy, 'estimate') as estimate:
+            self.assertEqual(self.list_counts(), (3, True))
+        estimate.assert_not_called()
+
+    @override_settings(PAGINATION_COUNT_CACHE_TIMEOUT=0)
+    def test_uncached_counts(self):
+        self.list_counts()
+        # count, page rows, tags: the cache is not read nor filled
+        with self.assertNumQueries(3):
+            self.assertEqual(self.list_counts(), (3, True))
+        self.assertFalse(any(key.startswith(':1:count:') for key in cache._cache))
+
+    def test_cached_count_until_a_write(self):
+        self.assertEqual(self.list_counts(), (3, True))
+        with self.assertNumQueries(2):  # page rows and tags, no COUNT
+            self.assertEqual(self.list_counts(), (3, True))
+        Article.objects.first().delete()
+        self.assertEqual(self.list_counts(), (2, True))
+
+
+@override_settings(
+    RESPONSE_CACHE_ENABLED=False,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ConditionalRequestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        cls.article = Article.objects.create(title='Polled', content='Body', author=cls.admin)
+        cls.detail = f'/api/articles/{cls.article.pk}/'
+        cls.comments = f'/api/articles/{cls.article.pk}/comments/'
+
+    def setUp(self):
+        self.admin_auth = f'Bearer {RefreshToken.for_user(self.admin).access_token}'
+
+    def test_unchanged_article_returns_304_without_serializing(self):
+        etag = self.client.get(self.detail)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_new_comment_changes_the_validators(self):
+        detail_etag = self.client.get(self.detail)['ETag']
+        comments_etag = self.client.get(self.comments)['ETag']
+        self.assertEqual(self.client.get(self.comments, HTTP_IF_NONE_MATCH=comments_etag).status_code, 304)
+
+        comment = Comment.objects.create(article=self.article, author=self.admin, content='New')
+        self.assertEqual(self.client.get(self.detail, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+        response = self.client.get(self.comments, HTTP_IF_NONE_MATCH=comments_etag)
+        self.assertEqual(response.status_code, 200)
+
+        comment.content = 'Edited'
+        comment.save()
+        self.assertEqual(self.client.get(self.comments, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.detail)['Last-Modified']
+        response = self.client.get(self.detail, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_match_prevents_lost_updates(self):
+        etag = self.client.get(self.detail)['ETag']
+        response = self.client.patch(
+            self.detail, {'title': 'First'}, content_type='application/json',
+            HTTP_AUTHORIZATION=self.admin_auth, HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # A second client still holding the old ETag
+        response = self.client.patch(
+            self.detail, {'title': 'Second'}, content_type='application/json',
+            HTTP_AUTHORIZATION=self.admin_auth, HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 412)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'First')
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_responses_honour_validators(self):
+        cache.clear()
+        etag = self.client.get(self.detail)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class AsyncReadViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'pass', is_staff=True)
+        cls.article = Article.objects.create(title='Async', content='Body', author=cls.author)
+        Comment.objects.create(article=cls.article, author=cls.author, content='First')
+        cls.factory = AsyncRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    async def get(self, view_class, path, data=None, **extra):
+        if view_class is ArticleCommentListCreateView:
+            kwargs = {'article_id': self.article.pk}
+        elif view_class is ArticleRetrieveUpdateDestroyView:
+            kwargs = {'pk': self.article.pk}
+        else:
+            kwargs = {}
+        return await view_class.as_async_view()(self.factory.get(path, data, **extra), **kwargs)
+
+    async def test_list_matches_the_sync_view(self):
+        response = await self.get(ArticleListCreateView, '/api/articles/')
+        self.assertEqual(response.status_code, 200)
+        expected = await sync_to_async(self.client.get)('/api/articles/')
+        self.assertEqual(json.loads(response.content), expected.json())
+
+    async def test_cursor_pagination_and_sparse_fields(self):
+        response = await self.get(
+            ArticleListCreateView, '/api/articles/', data={'pagination': 'cursor', 'fields': 'id,title'}
+        )
+        self.assertEqual(json.loads(response.content)['results'], [{'id': self.article.pk, 'title': 'Async'}])
+
+    async def test_detail_and_conditional_get(self):
+        path = f'/api/articles/{self.article.pk}/'
+        response = await self.get(ArticleRetrieveUpdateDestroyView, path)
+        self.assertEqual(json.loads(response.content)['title'], 'Async')
+        response = await self.get(ArticleRetrieveUpdateDestroyView, path, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_missing_article(self):
+        view = ArticleRetrieveUpdateDestroyView.as_async_view()
+        response = await view(self.factory.get('/api/articles/0/'), pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_comment_list(self):
+        response = await self.get(ArticleCommentListCreateView, f'/api/articles/{self.article.pk}/comments/')
+        self.assertEqual([c['content'] for c in json.loads(response.content)['results']], ['First'])
+
+    async def test_threaded_comment_list(self):
+        first = await Comment.objects.aget(article=self.article)
+        await sync_to_async(Comment.objects.create)(
+            article=self.article, author=self.author, content='Reply', parent=first
+        )
+        path = f'/api/articles/{self.article.pk}/comments/'
+        response = await self.get(ArticleCommentListCreateView, path, data={'thread': 'true'})
+        expected = await sync_to_async(self.client.get)(path, {'thread': 'true'})
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(expected.json()['results'][0]['replies'][0]['content'], 'Reply')
+
+    async def test_cache_is_not_used_on_the_event_loop(self):
+        backend = caches['default']
+        throttled = self.settings(
+            REST_FRAMEWORK=throttle_rates(anon='100/min'), THROTTLE_ENABLED=True, THROTTLE_STORE='cache',
+        )
+
+        def off_loop(method):
+            def call(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return method(*args, **kwargs)
+                raise AssertionError(f'cache.{method.__name__}() called on the event loop')
+            return call
+
+        methods = ('get', 'get_many', 'set', 'add', 'incr', 'decr', 'touch')
+        with throttled, patch.multiple(backend, **{name: off_loop(getattr(backend, name)) for name in methods}):
+            responses = [await self.get(ArticleListCreateView, '/api/articles/') for _ in range(2)]
+        self.assertEqual([response['X-Cache'] for response in responses], ['MISS', 'HIT'])
+
+    async def test_authenticated_requests_use_the_sync_view(self):
+        token = ClaimsRefreshToken.for_user(self.author).access_token
+        with patch.object(ArticleListCreateView, 'adispatch') as adispatch:
+            response = await self.get(
+                ArticleListCreateView, '/api/articles/', headers={'Authorization': f'Bearer {token}'}
+            )
+        adispatch.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(Path(self.tmp.name) / 'pool.sqlite3')
+
+    def pool(self, **kwargs):
+        pool = ConnectionPool(lambda: sqlite3.connect(self.path, check_same_thread=False), **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_released_connections_are_reused(self):
+        pool = self.pool(max_size=2)
+        conn = pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(pool.stats(), {'size': 1, 'idle': 0, 'max_size': 2})
+
+    def test_waits_at_most_timeout_when_exhausted(self):
+        pool = self.pool(max_size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_broken_and_expired_connections_are_replaced(self):
+        pool = self.pool(max_size=1, max_lifetime=0)
+        conn = pool.acquire()
+        pool.release(conn)  # older than max_lifetime
+        self.assertEqual(pool.stats()['size'], 0)
+
+        pool = self.pool(max_size=1, check=ping)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.close()  # e.g. the server went away
+        self.assertIsNot(pool.acquire(), conn)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def connections(self, **settings):
+        handler = ConnectionHandler({'default': {
+            'ENGINE': 'blog_project.db.sqlite3', 'NAME': self.path, 'CONN_MAX_AGE': 0, **settings,
+        }})
+        self.addCleanup(handler.close_all)
+        self.addCleanup(close_pools)
+        return handler
+
+    def test_database_wrapper_uses_the_pool(self):
+        connection = self.connections(POOL={'max_size': 2})['default']
+        with QueryCounter() as queries:
+            connection.ensure_connection()
+        raw = connection.connection
+        connection.close()
+        connection.ensure_connection()
+        self.assertIs(connection.connection, raw)
+        self.assertEqual(queries.connects, 1)
+        self.assertGreater(queries.connect_duration, 0)
+
+    def test_pool_requires_non_persistent_connections(self):
+        connection = self.connections(POOL={'max_size': 2}, CONN_MAX_AGE=60)['default']
+        with self.assertRaises(ImproperlyConfigured):
+            connection.ensure_connection()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], DB_REPLICA_LAG=0, RESPONSE_CACHE_ENABLED=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    A second SQLite database stands in for the replica: a copy of the
+    primary taken before each test, so rows created by a test exist on the
+    primary only and show where each read went
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Registered after the test case set up its databases: the test
+        # runner only knows about the aliases in DATABASES
+        cls.tmp = tempfile.TemporaryDirectory()
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict, 'NAME': str(Path(cls.tmp.name) / 'replica.sqlite3'),
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass', is_staff=True)
+        for alias in ('default', 'replica'):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(connections['replica'].connection)
+        self.article = Article.objects.create(title='Primary only', content='Body', author=self.author)
+        self.auth = f'Bearer {ClaimsRefreshToken.for_user(self.author).access_token}'
+
+    def test_get_requests_read_from_the_replica(self):
+        self.assertEqual(self.client.get('/api/articles/').json()['count'], 0)
+        self.assertEqual(self.client.get(f'/api/articles/{self.article.pk}/').status_code, 404)
+
+    def test_writes_and_reads_after_them_use_the_primary(self):
+        response = self.client.patch(
+            f'/api/articles/{self.article.pk}/', {'title': 'Edited'},
+            content_type='application/json', HTTP_AUTHORIZATION=self.auth,
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            '/api/articles/', {'title': 'New', 'content': 'Body'},
+            content_type='application/json', HTTP_AUTHORIZATION=self.auth,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'author')
+        self.assertFalse(Article.objects.using('replica').filter(title='New').exists())
+
+    @override_settings(DB_REPLICA_LAG=5, PAGINATION_COUNT_CACHE_TIMEOUT=0)
+    def test_writers_read_their_writes_while_replicas_may_lag(self):
+        response = self.client.post(
+            '/api/articles/', {'title': 'Recent', 'content': 'Body'},
+            content_type='application/json', HTTP_AUTHORIZATION=self.auth,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.client.get('/api/articles/', HTTP_AUTHORIZATION=self.auth).json()['count'], 2)
+        # Other clients keep reading from the replica
+        other = f'Bearer {ClaimsRefreshToken.for_user(User.objects.create_user("other")).access_token}'
+        self.assertEqual(self.client.get('/api/articles/', HTTP_AUTHORIZATION=other).json()['count'], 0)
+
+    @override_settings(DB_REPLICA_LAG=5, RESPONSE_CACHE_ENABLED=True, PAGINATION_COUNT_CACHE_TIMEOUT=300)
+    def test_replica_reads_are_not_cached_right_after_a_write(self):
+        Article.objects.create(title='Recent', content='Body', author=self.author)
+        for _ in range(2):
+            response = self.client.get('/api/articles/')
+            self.assertEqual((response.json()['count'], response['X-Cache']), (0, 'MISS'))
+        self.assertEqual(
+            [key for key in cache._cache if ':count:' in key or ':response:' in key], []
+        )
+        # Once replicas caught up
+        cache.delete_many(['generation-bumped:articles.article', 'generation-bumped:articles.tag'])
+        self.client.get('/api/articles/')
+        self.assertEqual(self.client.get('/api/articles/')['X-Cache'], 'HIT')
+
+    def test_routing_outside_requests(self):
+        self.assertEqual(router.db_for_read(Article), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Article), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Article), 'default')
+        with replica_reads(allowed=False):
+            self.assertEqual(router.db_for_read(Article), 'default')
+
+
+def throttle_rates(**rates):
+    return {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {
+        'anon': None, 'user': None, 'register': None, 'login': None, 'comments': None, **rates,
+    }}
+
+
+@override_settings(
+    THROTTLE_ENABLED=True,
+    THROTTLE_STORE='local',
+    RESPONSE_CACHE_ENABLED=False,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        local_store.clear()
+        cache.clear()
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pass')
+        self.other = User.objects.create_user('other', 'other@example.com', 'pass')
+
+    def auth(self, user):
+        return f'Bearer {ClaimsRefreshToken.for_user(user).access_token}'
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/min'), (10, 6.0))
+        self.assertEqual(parse_rate('2/s'), (2, 0.5))
+        self.assertEqual(parse_rate('24/day'), (24, 3600.0))
+        self.assertIsNone(parse_rate('none'))
+        self.assertIsNone(parse_rate(None))
+
+    def test_stores_allow_a_burst_then_one_request_per_interval(self):
+        for store in (LocalBucketStore(), CacheBucketStore()):
+            with self.subTest(store=type(store).__name__):
+                now = 1000.0
+                self.assertEqual([store.consume('bucket', 3, 10.0, now) for _ in range(3)], [0.0] * 3)
+                self.assertAlmostEqual(store.consume('bucket', 3, 10.0, now), 10.0)
+                # Refused requests take no token
+                self.assertAlmostEqual(store.consume('bucket', 3, 10.0, now + 4), 6.0)
+                self.assertEqual(store.consume('bucket', 3, 10.0, now + 10), 0.0)
+                self.assertAlmostEqual(store.consume('bucket', 3, 10.0, now + 10), 10.0)
+                self.assertEqual(store.consume('other', 3, 10.0, now + 10), 0.0)
+                # Idle long enough, the bucket is full again
+                self.assertEqual([store.consume('bucket', 3, 10.0, now + 100) for _ in range(3)], [0.0] * 3)
+                self.assertGreater(store.consume('bucket', 3, 10.0, now + 100), 0)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(anon='3/min'))
+    def test_anonymous_requests_are_limited_per_ip_address(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/health/').status_code, 200)
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(self.client.get('/api/health/', REMOTE_ADDR='10.0.0.2').status_code, 200)
+        # Authenticated requests are counted per user instead
+        self.assertEqual(
+            self.client.get('/api/health/', HTTP_AUTHORIZATION=self.auth(self.user)).status_code, 200
+        )
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(user='2/hour'))
+    def test_authenticated_requests_are_limited_per_user(self):
+        for _ in range(2):
+            self.assertEqual(
+                self.client.get('/api/me/', HTTP_AUTHORIZATION=self.auth(self.user)).status_code, 200
+            )
+        response = self.client.get('/api/me/', HTTP_AUTHORIZATION=self.auth(self.user))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1800')
+        # From another address too, and not for another user
+        self.assertEqual(self.client.get(
+            '/api/me/', HTTP_AUTHORIZATION=self.auth(self.user), REMOTE_ADDR='10.0.0.2'
+        ).status_code, 429)
+        self.assertEqual(
+            self.client.get('/api/me/', HTTP_AUTHORIZATION=self.auth(self.other)).status_code, 200
+        )
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(comments='2/min'))
+    def test_comment_writes_are_limited_per_user(self):
+        article = Article.objects.create(title='Busy', content='Body', author=self.user)
+        path = f'/api/articles/{article.pk}/comments/'
+        for _ in range(2):
+            response = self.client.post(
+                path, {'content': 'Hi'}, content_type='application/json', HTTP_AUTHORIZATION=self.auth(self.user)
+            )
+            self.assertEqual(response.status_code, 201)
+        response = self.client.post(
+            path, {'content': 'Hi'}, content_type='application/json', HTTP_AUTHORIZATION=self.auth(self.user)
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(Comment.objects.count(), 2)
+        # Reads are not limited by the scope
+        self.assertEqual(self.client.get(path, HTTP_AUTHORIZATION=self.auth(self.user)).status_code, 200)
+        response = self.client.post(
+            path, {'content': 'Hi'}, content_type='application/json', HTTP_AUTHORIZATION=self.auth(self.other)
+        )
+        self.assertEqual(response.status_code, 201)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(register='1/hour', login='1/min'))
+    def test_registration_and_login_are_limited_per_ip_address(self):
+        data = {'username': 'new', 'email': 'new@example.com', 'password': 'a-long-passphrase'}
+        self.assertEqual(self.client.post('/api/register/', data).status_code, 201)
+        response = self.client.post('/api/register/', {**data, 'username': 'newer'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3600')
+
+        credentials = {'username': 'reader', 'password': 'wrong'}
+        self.assertEqual(self.client.post('/api/token/', credentials).status_code, 401)
+        self.assertEqual(self.client.post('/api/token/', credentials).status_code, 429)
+        self.assertEqual(self.client.post('/api/token/', credentials, REMOTE_ADDR='10.0.0.2').status_code, 401)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(login='1/min'))
+    def test_forwarded_for_cannot_pick_the_bucket(self):
+        credentials = {'username': 'reader', 'password': 'wrong'}
+        self.assertEqual(self.client.post('/api/token/', credentials).status_code, 401)
+        for forwarded in ('10.0.0.2', '10.0.0.3, 10.0.0.4'):
+            response = self.client.post('/api/token/', credentials, HTTP_X_FORWARDED_FOR=forwarded)
+            self.assertEqual(response.status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={**throttle_rates(login='1/min'), 'NUM_PROXIES': 1})
+    def test_forwarded_for_behind_proxies(self):
+        credentials = {'username': 'reader', 'password': 'wrong'}
+        # The proxy appends the address it saw to what the client sent
+        for forwarded in ('10.0.0.2', '10.0.0.5, 10.0.0.2'):
+            response = self.client.post('/api/token/', credentials, HTTP_X_FORWARDED_FOR=forwarded)
+        self.assertEqual(response.status_code, 429)
+        response = self.client.post('/api/token/', credentials, HTTP_X_FORWARDED_FOR='10.0.0.2, 10.0.0.3')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(anon='2/min'), RESPONSE_CACHE_ENABLED=True)
+    def test_cached_responses_are_limited(self):
+        Article.objects.create(title='Cached', content='Body', author=self.user)
+        self.assertEqual(self.client.get('/api/articles/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/articles/')['X-Cache'], 'HIT')
+        response = self.client.get('/api/articles/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.client.get('/api/articles/', REMOTE_ADDR='10.0.0.2')['X-Cache'], 'HIT')
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(anon='2/min'), RESPONSE_CACHE_ENABLED=True)
+    async def test_cached_responses_are_limited_on_the_async_path(self):
+        article = await Article.objects.acreate(title='Cached', content='Body', author=self.user)
+        view = ArticleRetrieveUpdateDestroyView.as_async_view()
+        path = f'/api/articles/{article.pk}/'
+        responses = [await view(AsyncRequestFactory().get(path), pk=article.pk) for _ in range(3)]
+        self.assertEqual([response.get('X-Cache') for response in responses[:2]], ['MISS', 'HIT'])
+        self.assertEqual(responses[2].status_code, 429)
+        self.assertEqual(responses[2]['Retry-After'], '30')
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(anon='1/min'), THROTTLE_STORE='cache')
+    def test_cache_store(self):
+        self.assertEqual(self.client.get('/api/health/').status_code, 200)
+        self.assertEqual(self.client.get('/api/health/').status_code, 429)
+        self.assertEqual(local_store.buckets, {})
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(anon='1/min'), THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/health/').status_code, 200)
+
+
+class FastJSONTests(SimpleTestCase):
+    """Same bytes and values as DRF's JSONRenderer/JSONParser, orjson installed or not"""
+
+    def test_renders_like_json_renderer(self):
+        data = {
+            'utc': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'offset': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=3))),
+            'naive': datetime.datetime(2024, 5, 1, 12, 30),
+            'date': datetime.date(2024, 5, 1),
+            'time': datetime.time(8, 15, 0, 500),
+            'duration': datetime.timedelta(minutes=1, seconds=30),
+            'decimal': decimal.Decimal('12.50'),
+            'text': 'שלום "quoted" \u2028 \u2029 \U0001f600 </script>',
+            'numbers': [0, -1, 2 ** 63 - 1, 0.1, 2.5],
+            'keys': {1: 'int', None: 'null', True: 'bool'},
+            'nested': [{'a': []}, (), None, False],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_falls_back_to_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+        data = {'a': [1, 2]}
+        for media_type, context in (('application/json; indent=2', {}), (None, {'indent': 4})):
+            self.assertEqual(
+                FastJSONRenderer().render(data, media_type, context), JSONRenderer().render(data, media_type, context)
+            )
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({'object': object()})
+
+    def test_parses_like_json_parser(self):
+        for body in (b'{"a": [1, 2.5, null, true], "b": "\u00e9t\u00e9"}', b'[]', b'{"big": 1180591620717411303424}'):
+            with self.subTest(body=body):
+                self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        latin = {'encoding': 'latin-1'}
+        self.assertEqual(FastJSONParser().parse(io.BytesIO('"\xe9"'.encode('latin-1')), None, latin), '\xe9')
+        for body in (b'{"a": NaN}', b'{"a": ', b''):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+class FindRegressionsTests(SimpleTestCase):
+    baseline = {
+        'article_list': {'p50': 10.0, 'p95': 20.0, 'queries': 3, 'bytes': 1000},
+        'article_detail': {'p50': 2.0, 'p95': 4.0, 'queries': 2, 'bytes': 500},
+    }
+
+    def test_clean_run(self):
+        results = {
+            # Faster, and noise below the thresholds
+            'article_list': {'p50': 8.0, 'p95': 23.5, 'queries': 3, 'bytes': 1150},
+            # Slower by more than 20%, but by less than 1ms
+            'article_detail': {'p50': 2.9, 'p95': 4.9, 'queries': 2, 'bytes': 500},
+            # Not in the baseline
+            'comment_list': {'p50': 50.0, 'p95': 90.0, 'queries': 9, 'bytes': 9000},
+        }
+        self.assertEqual(find_regressions(results, self.baseline), [])
+
+    def test_detects_regressions(self):
+        results = {
+            'article_list': {'p50': 10.5, 'p95': 30.0, 'queries': 4, 'bytes': 1300},
+            'article_detail': {'p50': 2.0, 'p95': 4.0, 'queries': 2, 'bytes': 500},
+        }
+        self.assertEqual(find_regressions(results, self.baseline), [
+            'article_list: p95 20.00ms -> 30.00ms',
+            'article_list: queries 3 -> 4',
+            'article_list: response size 1000 -> 1300 bytes',
+        ])
+
+    def test_threshold(self):
+        results = {'article_list': {'p50': 11.5, 'p95': 20.0, 'queries': 3, 'bytes': 1000}}
+        self.assertEqual(find_regressions(results, self.baseline), [])
+        self.assertEqual(
+            find_regressions(results, self.baseline, threshold=0.1), ['article_list: p50 10.00ms -> 11.50ms']
+        )
@@ -0,0 +1,184 @@
+"""
+Token bucket throttling (REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'])
+
+A rate of 'N/period' is a bucket of N tokens refilled at N per period: a
+client may burst N requests, then one per period/N. Buckets are kept as one
+number each, the time at which the bucket will be full again (GCRA, the
+"theoretical arrival time"), so a check is one atomic operation:
+
+- CacheBucketStore: cache.incr() on the shared cache, so every process sees
+  the same buckets
+- LocalBucketStore: a dict in this process, lock-free (a few concurrent
+  checks of the same bucket may all pass), used when the cache is not
+  shared (CACHE_SHARED) and in tests
+
+Refused requests take no token; DRF answers 429 with Retry-After (seconds
+until the next token). Throttling is skipped when THROTTLE_ENABLED is off.
+Anonymous clients are told apart by get_ident(), which only reads
+X-Forwarded-For behind NUM_PROXIES trusted proxies.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# LocalBucketStore drops full buckets past this many
+MAX_LOCAL_BUCKETS = 100000
+
+
+def parse_rate(rate):
+    """'10/min' -> (10 tokens, 6.0 seconds per token); None, '' or 'none' -> None"""
+    if not rate or rate.lower() == 'none':
+        return None
+    count, period = rate.split('/')
+    count = int(count)
+    return count, PERIODS[period[0]] / count
+
+
+class LocalBucketStore:
+    """Buckets of this process (not shared between worker processes)"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def consume(self, key, burst, interval, now):
+        """Take a token: 0 when allowed, else the seconds until one is available"""
+        full_at = max(self.buckets.get(key, now), now) + interval
+        wait = full_at - burst * interval - now
+        if wait > 0:
+            return wait
+        self.buckets[key] = full_at
+        if len(self.buckets) > MAX_LOCAL_BUCKETS:
+            self.buckets = {key: value for key, value in list(self.buckets.items()) if value > now}
+        return 0.0
+
+    def clear(self):
+        self.buckets.clear()
+
+
+class CacheBucketStore:
+    """Buckets in the default cache, in integer microseconds for cache.incr()"""
+    key_prefix = 'throttle:'
+
+    def consume(self, key, burst, interval, now):
+        key = self.key_prefix + key
+        step = max(1, round(interval * 1e6))
+        now = round(now * 1e6)
+        timeout = math.ceil(burst * interval) + 1
+        cache = caches['default']
+        try:
+            full_at = cache.incr(key, step)
+        except ValueError:
+            if cache.add(key, now + step, timeout):
+                return 0.0
+            full_at = cache.incr(key, step)
+        if full_at - step < now:
+            # The bucket had filled up again: restart from now
+            cache.set(key, now + step, timeout)
+            return 0.0
+        wait = full_at - burst * step - now
+        if wait > 0:
+            cache.decr(key, step)
+            return wait / 1e6
+        if full_at - now > step:
+            # A bucket in use must outlive the timeout set when it was created
+            cache.touch(key, timeout)
+        return 0.0
+
+
+local_store = LocalBucketStore()
+cache_store = CacheBucketStore()
+
+
+def get_store():
+    store = settings.THROTTLE_STORE
+    if store == 'auto':
+        store = 'cache' if settings.CACHE_SHARED else 'local'
+    return local_store if store == 'local' else cache_store
+
+
+def checks_do_io():
+    """Whether throttle checks go to the shared cache (async code runs them in a thread)"""
+    return settings.THROTTLE_ENABLED and get_store() is cache_store
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Base class: subclasses pick the scope (the rate's name in
+    DEFAULT_THROTTLE_RATES) and the client identity of a request
+    """
+    scope = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_client(self, request, view):
+        """The bucket's owner, or None when the request is not limited by this throttle"""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0.0
+        if not settings.THROTTLE_ENABLED:
+            return True
+        scope = self.get_scope(request, view)
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope)) if scope else None
+        if rate is None:
+            return True
+        client = self.get_client(request, view)
+        if client is None:
+            return True
+        burst, interval = rate
+        self.wait_seconds = get_store().consume(f'{scope}:{client}', burst, interval, time.time())
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonBucketThrottle(BucketThrottle):
+    """Anonymous requests, per IP address ('anon' rate)"""
+    scope = 'anon'
+
+    def get_client(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserBucketThrottle(BucketThrottle):
+    """Authenticated requests, per user ('user' rate)"""
+    scope = 'user'
+
+    def get_client(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class ScopedBucketThrottle(BucketThrottle):
+    """
+    Writes (POST, PUT, PATCH, DELETE) of the views declaring a throttle_scope,
+    per user, or per IP address for anonymous requests
+    """
+
+    def get_scope(self, request, view):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        return getattr(view, 'throttle_scope', None)
+
+    def get_client(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        return self.get_ident(request)
+
+
+def throttle_scope(scope):
+    """throttle_scope for @api_view function views (apply above @api_view)"""
+    def decorator(view):
+        view.cls.throttle_scope = scope
+        return view
+    return decorator
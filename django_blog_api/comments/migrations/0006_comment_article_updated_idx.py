@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0005_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'updated_at'], name='comment_article_updated_idx'),
+        ),
+    ]
@@ -2,24 +2,119 @@ from django.db import models
 from django.contrib.auth.models import User
 from articles.models import Article
 
+PATH_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+PATH_SEGMENT_LENGTH = 7
+# Replies below a top-level comment; the path holds one segment per level
+MAX_THREAD_DEPTH = 32
+
+
+def path_segment(pk):
+    """Fixed-width base 36, so paths sort like the ids they are made of"""
+    digits = []
+    while pk:
+        pk, digit = divmod(pk, 36)
+        digits.append(PATH_DIGITS[digit])
+    return ''.join(reversed(digits)).rjust(PATH_SEGMENT_LENGTH, '0')
+
 
 class Comment(models.Model):
-    """Comment model for article comments"""
+    """
+    Comment model for article comments
+
+    Replies form threads under a top-level comment (materialized path):
+    - parent: the comment replied to (None for top-level comments)
+    - root: the top-level comment of the thread (None for top-level comments)
+    - depth: 0 for top-level comments, parent's depth + 1 for replies
+    - path: parent's path + the reply's own id (path_segment()), '' for
+      top-level comments. Ordering a thread's replies by path lists every
+      reply right after its parent, so a whole thread (or a subtree: path
+      prefix) is one range of comment_thread_path_idx.
+    """
     article = models.ForeignKey(
         Article,
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        # Covered by comment_article_created_idx
+        db_index=False,
     )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        # Covered by comment_author_created_idx
+        db_index=False,
+    )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='replies',
+    )
+    root = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        # Covered by comment_thread_path_idx
+        db_index=False,
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    path = models.CharField(
+        max_length=PATH_SEGMENT_LENGTH * MAX_THREAD_DEPTH, blank=True, default='', editable=False
     )
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Backs keyset pagination of an article's comments on (created_at, id)
+            models.Index(fields=['article', '-created_at', '-id'], name='comment_article_created_idx'),
+            # All comments, newest first (admin list and date hierarchy)
+            models.Index(fields=['-created_at', '-id'], name='comment_created_id_idx'),
+            # A user's comments, newest first (admin author filter)
+            models.Index(fields=['author', '-created_at', '-id'], name='comment_author_created_idx'),
+            # Top-level comments of an article (?thread=true pages)
+            models.Index(
+                fields=['article', '-created_at', '-id'],
+                condition=models.Q(parent__isnull=True),
+                name='comment_article_toplevel_idx',
+            ),
+            # Replies of a thread in thread order
+            models.Index(fields=['root', 'path'], name='comment_thread_path_idx'),
+            # Latest edit of an article's comments (comment list validators) and
+            # comments edited since a date (incremental export)
+            models.Index(fields=['article', 'updated_at'], name='comment_article_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.author.username}: {self.content[:30]}..."
+
+    def save(self, *args, **kwargs):
+        """A new reply takes its place in the thread once its id is known"""
+        adding = self._state.adding
+        if adding and self.parent_id is not None:
+            parent = self.parent
+            self.root_id = parent.root_id or parent.pk
+            self.depth = parent.depth + 1
+        super().save(*args, **kwargs)
+        if adding and self.parent_id is not None and not self.path:
+            self.path = self.parent.path + path_segment(self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    def thread(self, depth=None):
+        """
+        This comment's replies in thread order (one index range), down to
+        `depth` levels below it (all of them by default)
+        """
+        if self.parent_id is None:
+            replies = Comment.objects.filter(root_id=self.pk)
+        else:
+            replies = Comment.objects.filter(root_id=self.root_id, path__startswith=self.path).exclude(pk=self.pk)
+        if depth is not None:
+            replies = replies.filter(depth__lte=self.depth + depth)
+        return replies.order_by('path')
@@ -19,8 +19,8 @@ class IsOwner(permissions.BasePermission):
     """
     
     def has_object_permission(self, request, view, obj):
-        # Only the owner can edit
-        return obj.author == request.user
+        # Only the owner can edit (ids: request.user may be a users.authentication.ClaimsUser)
+        return obj.author_id == request.user.pk
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -33,4 +33,4 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if request.user.is_staff:
             return True
         # Owner can delete their own comment
-        return obj.author == request.user
+        return obj.author_id == request.user.pk
@@ -2,15 +2,54 @@
 Comment serializers
 """
 from rest_framework import serializers
-from .models import Comment
+from blog_project.fieldsets import DynamicFieldsMixin
+from .models import MAX_THREAD_DEPTH, Comment
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    """Serializer for Comment model"""
+class CommentThreadListSerializer(serializers.ListSerializer):
+    """
+    Nests comments given in thread order (each top-level comment followed by
+    its replies ordered by path) in a single pass: a reply's parent is always
+    serialized before it. Comments whose parent is not in the list (top-level
+    comments, the subtree of a reply) are the roots of the result.
+    """
+
+    def to_representation(self, data):
+        roots = []
+        nodes = {}
+        for comment in data:
+            node = self.child.to_representation(comment)
+            node['replies'] = []
+            nodes[comment.pk] = node
+            parent = nodes.get(comment.parent_id)
+            (parent['replies'] if parent is not None else roots).append(node)
+        return roots
+
+
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Serializer for Comment model (supports ?fields= and ?exclude=)"""
     author = serializers.CharField(source='author.username', read_only=True)
     article = serializers.PrimaryKeyRelatedField(read_only=True)
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Comment.objects.all(), required=False, allow_null=True
+    )
     
     class Meta:
         model = Comment
-        fields = ['id', 'article', 'author', 'content', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'article', 'parent', 'depth', 'author', 'content', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'depth', 'created_at', 'updated_at']
+
+    def validate_parent(self, parent):
+        if self.instance is not None:
+            if parent != self.instance.parent:
+                raise serializers.ValidationError('A reply cannot be moved to another comment.')
+        elif parent is not None and parent.depth >= MAX_THREAD_DEPTH:
+            raise serializers.ValidationError(f'Replies cannot be nested more than {MAX_THREAD_DEPTH} levels deep.')
+        return parent
+
+
+class CommentThreadSerializer(CommentSerializer):
+    """CommentSerializer nesting lists into threads (each comment gets its `replies`)"""
+
+    class Meta(CommentSerializer.Meta):
+        list_serializer_class = CommentThreadListSerializer
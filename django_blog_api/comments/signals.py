@@ -0,0 +1,94 @@
+"""
+Signal handlers for comments
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from articles.models import Article
+from blog_project.events import get_broker
+from blog_project.invalidation import bump_generation
+from .models import Comment
+from .serializers import CommentSerializer
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Keep Article.comment_count/last_commented_at in step with new comments"""
+    if not created or raw:
+        return
+    Article.objects.filter(pk=instance.article_id).update(
+        comment_count=F('comment_count') + 1,
+        last_commented_at=Greatest(
+            Coalesce('last_commented_at', Value(instance.created_at)),
+            Value(instance.created_at),
+        ),
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Only a delete needs to look at the comments table (one index probe)"""
+    latest = Comment.objects.filter(article_id=OuterRef('pk')).order_by('-created_at')
+    Article.objects.filter(pk=instance.article_id).update(
+        comment_count=Greatest(F('comment_count') - 1, Value(0)),
+        last_commented_at=Subquery(latest.values('created_at')[:1]),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_caches(sender, instance, **kwargs):
+    """Cached comment counts and responses are stale after any comment write"""
+    bump_generation('comments.comment', f'article:{instance.article_id}')
+
+
+def comment_channel(article_id):
+    return f'article:{article_id}'
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Announce the comment to the article's event streams once committed"""
+    if raw:
+        return
+    event = partial(
+        get_broker().publish,
+        comment_channel(instance.article_id),
+        'comment.created' if created else 'comment.updated',
+        CommentSerializer(instance).data,
+    )
+    transaction.on_commit(event)
+
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_deleted(sender, instance, **kwargs):
+    event = partial(
+        get_broker().publish,
+        comment_channel(instance.article_id),
+        'comment.deleted',
+        {'id': instance.pk, 'parent': instance.parent_id},
+    )
+    transaction.on_commit(event)
+
+
+def publish_comments_deleted(comments):
+    """
+    comment.deleted events for comments removed without post_delete (raw
+    bulk deletes), from (id, article_id, parent_id) rows read beforehand
+    """
+    broker = get_broker()
+    events = [
+        (comment_channel(article_id), {'id': pk, 'parent': parent_id})
+        for pk, article_id, parent_id in comments
+    ]
+
+    def publish():
+        for channel, data in events:
+            broker.publish(channel, 'comment.deleted', data)
+
+    transaction.on_commit(publish)
@@ -1,3 +1,229 @@
-from django.test import TestCase
+import json
+import threading
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from articles.models import Article
+from articles.tests import auth_client
+from blog_project.events import get_broker, load_broker
+from .models import MAX_THREAD_DEPTH, Comment, path_segment
+from .views import ArticleCommentEventsView, ArticleCommentListCreateView
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CommentQueryBudgetTests(TestCase):
+    """Fixed query counts for the comment endpoints, whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pass')
+        author = User.objects.create_user('author', 'author@example.com', 'pass', is_staff=True)
+        cls.article = Article.objects.create(title='Article', content='Body', author=author)
+        for i in range(60):
+            user = cls.owner if i % 2 else User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pass')
+            Comment.objects.create(article=cls.article, author=user, content=f'Comment {i}')
+        cls.comment = Comment.objects.filter(author=cls.owner).first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        url = f'/api/articles/{self.article.pk}/comments/'
+        for page_size in (1, 10, 50):
+            cache.clear()
+            # validators (also checks the article exists), count, comments + authors
+            with self.assertNumQueries(3):
+                response = self.client.get(url, {'page_size': page_size})
+            self.assertEqual(len(response.data['results']), page_size)
+
+    def test_list_of_missing_article(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/articles/999999/comments/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/comments/{self.comment.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_updates_comment_count(self):
+        client = auth_client(self.owner)
+        response = client.post(
+            f'/api/articles/{self.article.pk}/comments/', {'content': 'New'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 61)
+
+    def test_owner_can_update_and_delete(self):
+        client = auth_client(self.owner)
+        response = client.patch(f'/api/comments/{self.comment.pk}/', {'content': 'Edited'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = client.delete(f'/api/comments/{self.comment.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 59)
+
+
+class CommentThreadTests(TestCase):
+    """Replies, their materialized paths and the threaded endpoints"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('user', 'user@example.com', 'pass')
+        cls.article = Article.objects.create(title='Article', content='Body', author=cls.user)
+        cls.top = Comment.objects.create(article=cls.article, author=cls.user, content='top')
+        cls.reply = Comment.objects.create(article=cls.article, author=cls.user, content='reply', parent=cls.top)
+        cls.nested = Comment.objects.create(article=cls.article, author=cls.user, content='nested', parent=cls.reply)
+        cls.sibling = Comment.objects.create(article=cls.article, author=cls.user, content='sibling', parent=cls.top)
+        cls.other = Comment.objects.create(article=cls.article, author=cls.user, content='other')
+
+    def setUp(self):
+        cache.clear()
+        self.url = f'/api/articles/{self.article.pk}/comments/'
+
+    def test_paths(self):
+        self.assertEqual((self.top.root_id, self.top.depth, self.top.path), (None, 0, ''))
+        self.assertEqual((self.nested.root_id, self.nested.depth), (self.top.pk, 2))
+        self.assertEqual(self.nested.path, path_segment(self.reply.pk) + path_segment(self.nested.pk))
+        self.assertEqual(list(self.top.thread()), [self.reply, self.nested, self.sibling])
+        self.assertEqual(list(self.reply.thread()), [self.nested])
+        self.assertEqual(list(self.top.thread(depth=1)), [self.reply, self.sibling])
+
+    def test_threaded_list(self):
+        # validators, count and page of top-level comments, their replies
+        with self.assertNumQueries(4):
+            response = APIClient().get(self.url, {'thread': 'true', 'ordering': 'created_at'})
+        self.assertEqual(response.data['count'], 2)
+        top, other = response.data['results']
+        self.assertEqual([c['content'] for c in top['replies']], ['reply', 'sibling'])
+        self.assertEqual(top['replies'][0]['replies'][0]['content'], 'nested')
+        self.assertEqual(other['replies'], [])
+
+    def test_threaded_list_with_sparse_fields(self):
+        params = {'thread': 'true', 'fields': 'id,content', 'ordering': 'created_at'}
+        with self.assertNumQueries(4):
+            response = APIClient().get(self.url, params)
+        top, other = response.data['results']
+        self.assertEqual(set(top), {'id', 'content', 'replies'})
+        self.assertEqual([c['content'] for c in top['replies']], ['reply', 'sibling'])
+
+    async def test_threaded_list_with_sparse_fields_on_the_async_path(self):
+        params = {'thread': 'true', 'fields': 'id,content', 'ordering': 'created_at'}
+        request = AsyncRequestFactory().get(self.url, params)
+        response = await ArticleCommentListCreateView.as_async_view()(request, article_id=self.article.pk)
+        self.assertEqual(response.status_code, 200)
+        top, other = json.loads(response.content)['results']
+        self.assertEqual([c['content'] for c in top['replies']], ['reply', 'sibling'])
+        self.assertEqual(top['replies'][0]['replies'][0]['content'], 'nested')
+
+    def test_threaded_list_depth(self):
+        response = APIClient().get(self.url, {'thread': 'true', 'depth': 1, 'pagination': 'cursor'})
+        top = response.data['results'][-1]
+        self.assertEqual([c['replies'] for c in top['replies']], [[], []])
+        self.assertEqual(APIClient().get(self.url, {'thread': 'true', 'depth': -1}).status_code, 400)
+
+    def test_thread_of_a_reply(self):
+        with self.assertNumQueries(2):
+            response = APIClient().get(f'/api/comments/{self.reply.pk}/thread/')
+        self.assertEqual(response.data['content'], 'reply')
+        self.assertEqual([c['content'] for c in response.data['replies']], ['nested'])
+
+    def test_reply(self):
+        response = auth_client(self.user).post(self.url, {'content': 'Answer', 'parent': self.nested.pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['depth'], 3)
+        self.assertEqual(Comment.objects.get(pk=response.data['id']).root_id, self.top.pk)
+
+    def test_reply_validation(self):
+        client = auth_client(self.user)
+        elsewhere = Article.objects.create(title='Elsewhere', content='Body', author=self.user)
+        response = client.post(
+            f'/api/articles/{elsewhere.pk}/comments/', {'content': 'x', 'parent': self.top.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        Comment.objects.filter(pk=self.nested.pk).update(depth=MAX_THREAD_DEPTH)
+        response = client.post(self.url, {'content': 'x', 'parent': self.nested.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = client.patch(f'/api/comments/{self.nested.pk}/', {'parent': self.top.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete_removes_replies(self):
+        response = auth_client(self.user).delete(f'/api/comments/{self.reply.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Comment.objects.filter(pk__in=[self.reply.pk, self.nested.pk]).exists())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 3)
+
+
+@override_settings(EVENTS_BROKER='blog_project.events.LocalBroker', EVENTS_HISTORY=3)
+class CommentEventTests(TestCase):
+    """Comment writes published to the article's server-sent event stream"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('user', 'user@example.com', 'pass')
+        cls.article = Article.objects.create(title='Article', content='Body', author=cls.user)
+        cls.channel = f'article:{cls.article.pk}'
+
+    def setUp(self):
+        # A broker of our own, with an empty history
+        load_broker.cache_clear()
+
+    async def open_stream(self, **headers):
+        view = ArticleCommentEventsView.as_view()
+        request = AsyncRequestFactory().get(f'/api/articles/{self.article.pk}/comments/events/', headers=headers)
+        response = await view(request, article_id=self.article.pk)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        return stream
+
+    def test_writes_publish_after_commit(self):
+        client = auth_client(self.user)
+        url = f'/api/articles/{self.article.pk}/comments/'
+        with self.captureOnCommitCallbacks(execute=True):
+            comment_id = client.post(url, {'content': 'New'}, format='json').data['id']
+            client.patch(f'/api/comments/{comment_id}/', {'content': 'Edited'}, format='json')
+            client.delete(f'/api/comments/{comment_id}/')
+        events = list(get_broker().history[self.channel])
+        self.assertEqual([e.type for e in events], ['comment.created', 'comment.updated', 'comment.deleted'])
+        self.assertEqual(events[1].data['content'], 'Edited')
+        self.assertEqual(events[2].data, {'id': comment_id, 'parent': None})
+        self.assertEqual([e.id - events[0].id for e in events], [0, 1, 2])
+
+    async def test_stream_resumes_from_last_event_id(self):
+        broker = get_broker()
+        first, second, third = [broker.publish(self.channel, 'comment.created', {'id': i}) for i in range(3)]
+        stream = await self.open_stream(**{'Last-Event-ID': str(first.id)})
+        self.assertEqual(await anext(stream), second.encode())
+        self.assertEqual(await anext(stream), third.encode())
+
+        # Published from another thread (a sync view) while the stream waits
+        threading.Timer(0.05, broker.publish, (self.channel, 'comment.deleted', {'id': 0})).start()
+        chunk = await anext(stream)
+        self.assertTrue(chunk.startswith(f'id: {third.id + 1}\nevent: comment.deleted\n'.encode()))
+        self.assertEqual(json.loads(chunk.decode().split('data: ')[1]), {'id': 0})
+        await stream.aclose()
+
+    async def test_stream_resets_when_events_are_gone(self):
+        broker = get_broker()
+        first = broker.publish(self.channel, 'comment.created', {'id': 1})
+        for i in range(3):
+            broker.publish(self.channel, 'comment.created', {'id': i})
+        stream = await self.open_stream(**{'Last-Event-ID': str(first.id - 1)})
+        self.assertEqual(await anext(stream), b'event: reset\ndata: {}\n\n')
+        await stream.aclose()
+
+    def test_not_served_under_wsgi(self):
+        response = self.client.get(f'/api/articles/{self.article.pk}/comments/events/')
+        self.assertEqual(response.status_code, 501)
+
+    async def test_missing_article(self):
+        view = ArticleCommentEventsView.as_view()
+        response = await view(AsyncRequestFactory().get('/api/articles/999999/comments/events/'), article_id=999999)
+        self.assertEqual(response.status_code, 404)
@@ -2,9 +2,16 @@
 Comment URL patterns
 """
 from django.urls import path
-from .views import ArticleCommentListCreateView, CommentUpdateDestroyView
+from .views import (
+    ArticleCommentEventsView,
+    ArticleCommentListCreateView,
+    CommentThreadView,
+    CommentUpdateDestroyView,
+)
 
 urlpatterns = [
     path('articles/<int:article_id>/comments/', ArticleCommentListCreateView.as_view(), name='article-comments'),
+    path('articles/<int:article_id>/comments/events/', ArticleCommentEventsView.as_view(), name='article-comment-events'),
     path('comments/<int:pk>/', CommentUpdateDestroyView.as_view(), name='comment-detail'),
+    path('comments/<int:pk>/thread/', CommentThreadView.as_view(), name='comment-thread'),
 ]
@@ -1,23 +1,87 @@
 """
 Comment views
 """
+from collections import defaultdict
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework import generics, permissions
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from blog_project.async_views import AsyncReadMixin
+from blog_project.events import event_stream
+from blog_project.conditional import ConditionalRequestMixin, make_etag
+from blog_project.fieldsets import SparseFieldsetMixin
+from blog_project.pagination import PageNumberOrKeysetPagination
+from blog_project.response_cache import CachedResponseMixin
+from users.authentication import model_user
 from .models import Comment
-from .serializers import CommentSerializer
+from .serializers import CommentSerializer, CommentThreadSerializer
+from .signals import comment_channel
 from .permissions import IsStaffOnly, IsOwner, IsOwnerOrAdmin
 from articles.models import Article
 
 
-class ArticleCommentListCreateView(generics.ListCreateAPIView):
+def is_threaded(request):
+    return request.method == 'GET' and request.query_params.get('thread', '').lower() in ('true', '1', 'yes')
+
+
+def thread_depth(request):
+    """?depth=N: replies down to N levels below the comments listed (all by default)"""
+    value = request.query_params.get('depth')
+    if not value:
+        return None
+    try:
+        depth = int(value)
+        if depth < 0:
+            raise ValueError
+    except ValueError:
+        raise ValidationError({'depth': 'Expected a non-negative integer.'})
+    return depth
+
+
+class ArticleCommentListCreateView(AsyncReadMixin, CachedResponseMixin, ConditionalRequestMixin,
+                                   SparseFieldsetMixin, generics.ListCreateAPIView):
     """
     GET: List all comments for a specific article (public access)
     POST: Create a new comment for a specific article (authenticated users only)
     Supports ordering via ?ordering=created_at or ?ordering=-created_at
+    Supports keyset pagination via ?pagination=cursor (then follow ?cursor=)
+    Supports sparse fieldsets via ?fields=id,content or ?exclude=author
+    Supports threads via ?thread=true: pages of top-level comments, each with
+    its replies nested (?depth=N levels of them), fetched in one more query
+    POST with "parent": <comment id> to reply to a comment of the article
+    Anonymous GET responses are cached until the article or its comments change
+    Responses carry ETag/Last-Modified; polling with If-None-Match returns 304
+    while no comment was added, edited or deleted
+    Anonymous GET requests take the async read path under ASGI
+    POST is rate limited per user (THROTTLE_RATE_COMMENTS)
     """
-    serializer_class = CommentSerializer
+    pagination_class = PageNumberOrKeysetPagination
     ordering_fields = ['created_at']
     ordering = ['-created_at']  # default ordering
+    throttle_scope = 'comments'
+
+    async def async_get(self, request, *args, **kwargs):
+        return await self.aconditional(self.alist, request, *args, **kwargs)
+
+    @property
+    def sparse_always_fetch(self):
+        # Threads are assembled from parent_id, replies grouped by root_id
+        if is_threaded(self.request):
+            return ('id', 'created_at', 'parent', 'root')
+        return ('id', 'created_at')
+
+    def get_serializer_class(self):
+        if is_threaded(self.request):
+            return CommentThreadSerializer
+        return CommentSerializer
+
+    def get_response_cache_scopes(self):
+        return (f"article:{self.kwargs['article_id']}", 'auth.user')
     
     def get_permissions(self):
         """
@@ -28,13 +92,66 @@ class ArticleCommentListCreateView(generics.ListCreateAPIView):
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
     
+    def get_validators_queryset(self):
+        """
+        One query on the article row and its comments: the denormalized count
+        catches additions and deletions, the latest updated_at catches edits
+        (one entry of comment_article_updated_idx)
+        """
+        latest = Comment.objects.filter(article_id=OuterRef('pk')).order_by('-updated_at')
+        return Article.objects.filter(id=self.kwargs.get('article_id')).annotate(
+            comments_updated_at=Subquery(latest.values('updated_at')[:1])
+        ).values_list('comment_count', 'comments_updated_at')
+
+    def validators_from_row(self, row):
+        article_id = self.kwargs.get('article_id')
+        if row is None:
+            raise NotFound(f"Article with id {article_id} not found.")
+        self.article_exists = True
+        comment_count, comments_updated_at = row
+        return make_etag(article_id, comment_count, comments_updated_at), comments_updated_at
+
     def get_queryset(self):
         """Filter comments by article_id from URL"""
         article_id = self.kwargs.get('article_id')
-        # Verify article exists
-        if not Article.objects.filter(id=article_id).exists():
+        # Verify article exists (unless get_validators() already did)
+        if not getattr(self, 'article_exists', False) and not Article.objects.filter(id=article_id).exists():
             raise NotFound(f"Article with id {article_id} not found.")
-        return Comment.objects.select_related('author', 'article').filter(article_id=article_id)
+        queryset = Comment.objects.select_related('author', 'article').filter(article_id=article_id)
+        if is_threaded(self.request):
+            # Pages are made of top-level comments (comment_article_toplevel_idx)
+            queryset = queryset.filter(parent__isnull=True)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is None or not is_threaded(self.request):
+            return page
+        return self.with_replies(page, list(self.replies_queryset(page)))
+
+    async def apaginate_queryset(self, queryset):
+        page = await super().apaginate_queryset(queryset)
+        if page is None or not is_threaded(self.request):
+            return page
+        return self.with_replies(page, [reply async for reply in self.replies_queryset(page)])
+
+    def replies_queryset(self, page):
+        """The replies of every thread on the page in one query (comment_thread_path_idx)"""
+        replies = self.filter_queryset(Comment.objects.select_related('author')).filter(
+            root_id__in=[comment.pk for comment in page]
+        )
+        depth = thread_depth(self.request)
+        if depth is not None:
+            replies = replies.filter(depth__lte=depth)
+        return replies.order_by('root_id', 'path')
+
+    @staticmethod
+    def with_replies(page, replies):
+        """The page in thread order: every top-level comment followed by its replies"""
+        threads = defaultdict(list)
+        for reply in replies:
+            threads[reply.root_id].append(reply)
+        return [comment for top in page for comment in (top, *threads[top.pk])]
     
     def perform_create(self, serializer):
         """Set the author and article when creating a comment"""
@@ -44,12 +161,18 @@ class ArticleCommentListCreateView(generics.ListCreateAPIView):
         except Article.DoesNotExist:
             raise NotFound(f"Article with id {article_id} not found.")
         
-        serializer.save(author=self.request.user, article=article)
+        parent = serializer.validated_data.get('parent')
+        if parent is not None and parent.article_id != article.pk:
+            raise ValidationError({'parent': ['The comment replied to belongs to another article.']})
 
+        # The article's comment_count is updated in the same transaction
+        with transaction.atomic():
+            serializer.save(author=model_user(self.request.user), article=article)
 
-class CommentUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+
+class CommentUpdateDestroyView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
-    GET: Retrieve a comment (authenticated users)
+    GET: Retrieve a comment (authenticated users, supports ?fields=/?exclude=)
     PATCH/PUT: Update a comment (owner only)
     DELETE: Delete a comment (owner or admin)
     """
@@ -70,3 +193,52 @@ class CommentUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method == 'DELETE':
             return [permissions.IsAuthenticated(), IsOwnerOrAdmin()]
         return super().get_permissions()
+
+    def perform_destroy(self, instance):
+        """Delete the comment and its replies, and update the article's comment_count atomically"""
+        with transaction.atomic():
+            # The replies in one query, instead of cascading level by level
+            instance.thread().delete()
+            instance.delete()
+
+
+class CommentThreadView(generics.RetrieveAPIView):
+    """
+    GET: A comment with its replies nested (public access), e.g. to expand a
+    thread cut off by ?depth=; supports ?depth=N levels below the comment
+    Two queries: the comment, then its replies (one index range)
+    """
+    queryset = Comment.objects.select_related('author', 'article')
+    serializer_class = CommentThreadSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def retrieve(self, request, *args, **kwargs):
+        comment = self.get_object()
+        replies = comment.thread(thread_depth(request)).select_related('author')
+        serializer = self.get_serializer([comment, *replies], many=True)
+        return Response(serializer.data[0])
+
+
+class ArticleCommentEventsView(View):
+    """
+    GET: Server-sent events for the comments of an article (public access):
+    comment.created / comment.updated (the comment as in the list) and
+    comment.deleted ({"id", "parent"}), replayed from Last-Event-ID on
+    reconnection, or `reset` when the client must reload the list
+    One open stream replaces polling the comments list; served under ASGI
+    only (a WSGI worker would be held by every reader)
+    """
+
+    async def get(self, request, article_id):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'detail': 'Comment events are served by the ASGI application.'}, status=501)
+        if not await Article.objects.filter(id=article_id).aexists():
+            return JsonResponse({'detail': f'Article with id {article_id} not found.'}, status=404)
+        response = StreamingHttpResponse(
+            event_stream(comment_channel(article_id), request.headers.get('Last-Event-ID')),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Proxies must pass events through as they come
+        response['X-Accel-Buffering'] = 'no'
+        return response
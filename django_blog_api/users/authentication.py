@@ -0,0 +1,134 @@
+"""
+JWT authentication without a user query per request
+
+Access tokens issued by /api/token/ carry the user's username, is_staff and
+is_superuser claims. ClaimsJWTAuthentication builds request.user from them
+(a ClaimsUser, no database access), which is all the permission classes and
+views read. Tokens without these claims (issued by RefreshToken.for_user())
+are served from a short-lived cache of the same fields.
+
+Claims are revoked when the user changes: saving or deleting a user records
+the time (TokenRevocation), and tokens issued before that fall back to the
+user's current fields, so demoted staff lose their rights and deactivated
+users are rejected right away. The revocation time and the fields are read
+from the cache, and from the database when the cache misses them. A
+per-process cache (CACHE_SHARED off) only keeps them AUTH_LOCAL_CACHE_TIMEOUT
+seconds: revocations by other processes take effect after that long.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import TokenRevocation
+
+CLAIM_FIELDS = ('username', 'is_staff', 'is_superuser')
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def revoked_key(user_id):
+    return f'auth:revoked:{user_id}'
+
+
+def revocation_timeout():
+    """Seconds a revocation matters: tokens issued before it have expired by then"""
+    # Access tokens created by a refresh keep the refresh token's "iat"
+    lifetime = api_settings.REFRESH_TOKEN_LIFETIME + api_settings.ACCESS_TOKEN_LIFETIME
+    return int(lifetime.total_seconds())
+
+
+def cache_timeout(shared_timeout):
+    """shared_timeout with a shared cache, AUTH_LOCAL_CACHE_TIMEOUT with a per-process one"""
+    return shared_timeout if settings.CACHE_SHARED else settings.AUTH_LOCAL_CACHE_TIMEOUT
+
+
+def revoke_claims(user_id):
+    """Stop trusting the claims of the user's current tokens"""
+    revocation, _ = TokenRevocation.objects.update_or_create(
+        user_id=user_id, defaults={'revoked_at': timezone.now()}
+    )
+    cache.set(revoked_key(user_id), revocation.revoked_at.timestamp(), revocation_timeout())
+    cache.delete(user_key(user_id))
+
+
+def get_revoked_at(user_id):
+    """UNIX time the user's claims were last revoked, 0 when they never were"""
+    revoked_at = cache.get(revoked_key(user_id))
+    if revoked_at is None:
+        revocation = TokenRevocation.objects.filter(user_id=user_id).values_list('revoked_at', flat=True).first()
+        revoked_at = revocation.timestamp() if revocation else 0
+        cache.set(revoked_key(user_id), revoked_at, cache_timeout(revocation_timeout()))
+    return revoked_at
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token (and access tokens derived from it) carrying the user claims"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    request.user built from token claims (or cached fields), without a query.
+    Use as_model() where a User instance is expected, e.g. for foreign keys.
+    """
+
+    def __str__(self):
+        return self.username
+
+    def as_model(self):
+        """An unsaved-looking User with the claimed fields, enough to set `author`"""
+        user = User(pk=self.id, **{field: getattr(self, field) for field in CLAIM_FIELDS})
+        user._state.adding = False
+        return user
+
+
+def model_user(user):
+    """The User instance for request.user, without a query for claims users"""
+    if isinstance(user, ClaimsUser):
+        return user.as_model()
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication returning a ClaimsUser instead of querying auth_user"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if all(field in validated_token for field in CLAIM_FIELDS):
+            if validated_token.get('iat', 0) > get_revoked_at(user_id):
+                return ClaimsUser(validated_token)
+        return ClaimsUser(self.get_cached_claims(user_id))
+
+    def get_cached_claims(self, user_id):
+        claims = cache.get(user_key(user_id))
+        if claims is None:
+            row = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values(*CLAIM_FIELDS, 'is_active').first()
+            if row is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            claims = {api_settings.USER_ID_CLAIM: user_id, **row}
+            cache.set(user_key(user_id), claims, cache_timeout(settings.AUTH_USER_CACHE_TIMEOUT))
+        if not claims['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return claims
@@ -0,0 +1,95 @@
+"""
+Password hashers with configurable cost, computed in a bounded thread pool
+
+The hasher picked with PASSWORD_HASHER (pbkdf2, argon2 or scrypt) comes first
+in PASSWORD_HASHERS, the others stay listed so existing hashes still verify.
+Django rehashes a password on the next successful login when its algorithm
+or cost parameters differ from the preferred hasher's.
+
+Hashing is CPU bound and its C implementations release the GIL, so the
+work runs in a pool of PASSWORD_HASH_WORKERS threads (default: one per
+core): concurrent logins and registrations queue for a core instead of
+starving the requests served by the other threads of the worker.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _mark_pool_thread():
+    _local.in_pool = True
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix='password-hash',
+                initializer=_mark_pool_thread,
+            )
+        return _pool
+
+
+def offload(func, *args, **kwargs):
+    """Run func() in the hashing pool and wait for the result"""
+    if not settings.PASSWORD_HASH_WORKERS or getattr(_local, 'in_pool', False):
+        # Disabled, or already in the pool (verify() calls encode())
+        return func(*args, **kwargs)
+    return get_pool().submit(func, *args, **kwargs).result()
+
+
+class OffloadedHasherMixin:
+    def encode(self, *args, **kwargs):
+        return offload(super().encode, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return offload(super().verify, password, encoded)
+
+
+class PBKDF2PasswordHasher(OffloadedHasherMixin, hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(OffloadedHasherMixin, hashers.Argon2PasswordHasher):
+    """Needs the argon2-cffi package"""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class ScryptPasswordHasher(OffloadedHasherMixin, hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * N * r bytes, OpenSSL's default limit is 32 MiB
+        return 2 * 128 * self.work_factor * self.block_size * self.parallelism
@@ -0,0 +1,84 @@
+"""
+Management command measuring password hashing cost per algorithm: the
+latency of one login (verify) on one core and the logins per second a
+worker sustains with concurrent requests going through the hashing pool.
+
+    python manage.py benchmark_hashers --threads 8
+    PASSWORD_PBKDF2_ITERATIONS=300000 python manage.py benchmark_hashers --algorithms pbkdf2
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from blog_project.benchmark import format_summary, measure
+from users.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher
+
+HASHERS = {
+    'pbkdf2': PBKDF2PasswordHasher,
+    'argon2': Argon2PasswordHasher,
+    'scrypt': ScryptPasswordHasher,
+}
+PASSWORD = 'correct-horse-battery-staple'
+
+
+def describe(hasher):
+    if isinstance(hasher, PBKDF2PasswordHasher):
+        return f'pbkdf2 iterations={hasher.iterations}'
+    if isinstance(hasher, Argon2PasswordHasher):
+        return f'argon2 t={hasher.time_cost} m={hasher.memory_cost}KiB p={hasher.parallelism}'
+    return f'scrypt N={hasher.work_factor} r={hasher.block_size} p={hasher.parallelism}'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark logins/sec per core for each password hasher (settings from PASSWORD_*)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithms', nargs='+', choices=list(HASHERS), default=list(HASHERS))
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=(os.cpu_count() or 1) * 2,
+                            help='Concurrent logins in the throughput test')
+
+    def handle(self, *args, **options):
+        cores = os.cpu_count() or 1
+        self.stdout.write(
+            f'{cores} core(s), hashing pool of {settings.PASSWORD_HASH_WORKERS} thread(s), '
+            f"{options['threads']} concurrent logins\n"
+        )
+        for name in options['algorithms']:
+            hasher = HASHERS[name]()
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as exc:
+                # Missing optional library (argon2-cffi)
+                self.stdout.write(self.style.WARNING(f'{name}: skipped, {exc}'))
+                continue
+
+            with override_settings(PASSWORD_HASH_WORKERS=0):
+                summary = measure(
+                    lambda: hasher.verify(PASSWORD, encoded), runs=options['runs'], warmup=options['warmup']
+                )
+            throughput = self.concurrent_logins(hasher, encoded, options['threads'], options['runs'])
+            self.stdout.write(format_summary(describe(hasher), summary))
+            self.stdout.write(
+                f"{'':<40} {1000 / summary['p50']:8.1f} logins/s on one core, "
+                f'{throughput:8.1f} logins/s concurrent ({throughput / cores:.1f} per core)'
+            )
+
+    def concurrent_logins(self, hasher, encoded, threads, runs):
+        """Logins per second with `threads` request threads verifying at once"""
+        def login():
+            for _ in range(runs):
+                hasher.verify(PASSWORD, encoded)
+
+        workers = [threading.Thread(target=login) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return threads * runs / (time.perf_counter() - started)
@@ -0,0 +1,41 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# Case-insensitive uniqueness of auth_user.email, also the index the
+# registration lookup uses. Blank emails (e.g. createsuperuser) may repeat;
+# queries must repeat the `email > ''` predicate for the index to apply.
+CREATE_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS auth_user_email_lower_uniq "
+    "ON auth_user (LOWER(email)) WHERE email > ''"
+)
+DROP_INDEX = 'DROP INDEX IF EXISTS auth_user_email_lower_uniq'
+
+
+def create_email_index(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values(email_lower=Lower('email'))
+        .annotate(users=Count('pk')).filter(users__gt=1).values_list('email_lower', flat=True)[:10]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot add the unique email index, these emails belong to several users '
+            f'(case-insensitive): {", ".join(duplicates)}'
+        )
+    schema_editor.execute(CREATE_INDEX)
+
+
+def drop_email_index(apps, schema_editor):
+    schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
@@ -1,3 +1,15 @@
 from django.db import models
 
-# Create your models here.
+
+class TokenRevocation(models.Model):
+    """
+    When the claims of a user's tokens were last revoked (see
+    users.authentication). The cache only holds a copy: an evicted or
+    per-process entry must not make revoked claims trusted again.
+    """
+    # Not a foreign key: the row outlives a deleted user, whose tokens stay revoked
+    user_id = models.IntegerField(primary_key=True)
+    revoked_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.user_id}: {self.revoked_at}'
@@ -2,8 +2,38 @@
 User serializers for registration and authentication
 """
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from blog_project.fieldsets import DynamicFieldsMixin
+from .authentication import ClaimsRefreshToken
+
+DUPLICATE_EMAIL = "A user with this email already exists."
+DUPLICATE_USERNAME = "A user with this username already exists."
+
+
+def email_taken(email):
+    """Matches the users holding `email`, case-insensitively (uses auth_user_email_lower_uniq)"""
+    # Same predicate as the partial index
+    return Q(email_lower=email.lower(), email__gt='')
+
+
+def users_with_email_lower():
+    return User.objects.alias(email_lower=Lower('email'))
+
+
+def duplicate_error(exc):
+    """
+    The validation error for an IntegrityError raised by a concurrent insert
+    between the pre-check and the write (username or email index)
+    """
+    if 'username' in str(exc):
+        return serializers.ValidationError({'username': [DUPLICATE_USERNAME]})
+    return serializers.ValidationError({'email': [DUPLICATE_EMAIL]})
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -23,38 +53,48 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'email', 'password')
         read_only_fields = ('id',)
+        # Uniqueness is checked in validate() with a single query
+        extra_kwargs = {'username': {'validators': [UnicodeUsernameValidator()]}}
 
-    def validate_email(self, value):
-        """
-        Check that the email is unique
-        """
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value
-
-    def validate_username(self, value):
+    def validate(self, attrs):
         """
-        Check that the username is unique
+        Check that the username and the email (case-insensitive) are free,
+        both with one indexed query
         """
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("A user with this username already exists.")
-        return value
+        taken = users_with_email_lower().filter(
+            Q(username=attrs['username']) | email_taken(attrs['email'])
+        ).values_list('username', 'email')[:2]
+        errors = {}
+        for username, email in taken:
+            if username == attrs['username']:
+                errors['username'] = [DUPLICATE_USERNAME]
+            if email.lower() == attrs['email'].lower():
+                errors['email'] = [DUPLICATE_EMAIL]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
 
     def create(self, validated_data):
         """
         Create and return a new user with encrypted password
+        The unique indexes settle concurrent registrations of the same name/email
         """
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password']
-        )
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    password=validated_data['password']
+                )
+        except IntegrityError as exc:
+            raise duplicate_error(exc)
         return user
 
 
-class MeSerializer(serializers.ModelSerializer):
+class MeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for authenticated user's own profile (GET and PATCH /api/me/)
+    Supports ?fields= and ?exclude= on GET
     """
     class Meta:
         model = User
@@ -63,8 +103,25 @@ class MeSerializer(serializers.ModelSerializer):
     
     def validate_email(self, value):
         """
-        Check that the email is unique (excluding current user)
+        Check that the email is unique (case-insensitive, excluding current user),
+        no query when it does not change
         """
-        if self.instance and User.objects.filter(email=value).exclude(pk=self.instance.pk).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
+        if self.instance and value.lower() != self.instance.email.lower():
+            if users_with_email_lower().filter(email_taken(value)).exclude(pk=self.instance.pk).exists():
+                raise serializers.ValidationError(DUPLICATE_EMAIL)
         return value
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as exc:
+            raise duplicate_error(exc)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair carrying the username and staff flags, so authenticated
+    requests do not need to load the user (see users.authentication)
+    """
+    token_class = ClaimsRefreshToken
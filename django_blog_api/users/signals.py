@@ -0,0 +1,36 @@
+"""
+Signal handlers for users
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import CLAIM_FIELDS, revoke_claims
+
+# Fields whose change makes the claims of existing tokens stale
+REVOKING_FIELDS = {*CLAIM_FIELDS, 'is_active'}
+
+
+@receiver(pre_save, sender=User)
+def snapshot_user_claims(sender, instance, update_fields=None, raw=False, **kwargs):
+    """The stored values of the revoking fields, for post_save to compare"""
+    instance._stored_claims = None
+    fields = REVOKING_FIELDS if update_fields is None else REVOKING_FIELDS & set(update_fields)
+    if raw or instance._state.adding or not fields:
+        return
+    instance._stored_claims = User.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_changed_user_claims(sender, instance, created, raw=False, **kwargs):
+    """Demoted or deactivated users must not keep their rights until their tokens expire"""
+    stored = getattr(instance, '_stored_claims', None)
+    if created or raw or stored is None:
+        return
+    if any(value != getattr(instance, field) for field, value in stored.items()):
+        revoke_claims(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_claims(sender, instance, **kwargs):
+    revoke_claims(instance.pk)
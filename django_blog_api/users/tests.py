@@ -1,3 +1,217 @@
-from django.test import TestCase
+import threading
+import time
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from articles.tests import auth_client
+from .authentication import revoked_key
+from .hashers import offload
+from .models import TokenRevocation
+from .serializers import RegisterSerializer
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserQueryBudgetTests(TestCase):
+    """Fixed query counts for the authentication and profile endpoints"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('john', 'john@example.com', 'Secret-pass-123')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_health(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/health/')
+        self.assertEqual(response.data, {'status': 'ok'})
+
+    def test_token_obtain_and_refresh(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                '/api/token/', {'username': 'john', 'password': 'Secret-pass-123'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                '/api/token/refresh/', {'refresh': response.data['refresh']}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_register(self):
+        # One uniqueness pre-check, the insert and its savepoint
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                '/api/register/',
+                {'username': 'jane', 'email': 'jane@example.com', 'password': 'Secret-pass-123'},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_register_duplicates_are_case_insensitive_for_email(self):
+        response = self.client.post(
+            '/api/register/',
+            {'username': 'john', 'email': 'JOHN@example.com', 'password': 'Secret-pass-123'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['username'], ['A user with this username already exists.'])
+        self.assertEqual(response.data['email'], ['A user with this email already exists.'])
+
+    def test_concurrent_duplicate_maps_integrity_error(self):
+        serializer = RegisterSerializer(
+            data={'username': 'jane', 'email': 'jane@example.com', 'password': 'Secret-pass-123'}
+        )
+        self.assertTrue(serializer.is_valid())
+        # Registered by another request after the pre-check
+        User.objects.create_user('janet', 'Jane@Example.com', 'Secret-pass-123')
+        with self.assertRaises(ValidationError) as raised:
+            serializer.save()
+        self.assertEqual(raised.exception.detail, {'email': ['A user with this email already exists.']})
+        self.assertFalse(User.objects.filter(username='jane').exists())
+
+    def test_me(self):
+        client = auth_client(self.user)
+        with self.assertNumQueries(1):
+            response = client.get('/api/me/')
+        self.assertEqual(response.data['username'], 'john')
+        response = client.patch('/api/me/', {'first_name': 'John'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ClaimsAuthenticationTests(TestCase):
+    """request.user comes from the token claims, revoked when the user changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'Secret-pass-123', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_obtained_token_authenticates_without_query(self):
+        response = APIClient().post(
+            '/api/token/', {'username': 'staff', 'password': 'Secret-pass-123'}, format='json'
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        # Whether the claims were revoked, then cached
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get('/api/health/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/health/').status_code, 200)
+
+    def test_token_without_claims_is_cached(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff).access_token}')
+        with self.assertNumQueries(1):
+            client.get('/api/health/')
+        with self.assertNumQueries(0):
+            client.get('/api/health/')
+
+    def test_created_article_author_comes_from_claims(self):
+        response = auth_client(self.staff).post(
+            '/api/articles/', {'title': 'Claims', 'content': 'Body'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['author'], 'staff')
+
+    def test_staff_change_revokes_claims(self):
+        client = auth_client(self.staff)
+        self.staff.is_staff = False
+        self.staff.save(update_fields=['is_staff'])
+        response = client.post('/api/articles/', {'title': 'Denied', 'content': 'Body'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_deactivated_user_is_rejected(self):
+        client = auth_client(self.staff)
+        self.staff.is_active = False
+        self.staff.save()
+        self.assertEqual(client.get('/api/health/').status_code, 401)
+
+    def test_unrelated_update_keeps_claims(self):
+        client = auth_client(self.staff)
+        client.get('/api/health/')
+        self.staff.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            client.get('/api/health/')
+
+    def test_revocation_survives_cache_eviction(self):
+        client = auth_client(self.staff)
+        self.staff.is_staff = False
+        self.staff.save(update_fields=['is_staff'])
+        cache.delete(revoked_key(self.staff.pk))
+        response = client.post('/api/articles/', {'title': 'Denied', 'content': 'Body'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        # Also once the user is gone
+        self.staff.delete()
+        cache.clear()
+        self.assertEqual(client.get('/api/health/').status_code, 401)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_keeps_revocations_briefly(self):
+        client = auth_client(self.staff)
+        with self.assertNumQueries(1):
+            client.get('/api/health/')
+        with self.assertNumQueries(0):
+            client.get('/api/health/')
+        # Another process revokes the claims: this one's cache does not know
+        # until its entry expires (AUTH_LOCAL_CACHE_TIMEOUT)
+        User.objects.filter(pk=self.staff.pk).update(is_staff=False)
+        TokenRevocation.objects.create(user_id=self.staff.pk, revoked_at=timezone.now())
+        expires_at = cache._expire_info[cache.make_key(revoked_key(self.staff.pk))]
+        self.assertLessEqual(expires_at - time.time(), settings.AUTH_LOCAL_CACHE_TIMEOUT)
+        cache.delete(revoked_key(self.staff.pk))
+        with self.assertNumQueries(2):
+            response = client.post('/api/articles/', {'title': 'Denied', 'content': 'Body'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_profile_edit_keeps_claims(self):
+        client = auth_client(self.staff)
+        response = client.patch('/api/me/', {'first_name': 'Staff'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TokenRevocation.objects.exists())
+        response = client.post('/api/articles/', {'title': 'Allowed', 'content': 'Body'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['users.hashers.ScryptPasswordHasher', 'users.hashers.PBKDF2PasswordHasher'],
+    PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10,
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+)
+class PasswordHasherTests(TestCase):
+    """Legacy hashes are upgraded on login, hashing runs in the pool"""
+
+    def login(self, username):
+        return self.client.post('/api/token/', {'username': username, 'password': 'Secret-pass-123'})
+
+    def test_login_rehashes_legacy_algorithm(self):
+        user = User.objects.create(
+            username='legacy', password=make_password('Secret-pass-123', hasher='pbkdf2_sha256')
+        )
+        self.assertEqual(self.login('legacy').status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$1024$'))
+
+    def test_login_rehashes_when_cost_changes(self):
+        user = User.objects.create_user('cost', 'cost@example.com', 'Secret-pass-123')
+        with self.settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 11):
+            self.assertEqual(self.login('cost').status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$2048$'))
+
+    @override_settings(PASSWORD_HASH_WORKERS=2)
+    def test_hashing_runs_in_pool(self):
+        self.assertTrue(offload(lambda: threading.current_thread().name).startswith('password-hash'))
+        with self.settings(PASSWORD_HASH_WORKERS=0):
+            self.assertIs(offload(threading.current_thread), threading.current_thread())
@@ -1,13 +1,18 @@
 """User views for registration and authentication"""
 
+from django.contrib.auth.models import User
+from django.shortcuts import get_object_or_404
 from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.views import TokenObtainPairView
 
+from blog_project.throttling import throttle_scope
 from .serializers import RegisterSerializer, MeSerializer
 
 
+@throttle_scope("register")
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def register(request):
@@ -15,6 +20,7 @@ def register(request):
     Register a new user
 
     POST /api/register/
+    Rate limited per IP address (THROTTLE_RATE_REGISTER)
     Body: {"username": "user", "email": "user@example.com", "password": "password123"}
 
     Returns: {"id": 1, "username": "user", "email": "user@example.com"}
@@ -40,5 +46,16 @@ class MeView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        """Return the currently authenticated user"""
-        return self.request.user
+        """
+        Return the currently authenticated user, loaded here: request.user
+        only holds the token claims (see users.authentication)
+        """
+        return get_object_or_404(User, pk=self.request.user.pk)
+
+
+class TokenObtainView(TokenObtainPairView):
+    """
+    POST /api/token/ - Obtain an access/refresh token pair
+    Rate limited per IP address (THROTTLE_RATE_LOGIN): bounds password guessing
+    """
+    throttle_scope = "login"